@@ -0,0 +1,52 @@
+import asyncio
+import weakref
+from typing import Dict, MutableMapping
+
+import grpc
+
+# Longest to wait for a node's channel to connect before giving up on it, in seconds
+CHANNEL_READY_TIMEOUT = 10.0
+
+
+class ChannelPool:
+    """
+    One channel per node address, shared by every structure, cluster and recovery in the process, so that requests to
+    the same node are multiplexed over a single HTTP/2 connection. Channels start connecting as soon as they are
+    opened. gRPC channels are bound to the event loop they were opened on, so each loop has its own set
+    """
+
+    def __init__(self):
+        self.__channels: MutableMapping[asyncio.AbstractEventLoop, Dict[str, grpc.aio.Channel]] = \
+            weakref.WeakKeyDictionary()
+
+    def get(self, port: int) -> grpc.aio.Channel:
+        """Channel to the node on `port`, opened on first use"""
+        channels = self.__channels.setdefault(asyncio.get_running_loop(), {})
+        address = f"localhost:{port}"
+
+        channel = channels.get(address)
+        if channel is None:
+            channel = grpc.aio.insecure_channel(address)
+            # Connect eagerly, so the first request does not also pay for setting up the connection
+            channel.get_state(try_to_connect=True)
+            channels[address] = channel
+
+        return channel
+
+    async def wait_until_ready(self, port: int, timeout: float = CHANNEL_READY_TIMEOUT) -> grpc.aio.Channel:
+        """Channel to the node on `port`, once it has connected"""
+        channel = self.get(port)
+        try:
+            await asyncio.wait_for(channel.channel_ready(), timeout)
+        except asyncio.TimeoutError:
+            raise Exception(f"Node on port {port} did not become ready within {timeout}s")
+
+        return channel
+
+    async def close(self) -> None:
+        """Close every channel opened on the running loop"""
+        channels = self.__channels.pop(asyncio.get_running_loop(), {})
+        await asyncio.gather(*(x.close() for x in channels.values()))
+
+
+channel_pool = ChannelPool()
@@ -1,16 +1,22 @@
 from typing import List, Set, Dict
 
 from client.clusters.interface import FaultTolerantClusterInterface
-from shared.types import NodeProcesses
+from shared.types import NodeProcesses, DEFAULT_CODING_SCHEME, DEFAULT_GALOIS_W
 from client.structures.fault_tolerant_list import FaultTolerantList
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
 
 import logging
 
 
 class FaultTolerantListCluster(FaultTolerantClusterInterface):
-    def __init__(self, node_processes: NodeProcesses):
-        super().__init__(node_processes, StructureType.LIST)
+    def __init__(
+        self,
+        node_processes: NodeProcesses,
+        galois_w: int = DEFAULT_GALOIS_W,
+        coding_scheme: int = DEFAULT_CODING_SCHEME,
+        ack_level: AckLevel = AckLevel.ACK_DEFAULT
+    ):
+        super().__init__(node_processes, StructureType.LIST, galois_w, coding_scheme, ack_level)
         self.data: List[FaultTolerantList] = []
 
     def __getitem__(self, item) -> FaultTolerantList:
@@ -23,7 +29,7 @@ class FaultTolerantListCluster(FaultTolerantClusterInterface):
             logging.info(
                 f"Initializing primary list on primary node on port: {primary_port}")
             f_list = FaultTolerantList(
-                primary_port, self.backup_ports, self.cluster_information)
+                primary_port, self.backup_ports, self.cluster_information, ack_level=self.ack_level)
             await f_list.create()
             self.data.append(f_list)
             self.primary_structure_identifiers.append(f_list.identifier)
@@ -38,25 +44,23 @@ class FaultTolerantListCluster(FaultTolerantClusterInterface):
         available_data: Dict[str, List] = {x: []
                                            for x in self.primary_structure_identifiers}
 
-        for i, structure in enumerate(self.data):
-            if i in detected_faults:
-                continue
-
-            # Primary data that we do have
-            values = await structure.get_all_values()
-            available_data[structure.identifier] = values
+        # Primary data that we do have, fetched alongside the fused data from the backups
+        surviving_data, fused_data = await self._fetch_recovery_data(self.data, detected_faults)
+        available_data.update(surviving_data)
 
         logging.info(f"Available primary data: {available_data}")
 
-        recovered_data_as_map = await self._recover_data(available_data, detected_faults)
+        recovered_data = self._recover_data(available_data, fused_data, detected_faults)
         recovered_lists = {}
-        for i, data_map in recovered_data_as_map.items():
-            sorted_keys = sorted(data_map.keys())
-            recovered_list = []
-            for j, key in enumerate(sorted_keys):
-                if j != key:
+        for i, (indexes, values) in recovered_data.items():
+            recovered_list = [None] * len(values)
+            for index, value in zip(indexes, values):
+                if not 0 <= index < len(recovered_list):
                     raise Exception("Keys must represent position in list")
-                recovered_list.append(data_map[key])
+                recovered_list[index] = value
+
+            if None in recovered_list:
+                raise Exception("Keys must represent position in list")
 
             recovered_lists[i] = recovered_list
 
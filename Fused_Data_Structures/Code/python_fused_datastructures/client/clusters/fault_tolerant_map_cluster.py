@@ -3,14 +3,20 @@ from typing import List, Set, Dict, Optional
 import logging
 
 from client.clusters.interface import FaultTolerantClusterInterface
-from shared.types import NodeProcesses
+from shared.types import NodeProcesses, DEFAULT_CODING_SCHEME, DEFAULT_GALOIS_W
 from client.structures.fault_tolerant_map import FaultTolerantMap
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
 
 
 class FaultTolerantMapCluster(FaultTolerantClusterInterface):
-    def __init__(self, node_processes: NodeProcesses):
-        super().__init__(node_processes, StructureType.MAP)
+    def __init__(
+        self,
+        node_processes: NodeProcesses,
+        galois_w: int = DEFAULT_GALOIS_W,
+        coding_scheme: int = DEFAULT_CODING_SCHEME,
+        ack_level: AckLevel = AckLevel.ACK_DEFAULT
+    ):
+        super().__init__(node_processes, StructureType.MAP, galois_w, coding_scheme, ack_level)
         self.data: List[FaultTolerantMap] = []
 
     def __getitem__(self, item) -> FaultTolerantMap:
@@ -23,7 +29,7 @@ class FaultTolerantMapCluster(FaultTolerantClusterInterface):
             logging.info(
                 f"Initializing primary map on primary node on port: {primary_port}")
             f_map = FaultTolerantMap(
-                primary_port, self.backup_ports, self.cluster_information)
+                primary_port, self.backup_ports, self.cluster_information, ack_level=self.ack_level)
             await f_map.create()
             self.data.append(f_map)
             self.primary_structure_identifiers.append(f_map.identifier)
@@ -38,17 +44,14 @@ class FaultTolerantMapCluster(FaultTolerantClusterInterface):
         available_data: Dict[str, Optional[Dict]] = {
             x: None for x in self.primary_structure_identifiers}
 
-        for i, structure in enumerate(self.data):
-            if i in detected_faults:
-                continue
-
-            # Primary data that we do have
-            values = await structure.get_all_values()
-            available_data[structure.identifier] = values
+        # Primary data that we do have, fetched alongside the fused data from the backups
+        surviving_data, fused_data = await self._fetch_recovery_data(self.data, detected_faults)
+        available_data.update(surviving_data)
 
         logging.info(f"Available primary data: {available_data}")
 
-        recovered_maps = await self._recover_data(available_data, detected_faults)
+        recovered_data = self._recover_data(available_data, fused_data, detected_faults)
+        recovered_maps = {i: dict(zip(keys, values)) for i, (keys, values) in recovered_data.items()}
 
         logging.info(f"\nMaps which were restored:")
         for faulty_data_ordinal in detected_faults:
@@ -1,14 +1,33 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from array import array
+from typing import Any, List, Dict, NamedTuple, Sequence, Set, Tuple
 from uuid import uuid4
 
 import grpc
 import logging
 
-from protos.service_pb2 import StructureType, FusedRecoveryDataRequest
+from client.channels import channel_pool
+from protos.service_pb2 import StructureType, FusedRecoveryDataRequest, AckLevel
+from client.structures.interface import FaultTolerantInterface
 from protos.service_pb2_grpc import FusedDataStructureStub
-from shared.fusion import FusionAccessor
-from shared.types import ClusterInformation, NodeProcesses
+from shared.fusion import FusionAccessor, check_coding_scheme, check_galois_w
+from shared.types import ClusterInformation, NodeProcesses, DEFAULT_CODING_SCHEME, DEFAULT_GALOIS_W
+
+# Times recovery is attempted before giving up on backups that keep being mutated while their data is streamed
+RECOVERY_ATTEMPTS = 3
+# Fused nodes per page of recovery data, asked of every backup so that their pages line up
+RECOVERY_PAGE_SIZE = 4096
+
+
+class FusedRecoveryData(NamedTuple):
+    number_of_fused_nodes: int
+    # Code positions of the backups read - the codes of the rest are left as zeros
+    backups_read: Tuple[int, ...]
+    # Pages of codes streamed by each backup read, by code position, with one code per fused node
+    code_pages: Dict[int, List[array]]
+    # Pages of index data in turn, with one entry per primary for each fused node
+    index_pages: List[array]
 
 
 class FaultTolerantClusterInterface(ABC):
@@ -16,14 +35,27 @@ class FaultTolerantClusterInterface(ABC):
     Interface for producing a cluster amongst primary and backup ports
     """
 
-    def __init__(self, node_processes: NodeProcesses, structure_type: StructureType):
+    def __init__(
+        self,
+        node_processes: NodeProcesses,
+        structure_type: StructureType,
+        galois_w: int = DEFAULT_GALOIS_W,
+        coding_scheme: int = DEFAULT_CODING_SCHEME,
+        ack_level: AckLevel = AckLevel.ACK_DEFAULT
+    ):
+        check_galois_w(node_processes.number_of_primaries, node_processes.number_of_faults, galois_w)
+        check_coding_scheme(galois_w, coding_scheme)
+
         self.__structure_type = structure_type
+        self.__ack_level = ack_level
         self.__primary_ports = node_processes.primary_ports
         self.__backup_ports = node_processes.backup_ports
         self.__cluster_info = ClusterInformation(
             cluster_identifier=str(uuid4()),
             number_of_primaries=node_processes.number_of_primaries,
-            number_of_faults=node_processes.number_of_faults
+            number_of_faults=node_processes.number_of_faults,
+            galois_w=galois_w,
+            coding_scheme=coding_scheme
         )
         self.primary_structure_identifiers: List[str] = []
 
@@ -35,6 +67,11 @@ class FaultTolerantClusterInterface(ABC):
     def structure_type(self) -> StructureType:
         return self.__structure_type
 
+    @property
+    def ack_level(self) -> AckLevel:
+        """When mutations to the cluster's structures are acknowledged, unless a call asks for a level of its own"""
+        return self.__ack_level
+
     @property
     def primary_ports(self) -> List[int]:
         return self.__primary_ports
@@ -51,71 +88,189 @@ class FaultTolerantClusterInterface(ABC):
     def cluster_identifier(self) -> str:
         return self.cluster_information.cluster_identifier
 
-    async def _recover_data(self, available_data, detected_faults) -> Dict[str, Dict[int, int]]:
-        available_fused_data: List[List[int]] = []
-        available_index_data = []
-        available_rs_data = []
-        index_data_received = False
+    def _backup_stub(self, backup_port: int) -> FusedDataStructureStub:
+        """Stub over the process's shared channel to a backup"""
+        return FusedDataStructureStub(channel_pool.get(backup_port))
 
-        # Connect to fused structures and get all data
-        for backup_port in self.backup_ports:
-            channel = grpc.aio.insecure_channel(
-                f"localhost:{backup_port}"
-            )
-            stub = FusedDataStructureStub(channel)
-            response = await stub.GetFusedRecoveryData(
-                FusedRecoveryDataRequest(clusterIdentifier=self.cluster_identifier)
+    async def _fetch_recovery_data(
+        self, structures: Sequence[FaultTolerantInterface], detected_faults: Set[int]
+    ) -> Tuple[Dict[str, Any], FusedRecoveryData]:
+        """Fetch the values of every surviving primary and the fused data of every backup at the same time"""
+        surviving_structures = [x for i, x in enumerate(structures) if i not in detected_faults]
+
+        values, fused_data = await asyncio.gather(
+            asyncio.gather(*(x.get_all_values() for x in surviving_structures)),
+            self.__get_fused_data(detected_faults)
+        )
+
+        return {x.identifier: y for x, y in zip(surviving_structures, values)}, fused_data
+
+    async def __get_fused_data(self, detected_faults: Set[int]) -> FusedRecoveryData:
+        # As many backups as there are faults are enough to rebuild them, and only the fused nodes holding one of the
+        # faulty primaries' elements are needed
+        primary_structure_positions = sorted(detected_faults)
+        # Nothing is missing, so there is nothing for the backups to stream
+        if not primary_structure_positions:
+            return FusedRecoveryData(0, (), {}, [])
+
+        for attempt in range(RECOVERY_ATTEMPTS):
+            try:
+                responses, index_pages = await self.__stream_from_backups(
+                    primary_structure_positions, len(detected_faults)
+                )
+                break
+            except grpc.aio.AioRpcError as e:
+                # A backup aborts its stream if it is mutated part way through, as its pages would be inconsistent
+                if e.code() != grpc.StatusCode.ABORTED or attempt == RECOVERY_ATTEMPTS - 1:
+                    raise
+
+                logging.info(f"Fused data changed during recovery, retrying: {e.details()}")
+
+        number_of_fused_nodes = next(iter(responses.values()))[0]
+        if any(x != number_of_fused_nodes for x, _ in responses.values()):
+            raise Exception("Backups hold different numbers of fused nodes")
+
+        return FusedRecoveryData(
+            number_of_fused_nodes, tuple(sorted(responses)), {x: y for x, (_, y) in responses.items()}, index_pages
+        )
+
+    async def __stream_from_backups(
+        self, primary_structure_positions: List[int], number_of_backups_needed: int
+    ) -> Tuple[Dict[int, Tuple[int, List[array]]], List[array]]:
+        """
+        Read the (number of fused nodes, code pages) of `number_of_backups_needed` backups at once, by code position,
+        along with the index pages. Backups are tried in order, and one that fails is replaced by the next untried one
+        """
+        untried = list(range(len(self.backup_ports)))
+        responses: Dict[int, Tuple[int, List[array]]] = {}
+        index_pages: List[array] = []
+        streams: Dict[asyncio.Future, Tuple[int, bool]] = {}
+
+        def stream_from_next_backup(with_index_data: bool) -> None:
+            position = untried.pop(0)
+            stream = asyncio.ensure_future(self.__stream_fused_data(
+                self.backup_ports[position], primary_structure_positions, codes_only=not with_index_data
+            ))
+            streams[stream] = (position, with_index_data)
+
+        # Every backup holds the same index data, so it is only read from one of them
+        for i in range(min(number_of_backups_needed, len(untried))):
+            stream_from_next_backup(with_index_data=i == 0)
+
+        try:
+            while streams:
+                done, _ = await asyncio.wait(streams, return_when=asyncio.FIRST_COMPLETED)
+                for stream in done:
+                    position, with_index_data = streams.pop(stream)
+                    try:
+                        number_of_fused_nodes, code_pages, stream_index_pages = stream.result()
+                    except grpc.aio.AioRpcError as e:
+                        if e.code() == grpc.StatusCode.ABORTED:
+                            raise
+                        if not untried:
+                            raise Exception(
+                                f"Too few backups could be read to recover {number_of_backups_needed} faults: {e.details()}"
+                            )
+
+                        logging.info(
+                            f"Backup node on port {self.backup_ports[position]} failed during recovery: {e.details()}"
+                        )
+                        stream_from_next_backup(with_index_data)
+                        continue
+
+                    responses[position] = (number_of_fused_nodes, code_pages)
+                    if with_index_data:
+                        index_pages = stream_index_pages
+        finally:
+            for stream in streams:
+                stream.cancel()
+
+        return responses, index_pages
+
+    async def __stream_fused_data(
+        self, backup_port: int, primary_structure_positions: List[int], codes_only: bool
+    ) -> Tuple[int, List[array], List[array]]:
+        number_of_fused_nodes = 0
+        code_pages, index_pages = [], []
+
+        pages = self._backup_stub(backup_port).StreamFusedRecoveryData(
+            FusedRecoveryDataRequest(
+                clusterIdentifier=self.cluster_identifier,
+                pageSize=RECOVERY_PAGE_SIZE,
+                codesOnly=codes_only,
+                primaryStructurePositions=primary_structure_positions
             )
+        )
+        # Pages are kept as they arrive, to be decoded one at a time, and an empty structure's single page is dropped
+        async for page in pages:
+            number_of_fused_nodes = page.numberOfFusedNodes
+            if page.fusedData:
+                code_pages.append(array("l", page.fusedData))
+            if page.fusedDataIndexes:
+                index_pages.append(array("l", page.fusedDataIndexes))
 
-            fused_data = response.fusedData
-            available_fused_data.append(fused_data)
+        return number_of_fused_nodes, code_pages, index_pages
 
-            if not index_data_received:
-                index_data = response.indexData
-                for x in index_data:
-                    available_index_data.append(x.fusedDataIndexes)
-                index_data_received = True
+    def _recover_data(
+        self, available_data, fused_data: FusedRecoveryData, detected_faults
+    ) -> Dict[str, Tuple[array, array]]:
+        """Recover the (keys, values) columns of every faulty primary, ordered by fused node, a page at a time"""
+        number_of_primaries = self.cluster_information.number_of_primaries
+        number_of_faults = self.cluster_information.number_of_faults
+        number_of_fused_nodes, backups_read, code_pages, index_pages = fused_data
 
-            await channel.close()
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            available_index_data = [
+                page[x:x + number_of_primaries].tolist() for page in index_pages
+                for x in range(0, len(page), number_of_primaries)
+            ]
+            logging.info(f"Available auxiliary data: {available_index_data}")
 
-        logging.info(f"Available auxiliary data: {available_index_data}")
+            available_rs_data = [
+                tuple(code for page in code_pages[i] for code in page) for i in backups_read
+            ] if number_of_fused_nodes else []
+            logging.info(f"Available RS-encoded data: {available_rs_data}")
 
-        fusion_accessor = FusionAccessor(number_of_primaries=self.cluster_information.number_of_primaries,
-                                         number_of_faults=self.cluster_information.number_of_faults)
-        restored_data_arrays = []
-        for i in range(len(available_index_data)):
-            code = []
-            data = []
+        fusion_accessor = FusionAccessor(number_of_primaries=number_of_primaries,
+                                         number_of_faults=number_of_faults,
+                                         galois_w=self.cluster_information.galois_w,
+                                         coding_scheme=self.cluster_information.coding_scheme)
+        # Backups which were not read are erased as far as the decoder is concerned
+        erasures = set(detected_faults) | {number_of_primaries + i for i in range(number_of_faults) if i not in backups_read}
+        decoder = fusion_accessor.get_decoder(erasures)
 
-            for j in range(self.cluster_information.number_of_faults):
-                code.append(available_fused_data[j][i])
+        surviving_data = {
+            j: available_data[x] for j, x in enumerate(self.primary_structure_identifiers) if j not in detected_faults
+        }
+        recovered_columns = {j: (array("l"), array("l")) for j in detected_faults}
 
-            for j, primary_structure_identifier in enumerate(self.primary_structure_identifiers):
-                index_of_primary = available_index_data[i][j]
+        for page_number, index_page in enumerate(index_pages):
+            number_of_page_nodes = len(index_page) // number_of_primaries
 
-                if j not in detected_faults and index_of_primary != -1:
-                    original = available_data[primary_structure_identifier]
-                    data.append(original[index_of_primary])
-                else:
-                    data.append(0)
+            # Gather the surviving primary values into one column per primary, leaving faulty columns to be decoded
+            data_columns = array("l", bytes(number_of_primaries * number_of_page_nodes * index_page.itemsize))
+            for j, original in surviving_data.items():
+                data_columns[j * number_of_page_nodes:(j + 1) * number_of_page_nodes] = array(
+                    "l", [original[x] if x != -1 else 0 for x in index_page[j::number_of_primaries]]
+                )
 
-            # Build list of erasures from detected faults
-            erasures = list(detected_faults)
-            while len(erasures) < self.cluster_information.number_of_faults + 1:
-                erasures.append(-1)
+            # Codes of each backup are packed one column after another, in the order of the backups
+            code_columns = array("l")
+            for i in range(number_of_faults):
+                if i in code_pages:
+                    code_columns.extend(code_pages[i][page_number])
+                else:
+                    code_columns.extend(array("l", [0]) * number_of_page_nodes)
 
-            restored_data = fusion_accessor.get_recovered_data(code, data, erasures)
-            restored_data_arrays.append(restored_data)
-            available_rs_data.append(code)
+            decoder.decode_columns(code_columns, data_columns)
 
-        recovered_data_mapping = {x: {} for x in self.primary_structure_identifiers}
-        for i, indexes in enumerate(available_index_data):
-            for j, key in enumerate(indexes):
-                if key == -1:
-                    continue
-                recovered_data_mapping[self.primary_structure_identifiers[j]
-                                       ][key] = restored_data_arrays[i][j]
+            for j, (keys, values) in recovered_columns.items():
+                # A primary's elements always occupy the first fused nodes of the stack
+                page_keys = index_page[j::number_of_primaries]
+                number_of_elements = number_of_page_nodes - page_keys.count(-1)
+                start = j * number_of_page_nodes
 
-        logging.info(f"Available RS-encoded data: {[*zip(*available_rs_data)]}")
+                keys.extend(page_keys[:number_of_elements])
+                values.extend(data_columns[start:start + number_of_elements])
 
-        return recovered_data_mapping
+        return {self.primary_structure_identifiers[j]: x for j, x in recovered_columns.items()}
@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Most values cached for each structure before the least recently used are evicted
+READ_CACHE_SIZE = 1024
+
+
+class VersionedCache:
+    """
+    Least recently used values of one structure, all read at the same version of it. A cached value is only served
+    once the primary has confirmed the structure is still at that version, unless it confirmed so within the last
+    `max_staleness` seconds. Writes made through the same client are applied to the cache as well, and counted towards
+    its version - so if no other client has written in the meantime, the cache still matches the primary after them
+    """
+
+    def __init__(self, max_size: int = READ_CACHE_SIZE, max_staleness: float = 0.0):
+        self.__max_size = max_size
+        self.__max_staleness = max_staleness
+        self.__values: OrderedDict[int, int] = OrderedDict()
+        self.__version: Optional[int] = None
+        self.__validated_at = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    @property
+    def version(self) -> Optional[int]:
+        return self.__version
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the cached values can be served without checking with the primary"""
+        return time.monotonic() - self.__validated_at < self.__max_staleness
+
+    def get(self, key: int) -> Optional[int]:
+        value = self.__values.get(key)
+        if value is not None:
+            self.__values.move_to_end(key)
+
+        return value
+
+    def store(self, key: int, value: int, version: int) -> None:
+        # A response overtaken by a newer one describes an older version, and must not be mixed in with it
+        if self.__version is not None and version < self.__version:
+            return
+
+        if version != self.__version:
+            self.__values.clear()
+            self.__version = version
+
+        self.__values[key] = value
+        self.__values.move_to_end(key)
+        if len(self.__values) > self.__max_size:
+            self.__values.popitem(last=False)
+
+        self.__validated_at = time.monotonic()
+
+    def validate(self, version: int) -> None:
+        """Record that the primary is at `version`, which keeps the cached values if they were read at it"""
+        if version == self.__version:
+            self.__validated_at = time.monotonic()
+
+    def apply_set(self, key: int, value: int) -> None:
+        """A write from this client which set `key` to `value`"""
+        if self.__advance():
+            self.__values[key] = value
+            self.__values.move_to_end(key)
+            if len(self.__values) > self.__max_size:
+                self.__values.popitem(last=False)
+
+    def apply_delete(self, key: int) -> None:
+        """A write from this client which removed `key`"""
+        if self.__advance():
+            self.__values.pop(key, None)
+
+    def apply_append(self) -> None:
+        """A write from this client which left every existing key with its value"""
+        self.__advance()
+
+    def apply_shift(self) -> None:
+        """A write from this client which may have moved values between keys, such as an insert into a list"""
+        if self.__advance():
+            self.__values.clear()
+
+    def clear(self) -> None:
+        """Forget everything, for when whether a write was applied is unknown"""
+        self.__values.clear()
+        self.__version = None
+        self.__validated_at = float("-inf")
+
+    def __advance(self) -> bool:
+        if self.__version is None:
+            return False
+
+        # Each mutation moves the structure on by one version
+        self.__version += 1
+        return True
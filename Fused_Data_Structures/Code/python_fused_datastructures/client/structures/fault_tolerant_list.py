@@ -1,8 +1,11 @@
-from typing import List
+from typing import Iterable, List
 
 from client.structures.interface import FaultTolerantInterface
 
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
+
+# Insert index past the end of any list, which the primary clamps to the end
+END_OF_LIST = 2 ** 31 - 1
 
 
 class FaultTolerantList(FaultTolerantInterface):
@@ -17,10 +20,33 @@ class FaultTolerantList(FaultTolerantInterface):
 
         return value_list
 
-    async def insert(self, index: int, value: int) -> None:
+    async def get_range(self, start: int, stop: int) -> List[int]:
+        """Elements at positions `start` up to but not including `stop`, as with slicing"""
+        values = await self._get_range(start, stop)
+
+        return list(values.values())
+
+    async def insert(self, index: int, value: int, ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
         """Insert `value` to list at position `index`"""
-        await self._add(index, value)
+        await self._add(index, value, ack_level)
 
-    async def remove(self, index: int) -> None:
+    async def remove(self, index: int, ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
         """Remove element at position `index`"""
-        await self._remove(index)
+        await self._remove(index, ack_level)
+
+    async def insert_many(self, index: int, values: Iterable[int], ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        """Insert `values` to list in order, starting at position `index`"""
+        if index < 0:
+            # Each insert shifts the end of the list, so a negative index has to be resolved once up front
+            index += len(await self.get_all_values())
+            index = max(index, 0)
+
+        await self._add_many(((index + i, value) for i, value in enumerate(values)), ack_level)
+
+    async def extend(self, values: Iterable[int], ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        """Append `values` to end of list"""
+        await self._add_many(((END_OF_LIST, value) for value in values), ack_level)
+
+    async def remove_many(self, indexes: Iterable[int], ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        """Remove element at each of `indexes` in order, each index referring to the list after the removals before it"""
+        await self._remove_many(indexes, ack_level)
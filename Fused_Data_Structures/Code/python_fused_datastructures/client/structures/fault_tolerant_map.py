@@ -1,8 +1,9 @@
-from typing import Dict
+from typing import Dict, Iterable, Tuple
 
+from client.structures.cache import VersionedCache
 from client.structures.interface import FaultTolerantInterface
 
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
 
 
 class FaultTolerantMap(FaultTolerantInterface):
@@ -10,15 +11,33 @@ class FaultTolerantMap(FaultTolerantInterface):
         await super().establish_node_connection()
         await super().create_structure(structure_type=StructureType.MAP)
 
+    def _cache_add(self, cache: VersionedCache, index: int, value: int) -> None:
+        cache.apply_set(index, value)
+
+    def _cache_remove(self, cache: VersionedCache, index: int) -> None:
+        cache.apply_delete(index)
+
     async def get_all_values(self) -> Dict:
         values = await self._get_all_values()
 
         return values
 
-    async def put(self, key: int, value: int) -> None:
+    async def get_range(self, start: int, stop: int) -> Dict[int, int]:
+        """Entries with a key from `start` up to but not including `stop`"""
+        return await self._get_range(start, stop)
+
+    async def put(self, key: int, value: int, ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
         """Put `value` at specified `key` into map"""
-        await self._add(key, value)
+        await self._add(key, value, ack_level)
 
-    async def remove(self, key: int) -> None:
+    async def remove(self, key: int, ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
         """Remove specified `key` from map"""
-        await self._remove(key)
+        await self._remove(key, ack_level)
+
+    async def put_many(self, items: Iterable[Tuple[int, int]], ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        """Put each (`key`, `value`) pair into map, in order"""
+        await self._add_many(items, ack_level)
+
+    async def remove_many(self, keys: Iterable[int], ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        """Remove each of `keys` from map, in order"""
+        await self._remove_many(keys, ack_level)
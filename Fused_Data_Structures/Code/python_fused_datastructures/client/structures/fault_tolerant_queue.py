@@ -1,8 +1,9 @@
-from typing import List
+from typing import Iterable, List
 
+from client.structures.cache import VersionedCache
 from client.structures.interface import FaultTolerantInterface
 
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
 
 
 class FaultTolerantQueue(FaultTolerantInterface):
@@ -10,6 +11,10 @@ class FaultTolerantQueue(FaultTolerantInterface):
         await super().establish_node_connection()
         await super().create_structure(structure_type=StructureType.QUEUE)
 
+    def _cache_add(self, cache: VersionedCache, index: int, value: int) -> None:
+        # Enqueueing leaves every element already in the queue where it was
+        cache.apply_append()
+
     async def get_all_values(self) -> List:
         values = await self._get_all_values()
 
@@ -17,18 +22,32 @@ class FaultTolerantQueue(FaultTolerantInterface):
 
         return value_list
 
-    async def enqueue(self, value: int) -> None:
+    async def get_range(self, start: int, stop: int) -> List[int]:
+        """Elements at positions `start` up to but not including `stop`, as with slicing"""
+        values = await self._get_range(start, stop)
+
+        return list(values.values())
+
+    async def enqueue(self, value: int, ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
         """Add an item to end of queue"""
         # Only value is used within primary and fused structure - key/index can be random value
-        await self._add(0, value)
+        await self._add(0, value, ack_level)
 
-    async def dequeue(self) -> int:
+    async def dequeue(self, ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> int:
         """Return and remove the element at front of queue"""
         value = await self.get(0)
-        await self._remove(0)
+        await self._remove(0, ack_level)
 
         return value
 
+    async def enqueue_many(self, values: Iterable[int], ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        """Add items to end of queue, in order"""
+        await self._add_many(((0, value) for value in values), ack_level)
+
+    async def remove_many(self, count: int, ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        """Remove `count` elements from front of queue"""
+        await self._remove_many([0] * count, ack_level)
+
     async def peek(self) -> int:
         """Returns element at front of queue - synonymous to get(0)"""
         return await self.get(0)
@@ -1,23 +1,32 @@
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional
 
 from protos.service_pb2 import ValueRequest, AddValuePayload, StructureMutation, RemoveValuePayload, \
-    CreatePrimaryStructureRequest, StructureType
+    CreatePrimaryStructureRequest, StructureType, MutationBatch, ValuesRequest, KeyRange, ValueResponse, AckLevel, \
+    ReplicationQueueDepthsRequest
 from protos.service_pb2_grpc import PrimaryDataStructureStub
+from shared.mutation_channel import MutationChannel
 from shared.types import ClusterInformation
 
+# Most mutations sent to the primary in a single batch request
+MUTATION_BATCH_SIZE = 4096
+
 
 async def create_primary_structure(
     stub: PrimaryDataStructureStub,
     structure_type: StructureType,
     backup_ports: List[int],
-    cluster_information: ClusterInformation
+    cluster_information: ClusterInformation,
+    ack_level: AckLevel = AckLevel.ACK_DEFAULT
 ) -> str:
     request = CreatePrimaryStructureRequest(
         type=structure_type,
         backupPorts=backup_ports,
         clusterIdentifier=cluster_information.cluster_identifier,
         numberOfPrimaries=cluster_information.number_of_primaries,
-        numberOfFaults=cluster_information.number_of_faults
+        numberOfFaults=cluster_information.number_of_faults,
+        galoisW=cluster_information.galois_w,
+        codingScheme=cluster_information.coding_scheme,
+        ackLevel=ack_level
     )
     value = await stub.CreatePrimaryStructure(request)
 
@@ -25,14 +34,36 @@ async def create_primary_structure(
 
 
 async def get_value(
-    stub: PrimaryDataStructureStub, structure_identifier: str, key: str
-) -> int:
+    stub: PrimaryDataStructureStub, structure_identifier: str, key: str, cached_version: Optional[int] = None
+) -> ValueResponse:
     request = ValueRequest(
-        structureIdentifier=structure_identifier, key=key
+        structureIdentifier=structure_identifier, key=key, cachedVersion=cached_version
     )
     value = await stub.GetValue(request)
 
-    return value.value
+    return value
+
+
+async def get_values(
+    stub: PrimaryDataStructureStub, structure_identifier: str, keys: Iterable[int]
+) -> List[int]:
+    request = ValuesRequest(
+        structureIdentifier=structure_identifier, keys=keys
+    )
+    values = await stub.GetValues(request)
+
+    return list(values.values)
+
+
+async def get_values_in_range(
+    stub: PrimaryDataStructureStub, structure_identifier: str, start: int, stop: int
+) -> Dict[int, int]:
+    request = ValuesRequest(
+        structureIdentifier=structure_identifier, range=KeyRange(start=start, stop=stop)
+    )
+    values = await stub.GetValues(request)
+
+    return dict(zip(values.keys, values.values))
 
 
 async def get_all_values(
@@ -47,36 +78,78 @@ async def get_all_values(
     return values.values
 
 
-async def add_value(
-    stub: PrimaryDataStructureStub,
+async def get_replication_queue_depths(stub: PrimaryDataStructureStub) -> Dict[int, int]:
+    response = await stub.GetReplicationQueueDepths(ReplicationQueueDepthsRequest())
+
+    return dict(response.queueDepths)
+
+
+def add_value_mutation(
     structure_identifier: str,
     index: int,
     value: int,
-    cluster_identifier: str
-) -> None:
+    cluster_identifier: str,
+    ack_level: AckLevel = AckLevel.ACK_DEFAULT
+) -> StructureMutation:
     payload = AddValuePayload(index=index, value=value)
 
-    mutation = StructureMutation(
+    return StructureMutation(
         structureIdentifier=structure_identifier,
         addValuePayload=payload,
-        clusterIdentifier=cluster_identifier
+        clusterIdentifier=cluster_identifier,
+        ackLevel=ack_level
     )
 
-    await stub.MutationStream(mutation)
 
-
-async def remove_value(
-    stub: PrimaryDataStructureStub,
+def remove_value_mutation(
     structure_identifier: str,
     index: int,
-    cluster_identifier: str
-) -> None:
+    cluster_identifier: str,
+    ack_level: AckLevel = AckLevel.ACK_DEFAULT
+) -> StructureMutation:
     payload = RemoveValuePayload(index=index)
 
-    mutation = StructureMutation(
+    return StructureMutation(
         structureIdentifier=structure_identifier,
         removeValuePayload=payload,
-        clusterIdentifier=cluster_identifier
+        clusterIdentifier=cluster_identifier,
+        ackLevel=ack_level
     )
 
-    await stub.MutationStream(mutation)
+
+async def add_value(
+    mutations: MutationChannel,
+    structure_identifier: str,
+    index: int,
+    value: int,
+    cluster_identifier: str,
+    ack_level: AckLevel = AckLevel.ACK_DEFAULT
+) -> None:
+    await mutations.send(add_value_mutation(structure_identifier, index, value, cluster_identifier, ack_level))
+
+
+async def remove_value(
+    mutations: MutationChannel,
+    structure_identifier: str,
+    index: int,
+    cluster_identifier: str,
+    ack_level: AckLevel = AckLevel.ACK_DEFAULT
+) -> None:
+    await mutations.send(remove_value_mutation(structure_identifier, index, cluster_identifier, ack_level))
+
+
+async def apply_mutations(
+    stub: PrimaryDataStructureStub,
+    mutations: Iterable[StructureMutation],
+    ack_level: AckLevel = AckLevel.ACK_DEFAULT
+) -> None:
+    """Apply mutations in order, a batch at a time, stopping at the first one the primary fails to apply"""
+    mutations = list(mutations)
+    for start in range(0, len(mutations), MUTATION_BATCH_SIZE):
+        batch = mutations[start:start + MUTATION_BATCH_SIZE]
+        response = await stub.ApplyMutationBatch(MutationBatch(mutations=batch, ackLevel=ack_level))
+
+        if response.error:
+            raise Exception(
+                f"Mutation {start + response.numberOfMutationsApplied} of batch failed: {response.error}"
+            )
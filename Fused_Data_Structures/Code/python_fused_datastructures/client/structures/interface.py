@@ -1,12 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Coroutine, Dict
+from typing import Iterable, List, Optional, Coroutine, Dict, Tuple
 
-import grpc
 import logging
 
-from client.structures.helpers import get_value, add_value, remove_value, create_primary_structure, get_all_values
-from protos.service_pb2 import StructureType
+from client.channels import channel_pool
+from client.structures.cache import READ_CACHE_SIZE, VersionedCache
+from client.structures.helpers import get_value, add_value, remove_value, create_primary_structure, get_all_values, \
+    add_value_mutation, remove_value_mutation, apply_mutations, get_values, get_values_in_range, \
+    get_replication_queue_depths
+from protos.service_pb2 import StructureType, AckLevel
 from protos.service_pb2_grpc import PrimaryDataStructureStub
+from shared.mutation_channel import MutationChannel
 from shared.types import ClusterInformation
 
 
@@ -15,19 +19,25 @@ class FaultTolerantInterface(ABC):
         self,
         primary_node_port: int,
         backup_ports: List[int],
-        cluster_information: ClusterInformation
+        cluster_information: ClusterInformation,
+        cache_size: int = READ_CACHE_SIZE,
+        max_staleness: float = 0.0,
+        ack_level: AckLevel = AckLevel.ACK_DEFAULT
     ):
         self.__identifier: Optional[str] = None
         self.__connection: Optional[PrimaryDataStructureStub] = None
+        self.__mutations: Optional[MutationChannel] = None
+        self.__cache = VersionedCache(cache_size, max_staleness)
         self.__primary_node_port: int = primary_node_port
-        self.__channel = grpc.aio.insecure_channel(
-            f"localhost:{self.__primary_node_port}"
-        )
         self.__backup_ports = backup_ports
         self.__cluster_information = cluster_information
+        self.__ack_level = ack_level
 
     async def establish_node_connection(self) -> None:
-        self.__connection = PrimaryDataStructureStub(self.__channel)
+        # The channel to the primary is shared with every other structure on the same node
+        channel = await channel_pool.wait_until_ready(self.__primary_node_port)
+        self.__connection = PrimaryDataStructureStub(channel)
+        self.__mutations = MutationChannel(self.__connection.MutationChannel)
 
     @property
     def cluster_information(self) -> ClusterInformation:
@@ -61,27 +71,108 @@ class FaultTolerantInterface(ABC):
         if self.connection is None:
             raise Exception("Connection with primary not initialised")
 
-        self.__identifier = await create_primary_structure(self.connection, structure_type, self.backup_ports, self.cluster_information)
+        self.__identifier = await create_primary_structure(
+            self.connection, structure_type, self.backup_ports, self.cluster_information, self.__ack_level
+        )
 
     async def close_node_connection(self) -> None:
         logging.info(f"Closing node connection on port: {self.__primary_node_port}")
-        await self.__channel.close()
+        # Only this structure's mutation stream is closed, as the channel itself is shared
+        if self.__mutations is not None:
+            await self.__mutations.close()
+
+    async def _add(self, index: int, value: int, ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        if self.identifier is None or self.connection is None:
+            raise Exception("Connection with primary not initialised")
+
+        try:
+            await add_value(self.__mutations, self.identifier, index, value, self.cluster_identifier, ack_level)
+        except Exception:
+            self.__cache.clear()
+            raise
+
+        self._cache_add(self.__cache, index, value)
+
+    async def _remove(self, index: int, ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        if self.identifier is None or self.connection is None:
+            raise Exception("Connection with primary not initialised")
+
+        try:
+            await remove_value(self.__mutations, self.identifier, index, self.cluster_identifier, ack_level)
+        except Exception:
+            self.__cache.clear()
+            raise
 
-    async def _add(self, index: int, value: int) -> None:
+        self._cache_remove(self.__cache, index)
+
+    async def _add_many(self, items: Iterable[Tuple[int, int]], ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        """Add each (index, value) pair in order, with one request to the primary per batch"""
         if self.identifier is None or self.connection is None:
             raise Exception("Connection with primary not initialised")
 
-        await add_value(self.connection, self.identifier, index, value, self.cluster_identifier)
+        items = list(items)
+        try:
+            await apply_mutations(self.connection, (
+                add_value_mutation(self.identifier, index, value, self.cluster_identifier) for index, value in items
+            ), ack_level)
+        except Exception:
+            self.__cache.clear()
+            raise
+
+        for index, value in items:
+            self._cache_add(self.__cache, index, value)
 
-    async def _remove(self, index: int) -> None:
+    async def _remove_many(self, indexes: Iterable[int], ack_level: AckLevel = AckLevel.ACK_DEFAULT) -> None:
+        """Remove each index in order, with one request to the primary per batch"""
         if self.identifier is None or self.connection is None:
             raise Exception("Connection with primary not initialised")
 
-        await remove_value(self.connection, self.identifier, index, self.cluster_identifier)
+        indexes = list(indexes)
+        try:
+            await apply_mutations(self.connection, (
+                remove_value_mutation(self.identifier, index, self.cluster_identifier) for index in indexes
+            ), ack_level)
+        except Exception:
+            self.__cache.clear()
+            raise
+
+        for index in indexes:
+            self._cache_remove(self.__cache, index)
+
+    def _cache_add(self, cache: VersionedCache, index: int, value: int) -> None:
+        """Apply an add made by this client to the cache - by default it may move any value, so they are dropped"""
+        cache.apply_shift()
+
+    def _cache_remove(self, cache: VersionedCache, index: int) -> None:
+        """Apply a remove made by this client to the cache - by default it may move any value, so they are dropped"""
+        cache.apply_shift()
 
     async def get(self, index: int) -> int:
-        value = await get_value(self.connection, self.identifier, str(index))
-        return value
+        cached_value = self.__cache.get(index)
+        if cached_value is not None and self.__cache.is_fresh:
+            return cached_value
+
+        # The primary only sends the value back if the structure has changed since it was cached
+        response = await get_value(
+            self.connection, self.identifier, str(index), self.__cache.version if cached_value is not None else None
+        )
+        if response.unchanged:
+            self.__cache.validate(response.version)
+            return cached_value
+
+        self.__cache.store(index, response.value, response.version)
+        return response.value
+
+    async def get_many(self, keys: Iterable[int]) -> List[int]:
+        """Values at each of `keys`, in the order given, with a single request to the primary"""
+        return await get_values(self.connection, self.identifier, keys)
+
+    async def _get_range(self, start: int, stop: int) -> Dict[int, int]:
+        return await get_values_in_range(self.connection, self.identifier, start, stop)
+
+    async def replication_queue_depths(self) -> Dict[int, int]:
+        """Mutations each backup, by port, has still to apply from the structure's primary node"""
+        return await get_replication_queue_depths(self.connection)
 
     @abstractmethod
     async def get_all_values(self):
@@ -0,0 +1,67 @@
+import unittest
+
+from client.structures.cache import VersionedCache
+
+
+class TestVersionedCache(unittest.TestCase):
+    def test_values_kept_at_one_version(self):
+        cache = VersionedCache()
+        cache.store(1, 10, version=3)
+        cache.store(2, 20, version=3)
+        self.assertEqual(cache.get(1), 10)
+
+        # A late response from an older version is ignored, and a newer version drops everything read before it
+        cache.store(3, 30, version=2)
+        self.assertIsNone(cache.get(3))
+        cache.store(3, 30, version=4)
+        self.assertEqual(cache.version, 4)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.get(3), 30)
+
+    def test_own_writes(self):
+        cache = VersionedCache()
+        cache.apply_set(1, 10)
+        self.assertIsNone(cache.version)
+
+        cache.store(1, 10, version=1)
+        cache.apply_set(1, 11)
+        cache.apply_set(2, 20)
+        cache.apply_append()
+        self.assertEqual(cache.version, 4)
+        self.assertEqual((cache.get(1), cache.get(2)), (11, 20))
+
+        cache.apply_delete(1)
+        self.assertIsNone(cache.get(1))
+        cache.apply_shift()
+        self.assertEqual(cache.version, 6)
+        self.assertEqual(len(cache), 0)
+
+        cache.clear()
+        self.assertIsNone(cache.version)
+
+    def test_least_recently_used_evicted(self):
+        cache = VersionedCache(max_size=2)
+        cache.store(1, 10, version=1)
+        cache.store(2, 20, version=1)
+        cache.get(1)
+        cache.store(3, 30, version=1)
+        self.assertEqual((cache.get(1), cache.get(2), cache.get(3)), (10, None, 30))
+
+    def test_freshness(self):
+        cache = VersionedCache()
+        cache.store(1, 10, version=1)
+        self.assertFalse(cache.is_fresh)
+
+        cache = VersionedCache(max_staleness=60.0)
+        self.assertFalse(cache.is_fresh)
+        cache.store(1, 10, version=1)
+        self.assertTrue(cache.is_fresh)
+
+        # Being told of a different version than the values were read at does not make them fresh
+        cache.clear()
+        cache.validate(1)
+        self.assertFalse(cache.is_fresh)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,14 +15,26 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rservice.proto\"\xa0\x01\n\x1d\x43reatePrimaryStructureRequest\x12\x1c\n\x04type\x18\x01 \x01(\x0e\x32\x0e.StructureType\x12\x13\n\x0b\x62\x61\x63kupPorts\x18\x02 \x03(\x05\x12\x19\n\x11\x63lusterIdentifier\x18\x03 \x01(\t\x12\x19\n\x11numberOfPrimaries\x18\x04 \x01(\x05\x12\x16\n\x0enumberOfFaults\x18\x05 \x01(\x05\"=\n\x1e\x43reatePrimaryStructureResponse\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\"\xc9\x01\n\x1b\x43reateFusedStructureRequest\x12\x1c\n\x04type\x18\x01 \x01(\x0e\x32\x0e.StructureType\x12\"\n\x1aprimaryStructureIdentifier\x18\x02 \x01(\t\x12\x19\n\x11\x63lusterIdentifier\x18\x03 \x01(\t\x12\x19\n\x11numberOfPrimaries\x18\x04 \x01(\x05\x12\x16\n\x0enumberOfFaults\x18\x05 \x01(\x05\x12\x1a\n\x12\x62\x61\x63kupCodePosition\x18\x06 \x01(\x05\";\n\x1c\x43reateFusedStructureResponse\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\"8\n\x0cValueRequest\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\x12\x0b\n\x03key\x18\x02 \x01(\t\"\x1e\n\rValueResponse\x12\r\n\x05value\x18\x01 \x01(\x05\"/\n\x10\x41llValuesRequest\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\"r\n\x11\x41llValuesResponse\x12.\n\x06values\x18\x01 \x03(\x0b\x32\x1e.AllValuesResponse.ValuesEntry\x1a-\n\x0bValuesEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\xa8\x02\n\x11StructureMutation\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\x12+\n\x0f\x61\x64\x64ValuePayload\x18\x02 \x01(\x0b\x32\x10.AddValuePayloadH\x00\x12\x31\n\x12removeValuePayload\x18\x03 \x01(\x0b\x32\x13.RemoveValuePayloadH\x00\x12\x35\n\x14\x66usedAddValuePayload\x18\x04 \x01(\x0b\x32\x15.FusedAddValuePayloadH\x00\x12;\n\x17\x66usedRemoveValuePayload\x18\x05 \x01(\x0b\x32\x18.FusedRemoveValuePayloadH\x00\x12\x19\n\x11\x63lusterIdentifier\x18\x06 \x01(\tB\x07\n\x05\x65vent\"5\n\x18\x46usedRecoveryDataRequest\x12\x19\n\x11\x63lusterIdentifier\x18\x05 \x01(\t\"U\n\x19\x46usedRecoveryDataResponse\x12\x11\n\tfusedData\x18\x01 \x03(\x05\x12%\n\tindexData\x18\x02 \x03(\x0b\x32\x12.FusedIndexPayload\"-\n\x11\x46usedIndexPayload\x12\x18\n\x10\x66usedDataIndexes\x18\x01 \x03(\x05\"/\n\x0f\x41\x64\x64ValuePayload\x12\r\n\x05index\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05\"#\n\x12RemoveValuePayload\x12\r\n\x05index\x18\x01 \x01(\x05\"X\n\x14\x46usedAddValuePayload\x12\r\n\x05index\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05\x12\x15\n\x08oldValue\x18\x03 \x01(\x05H\x00\x88\x01\x01\x42\x0b\n\t_oldValue\"S\n\x17\x46usedRemoveValuePayload\x12\r\n\x05index\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05\x12\x1a\n\x12valueToReplaceWith\x18\x03 \x01(\x05*:\n\rStructureType\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x08\n\x04LIST\x10\x01\x12\x07\n\x03MAP\x10\x02\x12\t\n\x05QUEUE\x10\x03\x32\x95\x02\n\x14PrimaryDataStructure\x12[\n\x16\x43reatePrimaryStructure\x12\x1e.CreatePrimaryStructureRequest\x1a\x1f.CreatePrimaryStructureResponse\"\x00\x12+\n\x08GetValue\x12\r.ValueRequest\x1a\x0e.ValueResponse\"\x00\x12\x37\n\x0cGetAllValues\x12\x11.AllValuesRequest\x1a\x12.AllValuesResponse\"\x00\x12:\n\x0eMutationStream\x12\x12.StructureMutation\x1a\x12.StructureMutation\"\x00\x32\xf8\x01\n\x12\x46usedDataStructure\x12U\n\x14\x43reateFusedStructure\x12\x1c.CreateFusedStructureRequest\x1a\x1d.CreateFusedStructureResponse\"\x00\x12:\n\x0eMutationStream\x12\x12.StructureMutation\x1a\x12.StructureMutation\"\x00\x12O\n\x14GetFusedRecoveryData\x12\x19.FusedRecoveryDataRequest\x1a\x1a.FusedRecoveryDataResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rservice.proto\"\xf3\x01\n\x1d\x43reatePrimaryStructureRequest\x12\x1c\n\x04type\x18\x01 \x01(\x0e\x32\x0e.StructureType\x12\x13\n\x0b\x62\x61\x63kupPorts\x18\x02 \x03(\x05\x12\x19\n\x11\x63lusterIdentifier\x18\x03 \x01(\t\x12\x19\n\x11numberOfPrimaries\x18\x04 \x01(\x05\x12\x16\n\x0enumberOfFaults\x18\x05 \x01(\x05\x12\x0f\n\x07galoisW\x18\x06 \x01(\x05\x12#\n\x0c\x63odingScheme\x18\x07 \x01(\x0e\x32\r.CodingScheme\x12\x1b\n\x08\x61\x63kLevel\x18\x08 \x01(\x0e\x32\t.AckLevel\"=\n\x1e\x43reatePrimaryStructureResponse\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\"\xff\x01\n\x1b\x43reateFusedStructureRequest\x12\x1c\n\x04type\x18\x01 \x01(\x0e\x32\x0e.StructureType\x12\"\n\x1aprimaryStructureIdentifier\x18\x02 \x01(\t\x12\x19\n\x11\x63lusterIdentifier\x18\x03 \x01(\t\x12\x19\n\x11numberOfPrimaries\x18\x04 \x01(\x05\x12\x16\n\x0enumberOfFaults\x18\x05 \x01(\x05\x12\x1a\n\x12\x62\x61\x63kupCodePosition\x18\x06 \x01(\x05\x12\x0f\n\x07galoisW\x18\x07 \x01(\x05\x12#\n\x0c\x63odingScheme\x18\x08 \x01(\x0e\x32\r.CodingScheme\";\n\x1c\x43reateFusedStructureResponse\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\"f\n\x0cValueRequest\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\x12\x0b\n\x03key\x18\x02 \x01(\t\x12\x1a\n\rcachedVersion\x18\x03 \x01(\x03H\x00\x88\x01\x01\x42\x10\n\x0e_cachedVersion\"B\n\rValueResponse\x12\r\n\x05value\x18\x01 \x01(\x05\x12\x0f\n\x07version\x18\x02 \x01(\x03\x12\x11\n\tunchanged\x18\x03 \x01(\x08\"/\n\x10\x41llValuesRequest\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\"\x83\x01\n\x11\x41llValuesResponse\x12.\n\x06values\x18\x01 \x03(\x0b\x32\x1e.AllValuesResponse.ValuesEntry\x12\x0f\n\x07version\x18\x02 \x01(\x03\x1a-\n\x0bValuesEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\'\n\x08KeyRange\x12\r\n\x05start\x18\x01 \x01(\x05\x12\x0c\n\x04stop\x18\x02 \x01(\x05\"T\n\rValuesRequest\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\x12\x0c\n\x04keys\x18\x02 \x03(\x05\x12\x18\n\x05range\x18\x03 \x01(\x0b\x32\t.KeyRange\"?\n\x0eValuesResponse\x12\x0c\n\x04keys\x18\x01 \x03(\x05\x12\x0e\n\x06values\x18\x02 \x03(\x05\x12\x0f\n\x07version\x18\x03 \x01(\x03\"\xc5\x02\n\x11StructureMutation\x12\x1b\n\x13structureIdentifier\x18\x01 \x01(\t\x12+\n\x0f\x61\x64\x64ValuePayload\x18\x02 \x01(\x0b\x32\x10.AddValuePayloadH\x00\x12\x31\n\x12removeValuePayload\x18\x03 \x01(\x0b\x32\x13.RemoveValuePayloadH\x00\x12\x35\n\x14\x66usedAddValuePayload\x18\x04 \x01(\x0b\x32\x15.FusedAddValuePayloadH\x00\x12;\n\x17\x66usedRemoveValuePayload\x18\x05 \x01(\x0b\x32\x18.FusedRemoveValuePayloadH\x00\x12\x19\n\x11\x63lusterIdentifier\x18\x06 \x01(\t\x12\x1b\n\x08\x61\x63kLevel\x18\x07 \x01(\x0e\x32\t.AckLevelB\x07\n\x05\x65vent\"\x7f\n\x11SequencedMutation\x12\x16\n\x0esequenceNumber\x18\x01 \x01(\x03\x12&\n\x08mutation\x18\x02 \x01(\x0b\x32\x12.StructureMutationH\x00\x12\x1f\n\x05\x62\x61tch\x18\x03 \x01(\x0b\x32\x0e.MutationBatchH\x00\x42\t\n\x07payload\"\x8b\x01\n\rMutationBatch\x12%\n\tmutations\x18\x01 \x03(\x0b\x32\x12.StructureMutation\x12\x1b\n\x08\x61\x63kLevel\x18\x02 \x01(\x0e\x32\t.AckLevel\x12\x19\n\x11replicationSource\x18\x03 \x01(\t\x12\x1b\n\x13replicationSequence\x18\x04 \x01(\x03\"H\n\x15MutationBatchResponse\x12 \n\x18numberOfMutationsApplied\x18\x01 \x01(\x05\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"4\n\x0bMutationAck\x12\x16\n\x0esequenceNumber\x18\x01 \x01(\x03\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\x1f\n\x1dReplicationQueueDepthsRequest\"\x9b\x01\n\x1eReplicationQueueDepthsResponse\x12\x45\n\x0bqueueDepths\x18\x01 \x03(\x0b\x32\x30.ReplicationQueueDepthsResponse.QueueDepthsEntry\x1a\x32\n\x10QueueDepthsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\"}\n\x18\x46usedRecoveryDataRequest\x12\x19\n\x11\x63lusterIdentifier\x18\x05 \x01(\t\x12\x10\n\x08pageSize\x18\x06 \x01(\x05\x12\x11\n\tcodesOnly\x18\x07 \x01(\x08\x12!\n\x19primaryStructurePositions\x18\x08 \x03(\x05\"U\n\x19\x46usedRecoveryDataResponse\x12\x11\n\tfusedData\x18\x01 \x03(\x03\x12%\n\tindexData\x18\x02 \x03(\x0b\x32\x12.FusedIndexPayload\"-\n\x11\x46usedIndexPayload\x12\x18\n\x10\x66usedDataIndexes\x18\x01 \x03(\x05\"`\n\x15\x46usedRecoveryDataPage\x12\x1a\n\x12numberOfFusedNodes\x18\x01 \x01(\x05\x12\x11\n\tfusedData\x18\x02 \x03(\x03\x12\x18\n\x10\x66usedDataIndexes\x18\x03 \x03(\x05\"/\n\x0f\x41\x64\x64ValuePayload\x12\r\n\x05index\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05\"#\n\x12RemoveValuePayload\x12\r\n\x05index\x18\x01 \x01(\x05\"X\n\x14\x46usedAddValuePayload\x12\r\n\x05index\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05\x12\x15\n\x08oldValue\x18\x03 \x01(\x05H\x00\x88\x01\x01\x42\x0b\n\t_oldValue\"S\n\x17\x46usedRemoveValuePayload\x12\r\n\x05index\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05\x12\x1a\n\x12valueToReplaceWith\x18\x03 \x01(\x05*:\n\rStructureType\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x08\n\x04LIST\x10\x01\x12\x07\n\x03MAP\x10\x02\x12\t\n\x05QUEUE\x10\x03*<\n\x0c\x43odingScheme\x12\x0f\n\x0bVANDERMONDE\x10\x00\x12\n\n\x06\x43\x41UCHY\x10\x01\x12\x0f\n\x0b\x43\x41UCHY_GOOD\x10\x02*e\n\x08\x41\x63kLevel\x12\x0f\n\x0b\x41\x43K_DEFAULT\x10\x00\x12\x13\n\x0f\x41\x43K_ALL_BACKUPS\x10\x01\x12\r\n\tACK_LOCAL\x10\x02\x12\x14\n\x10\x41\x43K_FIRST_BACKUP\x10\x03\x12\x0e\n\nACK_QUORUM\x10\x04\x32\xa0\x04\n\x14PrimaryDataStructure\x12[\n\x16\x43reatePrimaryStructure\x12\x1e.CreatePrimaryStructureRequest\x1a\x1f.CreatePrimaryStructureResponse\"\x00\x12+\n\x08GetValue\x12\r.ValueRequest\x1a\x0e.ValueResponse\"\x00\x12\x37\n\x0cGetAllValues\x12\x11.AllValuesRequest\x1a\x12.AllValuesResponse\"\x00\x12.\n\tGetValues\x12\x0e.ValuesRequest\x1a\x0f.ValuesResponse\"\x00\x12:\n\x0eMutationStream\x12\x12.StructureMutation\x1a\x12.StructureMutation\"\x00\x12\x39\n\x0fMutationChannel\x12\x12.SequencedMutation\x1a\x0c.MutationAck\"\x00(\x01\x30\x01\x12>\n\x12\x41pplyMutationBatch\x12\x0e.MutationBatch\x1a\x16.MutationBatchResponse\"\x00\x12^\n\x19GetReplicationQueueDepths\x12\x1e.ReplicationQueueDepthsRequest\x1a\x1f.ReplicationQueueDepthsResponse\"\x00\x32\x85\x03\n\x12\x46usedDataStructure\x12U\n\x14\x43reateFusedStructure\x12\x1c.CreateFusedStructureRequest\x1a\x1d.CreateFusedStructureResponse\"\x00\x12:\n\x0eMutationStream\x12\x12.StructureMutation\x1a\x12.StructureMutation\"\x00\x12\x39\n\x0fMutationChannel\x12\x12.SequencedMutation\x1a\x0c.MutationAck\"\x00(\x01\x30\x01\x12O\n\x14GetFusedRecoveryData\x12\x19.FusedRecoveryDataRequest\x1a\x1a.FusedRecoveryDataResponse\"\x00\x12P\n\x17StreamFusedRecoveryData\x12\x19.FusedRecoveryDataRequest\x1a\x16.FusedRecoveryDataPage\"\x00\x30\x01\x62\x06proto3')
 
 _STRUCTURETYPE = DESCRIPTOR.enum_types_by_name['StructureType']
 StructureType = enum_type_wrapper.EnumTypeWrapper(_STRUCTURETYPE)
+_CODINGSCHEME = DESCRIPTOR.enum_types_by_name['CodingScheme']
+CodingScheme = enum_type_wrapper.EnumTypeWrapper(_CODINGSCHEME)
+_ACKLEVEL = DESCRIPTOR.enum_types_by_name['AckLevel']
+AckLevel = enum_type_wrapper.EnumTypeWrapper(_ACKLEVEL)
 UNKNOWN = 0
 LIST = 1
 MAP = 2
 QUEUE = 3
+VANDERMONDE = 0
+CAUCHY = 1
+CAUCHY_GOOD = 2
+ACK_DEFAULT = 0
+ACK_ALL_BACKUPS = 1
+ACK_LOCAL = 2
+ACK_FIRST_BACKUP = 3
+ACK_QUORUM = 4
 
 
 _CREATEPRIMARYSTRUCTUREREQUEST = DESCRIPTOR.message_types_by_name['CreatePrimaryStructureRequest']
@@ -34,10 +46,21 @@ _VALUERESPONSE = DESCRIPTOR.message_types_by_name['ValueResponse']
 _ALLVALUESREQUEST = DESCRIPTOR.message_types_by_name['AllValuesRequest']
 _ALLVALUESRESPONSE = DESCRIPTOR.message_types_by_name['AllValuesResponse']
 _ALLVALUESRESPONSE_VALUESENTRY = _ALLVALUESRESPONSE.nested_types_by_name['ValuesEntry']
+_KEYRANGE = DESCRIPTOR.message_types_by_name['KeyRange']
+_VALUESREQUEST = DESCRIPTOR.message_types_by_name['ValuesRequest']
+_VALUESRESPONSE = DESCRIPTOR.message_types_by_name['ValuesResponse']
 _STRUCTUREMUTATION = DESCRIPTOR.message_types_by_name['StructureMutation']
+_SEQUENCEDMUTATION = DESCRIPTOR.message_types_by_name['SequencedMutation']
+_MUTATIONBATCH = DESCRIPTOR.message_types_by_name['MutationBatch']
+_MUTATIONBATCHRESPONSE = DESCRIPTOR.message_types_by_name['MutationBatchResponse']
+_MUTATIONACK = DESCRIPTOR.message_types_by_name['MutationAck']
+_REPLICATIONQUEUEDEPTHSREQUEST = DESCRIPTOR.message_types_by_name['ReplicationQueueDepthsRequest']
+_REPLICATIONQUEUEDEPTHSRESPONSE = DESCRIPTOR.message_types_by_name['ReplicationQueueDepthsResponse']
+_REPLICATIONQUEUEDEPTHSRESPONSE_QUEUEDEPTHSENTRY = _REPLICATIONQUEUEDEPTHSRESPONSE.nested_types_by_name['QueueDepthsEntry']
 _FUSEDRECOVERYDATAREQUEST = DESCRIPTOR.message_types_by_name['FusedRecoveryDataRequest']
 _FUSEDRECOVERYDATARESPONSE = DESCRIPTOR.message_types_by_name['FusedRecoveryDataResponse']
 _FUSEDINDEXPAYLOAD = DESCRIPTOR.message_types_by_name['FusedIndexPayload']
+_FUSEDRECOVERYDATAPAGE = DESCRIPTOR.message_types_by_name['FusedRecoveryDataPage']
 _ADDVALUEPAYLOAD = DESCRIPTOR.message_types_by_name['AddValuePayload']
 _REMOVEVALUEPAYLOAD = DESCRIPTOR.message_types_by_name['RemoveValuePayload']
 _FUSEDADDVALUEPAYLOAD = DESCRIPTOR.message_types_by_name['FusedAddValuePayload']
@@ -106,6 +129,27 @@ AllValuesResponse = _reflection.GeneratedProtocolMessageType('AllValuesResponse'
 _sym_db.RegisterMessage(AllValuesResponse)
 _sym_db.RegisterMessage(AllValuesResponse.ValuesEntry)
 
+KeyRange = _reflection.GeneratedProtocolMessageType('KeyRange', (_message.Message,), {
+  'DESCRIPTOR' : _KEYRANGE,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:KeyRange)
+  })
+_sym_db.RegisterMessage(KeyRange)
+
+ValuesRequest = _reflection.GeneratedProtocolMessageType('ValuesRequest', (_message.Message,), {
+  'DESCRIPTOR' : _VALUESREQUEST,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:ValuesRequest)
+  })
+_sym_db.RegisterMessage(ValuesRequest)
+
+ValuesResponse = _reflection.GeneratedProtocolMessageType('ValuesResponse', (_message.Message,), {
+  'DESCRIPTOR' : _VALUESRESPONSE,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:ValuesResponse)
+  })
+_sym_db.RegisterMessage(ValuesResponse)
+
 StructureMutation = _reflection.GeneratedProtocolMessageType('StructureMutation', (_message.Message,), {
   'DESCRIPTOR' : _STRUCTUREMUTATION,
   '__module__' : 'service_pb2'
@@ -113,6 +157,56 @@ StructureMutation = _reflection.GeneratedProtocolMessageType('StructureMutation'
   })
 _sym_db.RegisterMessage(StructureMutation)
 
+SequencedMutation = _reflection.GeneratedProtocolMessageType('SequencedMutation', (_message.Message,), {
+  'DESCRIPTOR' : _SEQUENCEDMUTATION,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:SequencedMutation)
+  })
+_sym_db.RegisterMessage(SequencedMutation)
+
+MutationBatch = _reflection.GeneratedProtocolMessageType('MutationBatch', (_message.Message,), {
+  'DESCRIPTOR' : _MUTATIONBATCH,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:MutationBatch)
+  })
+_sym_db.RegisterMessage(MutationBatch)
+
+MutationBatchResponse = _reflection.GeneratedProtocolMessageType('MutationBatchResponse', (_message.Message,), {
+  'DESCRIPTOR' : _MUTATIONBATCHRESPONSE,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:MutationBatchResponse)
+  })
+_sym_db.RegisterMessage(MutationBatchResponse)
+
+MutationAck = _reflection.GeneratedProtocolMessageType('MutationAck', (_message.Message,), {
+  'DESCRIPTOR' : _MUTATIONACK,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:MutationAck)
+  })
+_sym_db.RegisterMessage(MutationAck)
+
+ReplicationQueueDepthsRequest = _reflection.GeneratedProtocolMessageType('ReplicationQueueDepthsRequest', (_message.Message,), {
+  'DESCRIPTOR' : _REPLICATIONQUEUEDEPTHSREQUEST,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:ReplicationQueueDepthsRequest)
+  })
+_sym_db.RegisterMessage(ReplicationQueueDepthsRequest)
+
+ReplicationQueueDepthsResponse = _reflection.GeneratedProtocolMessageType('ReplicationQueueDepthsResponse', (_message.Message,), {
+
+  'QueueDepthsEntry' : _reflection.GeneratedProtocolMessageType('QueueDepthsEntry', (_message.Message,), {
+    'DESCRIPTOR' : _REPLICATIONQUEUEDEPTHSRESPONSE_QUEUEDEPTHSENTRY,
+    '__module__' : 'service_pb2'
+    # @@protoc_insertion_point(class_scope:ReplicationQueueDepthsResponse.QueueDepthsEntry)
+    })
+  ,
+  'DESCRIPTOR' : _REPLICATIONQUEUEDEPTHSRESPONSE,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:ReplicationQueueDepthsResponse)
+  })
+_sym_db.RegisterMessage(ReplicationQueueDepthsResponse)
+_sym_db.RegisterMessage(ReplicationQueueDepthsResponse.QueueDepthsEntry)
+
 FusedRecoveryDataRequest = _reflection.GeneratedProtocolMessageType('FusedRecoveryDataRequest', (_message.Message,), {
   'DESCRIPTOR' : _FUSEDRECOVERYDATAREQUEST,
   '__module__' : 'service_pb2'
@@ -134,6 +228,13 @@ FusedIndexPayload = _reflection.GeneratedProtocolMessageType('FusedIndexPayload'
   })
 _sym_db.RegisterMessage(FusedIndexPayload)
 
+FusedRecoveryDataPage = _reflection.GeneratedProtocolMessageType('FusedRecoveryDataPage', (_message.Message,), {
+  'DESCRIPTOR' : _FUSEDRECOVERYDATAPAGE,
+  '__module__' : 'service_pb2'
+  # @@protoc_insertion_point(class_scope:FusedRecoveryDataPage)
+  })
+_sym_db.RegisterMessage(FusedRecoveryDataPage)
+
 AddValuePayload = _reflection.GeneratedProtocolMessageType('AddValuePayload', (_message.Message,), {
   'DESCRIPTOR' : _ADDVALUEPAYLOAD,
   '__module__' : 'service_pb2'
@@ -169,44 +270,72 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
   _ALLVALUESRESPONSE_VALUESENTRY._options = None
   _ALLVALUESRESPONSE_VALUESENTRY._serialized_options = b'8\001'
-  _STRUCTURETYPE._serialized_start=1512
-  _STRUCTURETYPE._serialized_end=1570
+  _REPLICATIONQUEUEDEPTHSRESPONSE_QUEUEDEPTHSENTRY._options = None
+  _REPLICATIONQUEUEDEPTHSRESPONSE_QUEUEDEPTHSENTRY._serialized_options = b'8\001'
+  _STRUCTURETYPE._serialized_start=2730
+  _STRUCTURETYPE._serialized_end=2788
+  _CODINGSCHEME._serialized_start=2790
+  _CODINGSCHEME._serialized_end=2850
+  _ACKLEVEL._serialized_start=2852
+  _ACKLEVEL._serialized_end=2953
   _CREATEPRIMARYSTRUCTUREREQUEST._serialized_start=18
-  _CREATEPRIMARYSTRUCTUREREQUEST._serialized_end=178
-  _CREATEPRIMARYSTRUCTURERESPONSE._serialized_start=180
-  _CREATEPRIMARYSTRUCTURERESPONSE._serialized_end=241
-  _CREATEFUSEDSTRUCTUREREQUEST._serialized_start=244
-  _CREATEFUSEDSTRUCTUREREQUEST._serialized_end=445
-  _CREATEFUSEDSTRUCTURERESPONSE._serialized_start=447
-  _CREATEFUSEDSTRUCTURERESPONSE._serialized_end=506
-  _VALUEREQUEST._serialized_start=508
-  _VALUEREQUEST._serialized_end=564
-  _VALUERESPONSE._serialized_start=566
-  _VALUERESPONSE._serialized_end=596
-  _ALLVALUESREQUEST._serialized_start=598
-  _ALLVALUESREQUEST._serialized_end=645
-  _ALLVALUESRESPONSE._serialized_start=647
-  _ALLVALUESRESPONSE._serialized_end=761
-  _ALLVALUESRESPONSE_VALUESENTRY._serialized_start=716
-  _ALLVALUESRESPONSE_VALUESENTRY._serialized_end=761
-  _STRUCTUREMUTATION._serialized_start=764
-  _STRUCTUREMUTATION._serialized_end=1060
-  _FUSEDRECOVERYDATAREQUEST._serialized_start=1062
-  _FUSEDRECOVERYDATAREQUEST._serialized_end=1115
-  _FUSEDRECOVERYDATARESPONSE._serialized_start=1117
-  _FUSEDRECOVERYDATARESPONSE._serialized_end=1202
-  _FUSEDINDEXPAYLOAD._serialized_start=1204
-  _FUSEDINDEXPAYLOAD._serialized_end=1249
-  _ADDVALUEPAYLOAD._serialized_start=1251
-  _ADDVALUEPAYLOAD._serialized_end=1298
-  _REMOVEVALUEPAYLOAD._serialized_start=1300
-  _REMOVEVALUEPAYLOAD._serialized_end=1335
-  _FUSEDADDVALUEPAYLOAD._serialized_start=1337
-  _FUSEDADDVALUEPAYLOAD._serialized_end=1425
-  _FUSEDREMOVEVALUEPAYLOAD._serialized_start=1427
-  _FUSEDREMOVEVALUEPAYLOAD._serialized_end=1510
-  _PRIMARYDATASTRUCTURE._serialized_start=1573
-  _PRIMARYDATASTRUCTURE._serialized_end=1850
-  _FUSEDDATASTRUCTURE._serialized_start=1853
-  _FUSEDDATASTRUCTURE._serialized_end=2101
+  _CREATEPRIMARYSTRUCTUREREQUEST._serialized_end=261
+  _CREATEPRIMARYSTRUCTURERESPONSE._serialized_start=263
+  _CREATEPRIMARYSTRUCTURERESPONSE._serialized_end=324
+  _CREATEFUSEDSTRUCTUREREQUEST._serialized_start=327
+  _CREATEFUSEDSTRUCTUREREQUEST._serialized_end=582
+  _CREATEFUSEDSTRUCTURERESPONSE._serialized_start=584
+  _CREATEFUSEDSTRUCTURERESPONSE._serialized_end=643
+  _VALUEREQUEST._serialized_start=645
+  _VALUEREQUEST._serialized_end=747
+  _VALUERESPONSE._serialized_start=749
+  _VALUERESPONSE._serialized_end=815
+  _ALLVALUESREQUEST._serialized_start=817
+  _ALLVALUESREQUEST._serialized_end=864
+  _ALLVALUESRESPONSE._serialized_start=867
+  _ALLVALUESRESPONSE._serialized_end=998
+  _ALLVALUESRESPONSE_VALUESENTRY._serialized_start=953
+  _ALLVALUESRESPONSE_VALUESENTRY._serialized_end=998
+  _KEYRANGE._serialized_start=1000
+  _KEYRANGE._serialized_end=1039
+  _VALUESREQUEST._serialized_start=1041
+  _VALUESREQUEST._serialized_end=1125
+  _VALUESRESPONSE._serialized_start=1127
+  _VALUESRESPONSE._serialized_end=1190
+  _STRUCTUREMUTATION._serialized_start=1193
+  _STRUCTUREMUTATION._serialized_end=1518
+  _SEQUENCEDMUTATION._serialized_start=1520
+  _SEQUENCEDMUTATION._serialized_end=1647
+  _MUTATIONBATCH._serialized_start=1650
+  _MUTATIONBATCH._serialized_end=1789
+  _MUTATIONBATCHRESPONSE._serialized_start=1791
+  _MUTATIONBATCHRESPONSE._serialized_end=1863
+  _MUTATIONACK._serialized_start=1865
+  _MUTATIONACK._serialized_end=1917
+  _REPLICATIONQUEUEDEPTHSREQUEST._serialized_start=1919
+  _REPLICATIONQUEUEDEPTHSREQUEST._serialized_end=1950
+  _REPLICATIONQUEUEDEPTHSRESPONSE._serialized_start=1953
+  _REPLICATIONQUEUEDEPTHSRESPONSE._serialized_end=2108
+  _REPLICATIONQUEUEDEPTHSRESPONSE_QUEUEDEPTHSENTRY._serialized_start=2058
+  _REPLICATIONQUEUEDEPTHSRESPONSE_QUEUEDEPTHSENTRY._serialized_end=2108
+  _FUSEDRECOVERYDATAREQUEST._serialized_start=2110
+  _FUSEDRECOVERYDATAREQUEST._serialized_end=2235
+  _FUSEDRECOVERYDATARESPONSE._serialized_start=2237
+  _FUSEDRECOVERYDATARESPONSE._serialized_end=2322
+  _FUSEDINDEXPAYLOAD._serialized_start=2324
+  _FUSEDINDEXPAYLOAD._serialized_end=2369
+  _FUSEDRECOVERYDATAPAGE._serialized_start=2371
+  _FUSEDRECOVERYDATAPAGE._serialized_end=2467
+  _ADDVALUEPAYLOAD._serialized_start=2469
+  _ADDVALUEPAYLOAD._serialized_end=2516
+  _REMOVEVALUEPAYLOAD._serialized_start=2518
+  _REMOVEVALUEPAYLOAD._serialized_end=2553
+  _FUSEDADDVALUEPAYLOAD._serialized_start=2555
+  _FUSEDADDVALUEPAYLOAD._serialized_end=2643
+  _FUSEDREMOVEVALUEPAYLOAD._serialized_start=2645
+  _FUSEDREMOVEVALUEPAYLOAD._serialized_end=2728
+  _PRIMARYDATASTRUCTURE._serialized_start=2956
+  _PRIMARYDATASTRUCTURE._serialized_end=3500
+  _FUSEDDATASTRUCTURE._serialized_start=3503
+  _FUSEDDATASTRUCTURE._serialized_end=3892
 # @@protoc_insertion_point(module_scope)
@@ -30,11 +30,31 @@ class PrimaryDataStructureStub(object):
                 request_serializer=service__pb2.AllValuesRequest.SerializeToString,
                 response_deserializer=service__pb2.AllValuesResponse.FromString,
                 )
+        self.GetValues = channel.unary_unary(
+                '/PrimaryDataStructure/GetValues',
+                request_serializer=service__pb2.ValuesRequest.SerializeToString,
+                response_deserializer=service__pb2.ValuesResponse.FromString,
+                )
         self.MutationStream = channel.unary_unary(
                 '/PrimaryDataStructure/MutationStream',
                 request_serializer=service__pb2.StructureMutation.SerializeToString,
                 response_deserializer=service__pb2.StructureMutation.FromString,
                 )
+        self.MutationChannel = channel.stream_stream(
+                '/PrimaryDataStructure/MutationChannel',
+                request_serializer=service__pb2.SequencedMutation.SerializeToString,
+                response_deserializer=service__pb2.MutationAck.FromString,
+                )
+        self.ApplyMutationBatch = channel.unary_unary(
+                '/PrimaryDataStructure/ApplyMutationBatch',
+                request_serializer=service__pb2.MutationBatch.SerializeToString,
+                response_deserializer=service__pb2.MutationBatchResponse.FromString,
+                )
+        self.GetReplicationQueueDepths = channel.unary_unary(
+                '/PrimaryDataStructure/GetReplicationQueueDepths',
+                request_serializer=service__pb2.ReplicationQueueDepthsRequest.SerializeToString,
+                response_deserializer=service__pb2.ReplicationQueueDepthsResponse.FromString,
+                )
 
 
 class PrimaryDataStructureServicer(object):
@@ -62,6 +82,13 @@ class PrimaryDataStructureServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetValues(self, request, context):
+        """A request for the values at a list of keys, or in a range of keys, stored in a primary data structure
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def MutationStream(self, request, context):
         """Mutations to a primary data structure
         """
@@ -69,6 +96,27 @@ class PrimaryDataStructureServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def MutationChannel(self, request_iterator, context):
+        """Long-lived stream of mutations to primary data structures, applied in order and each acknowledged in turn
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ApplyMutationBatch(self, request, context):
+        """Mutations to primary data structures, applied in order and sent on to the backups together
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetReplicationQueueDepths(self, request, context):
+        """A request for how many mutations each backup of the node has still to apply
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_PrimaryDataStructureServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -87,11 +135,31 @@ def add_PrimaryDataStructureServicer_to_server(servicer, server):
                     request_deserializer=service__pb2.AllValuesRequest.FromString,
                     response_serializer=service__pb2.AllValuesResponse.SerializeToString,
             ),
+            'GetValues': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetValues,
+                    request_deserializer=service__pb2.ValuesRequest.FromString,
+                    response_serializer=service__pb2.ValuesResponse.SerializeToString,
+            ),
             'MutationStream': grpc.unary_unary_rpc_method_handler(
                     servicer.MutationStream,
                     request_deserializer=service__pb2.StructureMutation.FromString,
                     response_serializer=service__pb2.StructureMutation.SerializeToString,
             ),
+            'MutationChannel': grpc.stream_stream_rpc_method_handler(
+                    servicer.MutationChannel,
+                    request_deserializer=service__pb2.SequencedMutation.FromString,
+                    response_serializer=service__pb2.MutationAck.SerializeToString,
+            ),
+            'ApplyMutationBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.ApplyMutationBatch,
+                    request_deserializer=service__pb2.MutationBatch.FromString,
+                    response_serializer=service__pb2.MutationBatchResponse.SerializeToString,
+            ),
+            'GetReplicationQueueDepths': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetReplicationQueueDepths,
+                    request_deserializer=service__pb2.ReplicationQueueDepthsRequest.FromString,
+                    response_serializer=service__pb2.ReplicationQueueDepthsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'PrimaryDataStructure', rpc_method_handlers)
@@ -154,6 +222,23 @@ class PrimaryDataStructure(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def GetValues(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/PrimaryDataStructure/GetValues',
+            service__pb2.ValuesRequest.SerializeToString,
+            service__pb2.ValuesResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def MutationStream(request,
             target,
@@ -171,6 +256,57 @@ class PrimaryDataStructure(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def MutationChannel(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/PrimaryDataStructure/MutationChannel',
+            service__pb2.SequencedMutation.SerializeToString,
+            service__pb2.MutationAck.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ApplyMutationBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/PrimaryDataStructure/ApplyMutationBatch',
+            service__pb2.MutationBatch.SerializeToString,
+            service__pb2.MutationBatchResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetReplicationQueueDepths(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/PrimaryDataStructure/GetReplicationQueueDepths',
+            service__pb2.ReplicationQueueDepthsRequest.SerializeToString,
+            service__pb2.ReplicationQueueDepthsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
 
 class FusedDataStructureStub(object):
     """Communication to structures on a backup node
@@ -192,11 +328,21 @@ class FusedDataStructureStub(object):
                 request_serializer=service__pb2.StructureMutation.SerializeToString,
                 response_deserializer=service__pb2.StructureMutation.FromString,
                 )
+        self.MutationChannel = channel.stream_stream(
+                '/FusedDataStructure/MutationChannel',
+                request_serializer=service__pb2.SequencedMutation.SerializeToString,
+                response_deserializer=service__pb2.MutationAck.FromString,
+                )
         self.GetFusedRecoveryData = channel.unary_unary(
                 '/FusedDataStructure/GetFusedRecoveryData',
                 request_serializer=service__pb2.FusedRecoveryDataRequest.SerializeToString,
                 response_deserializer=service__pb2.FusedRecoveryDataResponse.FromString,
                 )
+        self.StreamFusedRecoveryData = channel.unary_stream(
+                '/FusedDataStructure/StreamFusedRecoveryData',
+                request_serializer=service__pb2.FusedRecoveryDataRequest.SerializeToString,
+                response_deserializer=service__pb2.FusedRecoveryDataPage.FromString,
+                )
 
 
 class FusedDataStructureServicer(object):
@@ -217,6 +363,13 @@ class FusedDataStructureServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def MutationChannel(self, request_iterator, context):
+        """Long-lived stream of mutations to fused data structures, applied in order and each acknowledged in turn
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetFusedRecoveryData(self, request, context):
         """A request for all data stored that is used in recovery
         """
@@ -224,6 +377,13 @@ class FusedDataStructureServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamFusedRecoveryData(self, request, context):
+        """The same data as GetFusedRecoveryData, in pages of fused nodes that are each bounded in size
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_FusedDataStructureServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -237,11 +397,21 @@ def add_FusedDataStructureServicer_to_server(servicer, server):
                     request_deserializer=service__pb2.StructureMutation.FromString,
                     response_serializer=service__pb2.StructureMutation.SerializeToString,
             ),
+            'MutationChannel': grpc.stream_stream_rpc_method_handler(
+                    servicer.MutationChannel,
+                    request_deserializer=service__pb2.SequencedMutation.FromString,
+                    response_serializer=service__pb2.MutationAck.SerializeToString,
+            ),
             'GetFusedRecoveryData': grpc.unary_unary_rpc_method_handler(
                     servicer.GetFusedRecoveryData,
                     request_deserializer=service__pb2.FusedRecoveryDataRequest.FromString,
                     response_serializer=service__pb2.FusedRecoveryDataResponse.SerializeToString,
             ),
+            'StreamFusedRecoveryData': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamFusedRecoveryData,
+                    request_deserializer=service__pb2.FusedRecoveryDataRequest.FromString,
+                    response_serializer=service__pb2.FusedRecoveryDataPage.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'FusedDataStructure', rpc_method_handlers)
@@ -287,6 +457,23 @@ class FusedDataStructure(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def MutationChannel(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/FusedDataStructure/MutationChannel',
+            service__pb2.SequencedMutation.SerializeToString,
+            service__pb2.MutationAck.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def GetFusedRecoveryData(request,
             target,
@@ -303,3 +490,20 @@ class FusedDataStructure(object):
             service__pb2.FusedRecoveryDataResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamFusedRecoveryData(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/FusedDataStructure/StreamFusedRecoveryData',
+            service__pb2.FusedRecoveryDataRequest.SerializeToString,
+            service__pb2.FusedRecoveryDataPage.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,257 @@
+import asyncio
+import functools
+import logging
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from protos.service_pb2 import MutationBatch, StructureMutation
+from servers.backup.connection import BackupStructureConnection
+from shared.mutation_channel import MutationRejected
+
+# Most mutations sent to a backup in a single batch
+MAX_BATCH_SIZE = 256
+# Longest a mutation is held back waiting for its batch to fill, in seconds
+MAX_BATCH_DELAY = 0.002
+# Most mutations left waiting for a backup to apply them before new writes are held back
+MAX_QUEUE_DEPTH = 8192
+# Seconds between attempts to send a backup the batches it did not acknowledge before its stream broke
+RESEND_INTERVAL = 0.5
+
+
+class MutationBatcher:
+    """
+    Write-behind replication queue of the mutations sent to one backup by every structure on this node, drained in
+    order by a single background task. Mutations are coalesced into batches: a batch is sent straight away while
+    nothing else is waiting on the backup, and otherwise collects mutations until the backup acknowledges what it was
+    sent, the batch is full or `max_delay` has passed - so batching only ever delays a mutation while the backup is busy.
+
+    Batches are kept until the backup acknowledges them, however far behind it falls. Those left unacknowledged when
+    its stream breaks are sent again in order, every `resend_interval` seconds until the backup answers, and carry
+    their place in the queue so that the backup applies each of them once. A backup that answers by refusing a batch
+    is missing updates, so it is marked as failed and everything sent to it fails too, until `recover` starts the
+    queue afresh.
+
+    Instead of the queue growing without limit, writers are expected to wait for room first, which there is while
+    fewer than `max_queue_depth` mutations are waiting on the backup
+    """
+
+    def __init__(
+        self,
+        connection: BackupStructureConnection,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_delay: float = MAX_BATCH_DELAY,
+        max_queue_depth: int = MAX_QUEUE_DEPTH,
+        resend_interval: float = RESEND_INTERVAL
+    ):
+        self.__connection = connection
+        self.__max_batch_size = max_batch_size
+        self.__max_delay = max_delay
+        self.__max_queue_depth = max_queue_depth
+        self.__resend_interval = resend_interval
+
+        self.__source = str(uuid4())
+        self.__next_sequence_number = 0
+        self.__batch: List[StructureMutation] = []
+        self.__batch_applied: Optional[asyncio.Future] = None
+        self.__delayed_flush: Optional[asyncio.TimerHandle] = None
+        self.__queue_depth = 0
+        self.__room = asyncio.Event()
+        self.__room.set()
+        self.__failure: Optional[str] = None
+
+        # Batches waiting to be sent, and those sent that the backup has not acknowledged, each in order
+        self.__outgoing: Deque[Tuple[MutationBatch, asyncio.Future]] = deque()
+        self.__unacknowledged: Deque[Tuple[MutationBatch, asyncio.Future]] = deque()
+        self.__resend_needed = False
+        self.__work = asyncio.Event()
+        self.__sender: Optional[asyncio.Task] = None
+
+    @property
+    def backup_port(self) -> int:
+        return self.__connection.backup_port
+
+    @property
+    def failed(self) -> bool:
+        """Whether the backup refused a batch, so that nothing more is sent to it until it is recovered"""
+        return self.__failure is not None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of mutations queued for, or sent to, the backup that it has not answered for yet"""
+        return self.__queue_depth
+
+    async def wait_for_room(self, timeout: Optional[float] = None) -> None:
+        """Wait until the backup has few enough mutations waiting on it to take more, for at most `timeout` seconds"""
+        if self.__failure is not None:
+            raise Exception(self.__failure)
+
+        try:
+            await asyncio.wait_for(self.__room.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise Exception(
+                f"Backup node on port {self.backup_port} is lagging with {self.__queue_depth} mutations waiting on it"
+            )
+
+        if self.__failure is not None:
+            raise Exception(self.__failure)
+
+    def submit(self, mutations: Iterable[StructureMutation]) -> asyncio.Future:
+        """Queue mutations to go to the backup together, returning a future completed once it has applied them"""
+        if self.__failure is not None:
+            failed = asyncio.get_running_loop().create_future()
+            failed.set_exception(Exception(self.__failure))
+            return failed
+
+        if not self.__batch:
+            self.__batch_applied = asyncio.get_running_loop().create_future()
+
+        number_of_mutations = len(self.__batch)
+        self.__batch.extend(mutations)
+        self.__add_to_queue_depth(len(self.__batch) - number_of_mutations)
+        batch_applied = self.__batch_applied
+
+        if not self.__is_busy() or len(self.__batch) >= self.__max_batch_size:
+            self.__flush()
+        elif self.__delayed_flush is None:
+            self.__delayed_flush = asyncio.get_running_loop().call_later(self.__max_delay, self.__flush)
+
+        # Every mutation in the batch waits on the same future, so one caller giving up must not cancel it for the rest
+        return asyncio.shield(batch_applied)
+
+    async def send(self, mutations: Iterable[StructureMutation]) -> None:
+        """Queue mutations to go to the backup together, returning once it has applied them"""
+        await self.submit(mutations)
+
+    async def close(self) -> None:
+        if self.__delayed_flush is not None:
+            self.__delayed_flush.cancel()
+            self.__delayed_flush = None
+        if self.__sender is not None:
+            self.__sender.cancel()
+
+    def recover(self) -> None:
+        """
+        Start sending to a failed backup again, under a new replication source so that it takes the next batch as the
+        first. Whatever it refused, and whatever failed along with it, stays missing until the structures are recovered
+        """
+        if self.__failure is None:
+            return
+
+        logging.info(f"Replicating to backup node on port {self.backup_port} again")
+        self.__source = str(uuid4())
+        self.__next_sequence_number = 0
+        self.__resend_needed = False
+        self.__failure = None
+        # The old sender stops on the failure, if it has not already, and the next flush starts a new one
+        if self.__sender is not None:
+            self.__sender.cancel()
+            self.__sender = None
+
+    def __is_busy(self) -> bool:
+        return bool(self.__outgoing or self.__unacknowledged)
+
+    def __flush(self) -> None:
+        if self.__delayed_flush is not None:
+            self.__delayed_flush.cancel()
+            self.__delayed_flush = None
+
+        if not self.__batch:
+            return
+
+        batch = MutationBatch(
+            mutations=self.__batch,
+            replicationSource=self.__source,
+            replicationSequence=self.__next_sequence_number
+        )
+        self.__next_sequence_number += 1
+        self.__outgoing.append((batch, self.__batch_applied))
+        self.__batch = []
+        self.__batch_applied = None
+        self.__work.set()
+
+        if self.__sender is None:
+            self.__sender = asyncio.ensure_future(self.__send_batches())
+
+    async def __send_batches(self) -> None:
+        # Batches are submitted by this one task, so they reach the backup in the order they were flushed
+        while self.__failure is None:
+            if self.__resend_needed:
+                # Give the connection time to come back, rather than failing again straight away
+                await asyncio.sleep(self.__resend_interval)
+                self.__resend_needed = False
+
+                # Anything not acknowledged goes again, ahead of the batches not sent yet and in the order first sent
+                for batch, batch_applied in list(self.__unacknowledged):
+                    if self.__failure is None and not batch_applied.done():
+                        await self.__submit(batch, batch_applied)
+            elif self.__outgoing:
+                batch, batch_applied = self.__outgoing.popleft()
+                self.__unacknowledged.append((batch, batch_applied))
+                await self.__submit(batch, batch_applied)
+            else:
+                self.__work.clear()
+                await self.__work.wait()
+
+    async def __submit(self, batch: MutationBatch, batch_applied: asyncio.Future) -> None:
+        try:
+            acknowledged = await self.__connection.mutations.submit(batch)
+        except Exception as e:
+            acknowledged = asyncio.get_running_loop().create_future()
+            acknowledged.set_exception(e)
+
+        acknowledged.add_done_callback(functools.partial(self.__finish_batch, batch, batch_applied))
+
+    def __finish_batch(self, batch: MutationBatch, batch_applied: asyncio.Future, acknowledged: asyncio.Future) -> None:
+        # Acknowledged over an earlier attempt already, or failed along with the backup
+        if batch_applied.done():
+            return
+
+        error = Exception("Batch cancelled") if acknowledged.cancelled() else acknowledged.exception()
+        if error is None:
+            self.__unacknowledged.remove((batch, batch_applied))
+            self.__add_to_queue_depth(-len(batch.mutations))
+            batch_applied.set_result(None)
+
+            # Mutations held back while the backup was busy can be sent now
+            if not self.__is_busy():
+                self.__flush()
+        elif isinstance(error, MutationRejected):
+            self.__fail(error)
+        elif not self.__resend_needed:
+            # The stream broke before the backup answered, so the batch goes again once there is a new one
+            logging.info(f"Resending unacknowledged mutations to backup node on port {self.backup_port} after: {error}")
+            self.__resend_needed = True
+            self.__work.set()
+
+    def __fail(self, error: Exception) -> None:
+        """Give up on a backup that refused a batch, as every later mutation would leave its codes further adrift"""
+        self.__failure = f"Backup node on port {self.backup_port} is missing mutations: {error}"
+        logging.info(self.__failure)
+
+        if self.__delayed_flush is not None:
+            self.__delayed_flush.cancel()
+            self.__delayed_flush = None
+
+        waiting = list(self.__unacknowledged) + list(self.__outgoing)
+        if self.__batch:
+            waiting.append((None, self.__batch_applied))
+
+        for _, batch_applied in waiting:
+            if not batch_applied.done():
+                batch_applied.set_exception(Exception(self.__failure))
+
+        self.__unacknowledged.clear()
+        self.__outgoing.clear()
+        self.__batch = []
+        self.__batch_applied = None
+        self.__add_to_queue_depth(-self.__queue_depth)
+        # Wake the sender, so that it stops
+        self.__work.set()
+
+    def __add_to_queue_depth(self, number_of_mutations: int) -> None:
+        self.__queue_depth += number_of_mutations
+        if self.__queue_depth < self.__max_queue_depth:
+            self.__room.set()
+        else:
+            self.__room.clear()
@@ -1,26 +1,73 @@
+import asyncio
 from typing import Optional
 
 import grpc
 import logging
 
 from protos.service_pb2_grpc import FusedDataStructureStub
+from shared.mutation_channel import MutationChannel
+
+# Longest to wait for a backup's channel to connect, in seconds
+CONNECTION_READY_TIMEOUT = 10.0
 
 
 class BackupStructureConnection:
     def __init__(
-        self, backup_port: int
+        self, backup_port: int, ready_timeout: float = CONNECTION_READY_TIMEOUT
     ):
         self.__connection: Optional[FusedDataStructureStub] = None
+        self.__mutations: Optional[MutationChannel] = None
         self.__backup_port: int = backup_port
-        self.__channel = grpc.aio.insecure_channel(f"localhost:{self.__backup_port}")
+        self.__ready_timeout = ready_timeout
+        self.__channel: Optional[grpc.aio.Channel] = None
 
     async def establish_node_connection(self) -> None:
-        self.__connection = FusedDataStructureStub(self.__channel)
+        channel = grpc.aio.insecure_channel(f"localhost:{self.__backup_port}")
+
+        # Connect up front, so the first request does not also pay for setting up the connection
+        try:
+            await asyncio.wait_for(channel.channel_ready(), self.__ready_timeout)
+        except asyncio.TimeoutError:
+            await channel.close()
+            raise Exception(f"Backup node on port {self.__backup_port} did not become ready within {self.__ready_timeout}s")
+
+        # Only a ready channel replaces the one in use
+        self.__channel = channel
+        self.__connection = FusedDataStructureStub(channel)
+        self.__mutations = MutationChannel(self.__connection.MutationChannel)
+
+    async def reconnect(self) -> None:
+        """Replace the channel with a fresh one, dropping whatever backoff the old one had built up"""
+        logging.info(f"Reconnecting to backup node on port: {self.__backup_port}")
+        channel, mutations = self.__channel, self.__mutations
+        await self.establish_node_connection()
+
+        # Closing the old stream fails whatever it left unacknowledged, which the batcher sends again over the new one
+        await asyncio.gather(*(x.close() for x in (mutations, channel) if x is not None))
 
     async def close_node_connection(self) -> None:
         logging.info(f"Closing node connection on port: {self.__backup_port}")
-        await self.__channel.close()
+        if self.__mutations is not None:
+            await self.__mutations.close()
+        if self.__channel is not None:
+            await self.__channel.close()
+
+    @property
+    def is_healthy(self) -> bool:
+        if self.__channel is None:
+            return False
+
+        state = self.__channel.get_state(try_to_connect=True)
+        return state not in (grpc.ChannelConnectivity.TRANSIENT_FAILURE, grpc.ChannelConnectivity.SHUTDOWN)
 
     @property
     def stub(self) -> FusedDataStructureStub:
         return self.__connection
+
+    @property
+    def mutations(self) -> Optional[MutationChannel]:
+        return self.__mutations
+
+    @property
+    def backup_port(self) -> int:
+        return self.__backup_port
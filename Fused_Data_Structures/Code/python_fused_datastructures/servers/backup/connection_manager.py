@@ -1,22 +1,66 @@
+import asyncio
+import functools
 import logging
-from typing import List
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Set
 
-from protos.service_pb2 import CreateFusedStructureRequest, StructureMutation, StructureType
+from protos.service_pb2 import CreateFusedStructureRequest, StructureMutation, StructureType, AckLevel
+from servers.backup.batcher import MutationBatcher
 from servers.backup.connection import BackupStructureConnection
+from servers.backup.node_connection_manager import backup_node_connections
+
+# Seconds a backup has to answer a request before it is treated as having failed
+BACKUP_REQUEST_TIMEOUT = 10.0
+# Longest a write is held back waiting for a lagging backup to catch up before it is rejected, in seconds
+BACKPRESSURE_TIMEOUT = 5.0
+
+# Ack level asked for by the request currently being handled, which takes precedence over the structure's own
+requested_ack_level: ContextVar[int] = ContextVar("requested_ack_level", default=AckLevel.ACK_DEFAULT)
+# Mutations held back by the `batched` blocks the current request is in, by the manager each block belongs to
+collected_mutations: ContextVar[Optional[Dict[object, List[StructureMutation]]]] = ContextVar(
+    "collected_mutations", default=None
+)
+
+
+@contextmanager
+def acknowledged_at(ack_level: AckLevel) -> Iterator[None]:
+    """Acknowledge mutations sent to the backups within the block at `ack_level`, unless it is ACK_DEFAULT"""
+    # ACK_DEFAULT keeps whatever level an enclosing block asked for
+    if ack_level == AckLevel.ACK_DEFAULT:
+        yield
+        return
+
+    token = requested_ack_level.set(ack_level)
+    try:
+        yield
+    finally:
+        requested_ack_level.reset(token)
 
 
 class BackupStructureConnectionManager:
-    def __init__(self, backup_ports: List[int]):
+    def __init__(
+        self,
+        backup_ports: List[int],
+        timeout: Optional[float] = BACKUP_REQUEST_TIMEOUT,
+        ack_level: AckLevel = AckLevel.ACK_ALL_BACKUPS,
+        backpressure_timeout: Optional[float] = BACKPRESSURE_TIMEOUT
+    ):
         self.__backup_ports = backup_ports
         self.__backup_connections: List[BackupStructureConnection] = []
+        self.__mutation_batchers: List[MutationBatcher] = []
+        self.__timeout = timeout
+        self.__ack_level = ack_level
+        self.__backpressure_timeout = backpressure_timeout
+        self.__replicating: Set[asyncio.Future] = set()
 
     async def establish_backup_connections(self):
         logging.info(
             f"Initializing connections to backup nodes on ports: {self.__backup_ports}")
+        # Connections, and the batchers over them, are shared with every other structure on this node
         for backup_port in self.__backup_ports:
-            connection = BackupStructureConnection(backup_port)
-            await connection.establish_node_connection()
-            self.__backup_connections.append(connection)
+            self.__backup_connections.append(await backup_node_connections.get_connection(backup_port))
+            self.__mutation_batchers.append(await backup_node_connections.get_mutation_batcher(backup_port))
 
     async def create_fused_structure_on_all_backups(
         self,
@@ -24,24 +68,132 @@ class BackupStructureConnectionManager:
         primary_structure_identifier: str,
         cluster_identifier: str,
         number_of_primaries: int,
-        number_of_faults: int
+        number_of_faults: int,
+        galois_w: int,
+        coding_scheme: int
     ) -> None:
-        for i, connection in enumerate(self.__backup_connections):
+        def create_fused_structure(i: int, connection: BackupStructureConnection) -> Awaitable:
             payload = CreateFusedStructureRequest(
                 type=structure_type,
                 primaryStructureIdentifier=primary_structure_identifier,
                 clusterIdentifier=cluster_identifier,
                 numberOfPrimaries=number_of_primaries,
                 numberOfFaults=number_of_faults,
-                backupCodePosition=i
+                backupCodePosition=i,
+                galoisW=galois_w,
+                codingScheme=coding_scheme
             )
 
-            await connection.stub.CreateFusedStructure(payload)
+            return connection.stub.CreateFusedStructure(payload, timeout=self.__timeout)
+
+        await self.__send_to_all_connections(create_fused_structure)
+
+    async def wait_for_replication_capacity(self) -> None:
+        """
+        Hold back a write until every backup still replicating has room in its replication queue, rejecting it if one
+        is still lagging after `backpressure_timeout` seconds, or if too few backups are left replicating for the ack
+        level. Call before applying the write, so a rejected one is not applied at all
+        """
+        # A failed backup fails the mutations sent to it straight away, so it only holds back writes whose ack level
+        # cannot be met without it
+        replicating = [x for x in self.__mutation_batchers if not x.failed]
+        number_of_backups_to_wait_for = self.__number_of_backups_to_wait_for()
+        if len(replicating) < number_of_backups_to_wait_for:
+            failed_ports = [x.backup_port for x in self.__mutation_batchers if x.failed]
+            raise Exception(
+                f"Backup nodes on ports {failed_ports} have failed, leaving too few to acknowledge the request at "
+                f"{number_of_backups_to_wait_for} backups"
+            )
+
+        await asyncio.gather(*(batcher.wait_for_room(self.__backpressure_timeout) for batcher in replicating))
 
     async def send_mutation_to_all_connections(self, mutation: StructureMutation):
-        for connection in self.__backup_connections:
-            await connection.stub.MutationStream(mutation)
+        collected = collected_mutations.get()
+        if collected is not None and self in collected:
+            collected[self].append(mutation)
+            return
+
+        await self.__send_mutations_to_all_connections([mutation])
+
+    @asynccontextmanager
+    async def batched(self) -> AsyncIterator[None]:
+        """
+        Hold back the mutations sent within the block, then send them to every backup together in one batch. Only
+        mutations sent by the request in the block are held back, not those of other requests to the same structure
+        """
+        mutations: List[StructureMutation] = []
+        token = collected_mutations.set({**(collected_mutations.get() or {}), self: mutations})
+        try:
+            yield
+        finally:
+            collected_mutations.reset(token)
+            if mutations:
+                await self.__send_mutations_to_all_connections(mutations)
+
+    async def __send_mutations_to_all_connections(self, mutations: List[StructureMutation]):
+        # Mutations join the replication queue each backup shares with every other structure on this node - straight
+        # away, so their order is kept - and go down its long-lived stream, where they are applied in the order sent
+        await self.__send_to_all_connections(
+            lambda i, _: asyncio.wait_for(self.__mutation_batchers[i].submit(mutations), self.__timeout),
+            self.__number_of_backups_to_wait_for()
+        )
+
+    def __number_of_backups_to_wait_for(self) -> int:
+        ack_level = requested_ack_level.get() or self.__ack_level
+        number_of_backups = len(self.__backup_connections)
+
+        if ack_level == AckLevel.ACK_LOCAL:
+            return 0
+        if ack_level == AckLevel.ACK_FIRST_BACKUP:
+            return min(1, number_of_backups)
+        if ack_level == AckLevel.ACK_QUORUM:
+            return number_of_backups // 2 + 1
+
+        return number_of_backups
+
+    async def __send_to_all_connections(
+        self, send: Callable[[int, BackupStructureConnection], Awaitable], number_to_wait_for: Optional[int] = None
+    ) -> None:
+        """
+        Send a request to every backup at once, so that a slow or failed backup neither delays nor stops the rest.
+        Returns once `number_to_wait_for` backups, by default all of them, have applied it - the rest carry on in the
+        background
+        """
+        requests = {
+            asyncio.ensure_future(send(i, connection)): connection.backup_port
+            for i, connection in enumerate(self.__backup_connections)
+        }
+        if number_to_wait_for is None:
+            number_to_wait_for = len(requests)
+
+        number_applied = 0
+        failed_ports = []
+        pending = set(requests)
+        # Stop waiting once enough backups have applied the request, or too many have failed for that to happen
+        while number_applied < number_to_wait_for and len(failed_ports) <= len(requests) - number_to_wait_for:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for request in done:
+                if request.exception() is None:
+                    number_applied += 1
+                else:
+                    logging.info(f"Request to backup node on port {requests[request]} failed: {request.exception()}")
+                    failed_ports.append(requests[request])
+
+        for request in pending:
+            self.__replicating.add(request)
+            request.add_done_callback(functools.partial(self.__finish_replicating, requests[request]))
+
+        if number_applied < number_to_wait_for:
+            raise Exception(f"Backup nodes on ports {failed_ports} failed to apply the request")
+
+    def __finish_replicating(self, backup_port: int, request: asyncio.Future) -> None:
+        self.__replicating.discard(request)
+        if not request.cancelled() and request.exception() is not None:
+            logging.info(
+                f"Request to backup node on port {backup_port} failed after it was acknowledged: {request.exception()}"
+            )
 
     async def close_backup_connections(self):
-        for connection in self.__backup_connections:
-            await connection.close_node_connection()
+        # The connections themselves stay open for the other structures on this node
+        self.__backup_connections.clear()
+        self.__mutation_batchers.clear()
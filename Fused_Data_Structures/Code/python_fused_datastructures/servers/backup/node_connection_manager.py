@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from servers.backup.batcher import MutationBatcher, MAX_QUEUE_DEPTH
+from servers.backup.connection import BackupStructureConnection
+
+# Seconds between checks that every backup's channel is still usable
+HEALTH_CHECK_INTERVAL = 1.0
+
+
+class BackupNodeConnectionManager:
+    """
+    One connection, and one mutation batcher over it, per backup node - shared by every structure on this primary node
+    rather than opened for each of them. Connections are warmed up before first use, and checked every
+    `health_check_interval` seconds so that a channel left failing after its backup went away is replaced, and a
+    backup that refused a batch is reconnected and replicated to again. Each is reconnected by a task of its own, so
+    one slow backup does not hold up reconnecting the rest
+    """
+
+    def __init__(self, health_check_interval: float = HEALTH_CHECK_INTERVAL, max_queue_depth: int = MAX_QUEUE_DEPTH):
+        self.__health_check_interval = health_check_interval
+        self.__max_queue_depth = max_queue_depth
+        self.__connections: Dict[int, asyncio.Future] = {}
+        self.__health_check: Optional[asyncio.Task] = None
+        # Reconnect under way to each backup, by port
+        self.__reconnects: Dict[int, asyncio.Task] = {}
+
+    async def get_connection(self, backup_port: int) -> BackupStructureConnection:
+        connection, _ = await self.__get(backup_port)
+        return connection
+
+    async def get_mutation_batcher(self, backup_port: int) -> MutationBatcher:
+        _, batcher = await self.__get(backup_port)
+        return batcher
+
+    @property
+    def queue_depths(self) -> Dict[int, int]:
+        """Mutations waiting on each connected backup, by port"""
+        return {
+            backup_port: future.result()[1].queue_depth
+            for backup_port, future in self.__connections.items()
+            if future.done() and future.exception() is None
+        }
+
+    async def close(self) -> None:
+        if self.__health_check is not None:
+            self.__health_check.cancel()
+            self.__health_check = None
+
+        for reconnect in self.__reconnects.values():
+            reconnect.cancel()
+        self.__reconnects.clear()
+
+        for future in self.__connections.values():
+            if future.done() and future.exception() is None:
+                connection, batcher = future.result()
+                await batcher.close()
+                await connection.close_node_connection()
+
+        self.__connections.clear()
+
+    async def __get(self, backup_port: int) -> Tuple[BackupStructureConnection, MutationBatcher]:
+        # Structures created at the same time share the one connection attempt to each backup
+        future = self.__connections.get(backup_port)
+        if future is None:
+            future = asyncio.ensure_future(self.__connect(backup_port))
+            self.__connections[backup_port] = future
+
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            # Let the next structure try to connect again
+            if self.__connections.get(backup_port) is future:
+                del self.__connections[backup_port]
+            raise
+
+    async def __connect(self, backup_port: int) -> Tuple[BackupStructureConnection, MutationBatcher]:
+        connection = BackupStructureConnection(backup_port)
+        await connection.establish_node_connection()
+
+        if self.__health_check is None:
+            self.__health_check = asyncio.ensure_future(self.__check_health())
+
+        return connection, MutationBatcher(connection, max_queue_depth=self.__max_queue_depth)
+
+    async def __check_health(self) -> None:
+        while True:
+            await asyncio.sleep(self.__health_check_interval)
+
+            for backup_port, future in list(self.__connections.items()):
+                if not future.done() or future.exception() is not None:
+                    continue
+
+                connection, batcher = future.result()
+                if (connection.is_healthy and not batcher.failed) or backup_port in self.__reconnects:
+                    continue
+
+                self.__reconnects[backup_port] = asyncio.ensure_future(
+                    self.__reconnect(backup_port, connection, batcher)
+                )
+
+    async def __reconnect(
+        self, backup_port: int, connection: BackupStructureConnection, batcher: MutationBatcher
+    ) -> None:
+        # The batcher looks up the connection's mutation stream on every batch, so it picks up the new one
+        try:
+            await connection.reconnect()
+            batcher.recover()
+        except Exception as e:
+            logging.info(f"Unable to reconnect to backup node on port {backup_port}: {e}")
+        finally:
+            self.__reconnects.pop(backup_port, None)
+
+
+# Shared by every structure on this node
+backup_node_connections = BackupNodeConnectionManager()
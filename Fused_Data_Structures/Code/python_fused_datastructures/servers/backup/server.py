@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from typing import AsyncIterator, Dict, List, Optional
 
 import grpc
 from servers.backup.registry import FusedStructureRegistry
@@ -7,18 +8,36 @@ from servers.shared.events import RemoveItemEvent, SetItemEvent
 from protos.service_pb2 import (
     CreateFusedStructureRequest,
     CreateFusedStructureResponse,
-    StructureMutation, FusedRecoveryDataRequest, FusedRecoveryDataResponse, FusedIndexPayload,
+    StructureMutation, FusedRecoveryDataRequest, FusedRecoveryDataResponse, FusedIndexPayload, FusedRecoveryDataPage,
+    SequencedMutation, MutationAck,
 )
 from protos.service_pb2_grpc import (
     FusedDataStructureServicer,
     add_FusedDataStructureServicer_to_server,
 )
-from shared.types import ClusterInformation
+from shared.mutation_channel import acknowledge_mutation, apply_mutation
+from shared.types import ClusterInformation, DEFAULT_GALOIS_W
+
+# Fused nodes per page of streamed recovery data, which keeps pages far below gRPC's 4 MB message limit
+RECOVERY_PAGE_SIZE = 4096
+
+
+class ReplicationProgress:
+    """How far this node has got through the batches of one primary node's replication queue"""
+
+    def __init__(self) -> None:
+        # Batches of the queue are applied one at a time, even when a batch sent again arrives on a second stream
+        self.lock = asyncio.Lock()
+        self.next_sequence = 0
+        # Mutations of the next batch applied before its stream broke, and why any of them failed
+        self.mutations_applied = 0
+        self.errors: List[str] = []
 
 
 class BackupNodeServicer(FusedDataStructureServicer):
     def __init__(self) -> None:
         self.__registry = FusedStructureRegistry()
+        self.__replication_progress: Dict[str, ReplicationProgress] = {}
 
     def CreateFusedStructure(
         self, request: CreateFusedStructureRequest, _
@@ -30,7 +49,9 @@ class BackupNodeServicer(FusedDataStructureServicer):
             ClusterInformation(
                 request.clusterIdentifier,
                 request.numberOfPrimaries,
-                request.numberOfFaults
+                request.numberOfFaults,
+                request.galoisW or DEFAULT_GALOIS_W,
+                request.codingScheme
             ),
             request.backupCodePosition
         )
@@ -77,6 +98,61 @@ class BackupNodeServicer(FusedDataStructureServicer):
         # Echo the mutation back to the requester
         return mutation
 
+    async def MutationChannel(
+        self, mutations: AsyncIterator[SequencedMutation], context: grpc.aio.ServicerContext
+    ) -> AsyncIterator[MutationAck]:
+        # Mutations are applied one at a time in the order they arrive, so they are acknowledged in that order too
+        async for sequenced_mutation in mutations:
+            if sequenced_mutation.WhichOneof("payload") == "batch" and sequenced_mutation.batch.replicationSource:
+                yield await self.__apply_replicated_batch(sequenced_mutation, context)
+            else:
+                yield await acknowledge_mutation(self.MutationStream, sequenced_mutation, context)
+
+    async def __apply_replicated_batch(
+        self, sequenced_mutation: SequencedMutation, context: grpc.aio.ServicerContext
+    ) -> MutationAck:
+        """
+        Apply a batch from a primary's replication queue exactly once and in order, however many times it is sent -
+        a batch sent again after its stream broke carries on from the first of its mutations not yet applied
+        """
+        batch = sequenced_mutation.batch
+        progress = self.__replication_progress.get(batch.replicationSource)
+        if progress is None:
+            if batch.replicationSequence > 0:
+                # The batches before it were lost, e.g. with this node's state when it restarted
+                return MutationAck(
+                    sequenceNumber=sequenced_mutation.sequenceNumber,
+                    error=f"Batches before {batch.replicationSequence} from its primary were never received"
+                )
+
+            progress = self.__replication_progress.setdefault(batch.replicationSource, ReplicationProgress())
+
+        async with progress.lock:
+            if batch.replicationSequence < progress.next_sequence:
+                # Applied already, and sent again because its ack was lost along with the stream it was sent down
+                return MutationAck(sequenceNumber=sequenced_mutation.sequenceNumber)
+
+            if batch.replicationSequence > progress.next_sequence:
+                # An earlier batch is yet to be sent again after its stream broke, so break this one too and have the
+                # primary send both in order
+                await context.abort(
+                    grpc.StatusCode.FAILED_PRECONDITION,
+                    f"Batch {batch.replicationSequence} arrived before batch {progress.next_sequence} from its primary"
+                )
+
+            for mutation in batch.mutations[progress.mutations_applied:]:
+                error = await apply_mutation(self.MutationStream, mutation, context)
+                if error:
+                    progress.errors.append(error)
+                progress.mutations_applied += 1
+
+            ack = MutationAck(sequenceNumber=sequenced_mutation.sequenceNumber, error="; ".join(progress.errors))
+            progress.next_sequence += 1
+            progress.mutations_applied = 0
+            progress.errors = []
+
+            return ack
+
     def GetFusedRecoveryData(self, request: FusedRecoveryDataRequest, _) -> FusedRecoveryDataResponse:
         structure = self.__registry.get(request.clusterIdentifier)
 
@@ -91,6 +167,34 @@ class BackupNodeServicer(FusedDataStructureServicer):
             indexData=payload_index
         )
 
+    async def StreamFusedRecoveryData(
+        self, request: FusedRecoveryDataRequest, context: grpc.aio.ServicerContext
+    ) -> AsyncIterator[FusedRecoveryDataPage]:
+        structure = self.__registry.get(request.clusterIdentifier)
+        page_size = request.pageSize or RECOVERY_PAGE_SIZE
+
+        # Mutations can be applied while the stream waits on the client, so pages are only sent while the structure
+        # remains at the version the first page was read from
+        version = structure.version
+        number_of_fused_nodes = (
+            structure.number_of_fused_nodes_holding(request.primaryStructurePositions)
+            if request.primaryStructurePositions else structure.number_of_fused_nodes
+        )
+        index_data_pages = (
+            iter(()) if request.codesOnly else structure.get_index_data_pages(page_size, number_of_fused_nodes)
+        )
+
+        # An empty structure still sends a single page, to tell the client there are no fused nodes
+        for start in range(0, max(number_of_fused_nodes, 1), page_size):
+            if structure.version != version:
+                await context.abort(grpc.StatusCode.ABORTED, "Fused structure was mutated while streaming recovery data")
+
+            yield FusedRecoveryDataPage(
+                numberOfFusedNodes=number_of_fused_nodes,
+                fusedData=structure.get_fused_data(start, min(start + page_size, number_of_fused_nodes)),
+                fusedDataIndexes=next(index_data_pages, [])
+            )
+
 
 async def backup_server_thread(port: int) -> None:
     server = grpc.aio.server()
@@ -0,0 +1,506 @@
+import asyncio
+import unittest
+from typing import Dict, List, Sequence, Tuple
+from unittest import mock
+
+from protos.service_pb2 import AckLevel, MutationBatch, SequencedMutation, StructureMutation
+from servers.backup.batcher import MutationBatcher
+from servers.backup.connection import BackupStructureConnection
+from servers.backup.connection_manager import BackupStructureConnectionManager, acknowledged_at
+from servers.backup.node_connection_manager import BackupNodeConnectionManager
+from servers.backup.server import BackupNodeServicer
+from shared.mutation_channel import MutationRejected
+
+
+def mutation(name: str) -> StructureMutation:
+    return StructureMutation(structureIdentifier=name)
+
+
+class FakeBatcher:
+    """Stands in for a backup's batcher, leaving each submission pending until the test completes it"""
+
+    def __init__(self, backup_port: int):
+        self.backup_port = backup_port
+        self.submitted: List[Tuple[List[str], asyncio.Future]] = []
+        self.failed = False
+
+    def submit(self, mutations) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if self.failed:
+            future.set_exception(Exception("Backup failed"))
+        else:
+            self.submitted.append(([x.structureIdentifier for x in mutations], future))
+        return future
+
+    async def wait_for_room(self, timeout=None) -> None:
+        if self.failed:
+            raise Exception("Backup failed")
+
+
+class FakeMutationChannel:
+    """Stands in for a backup's mutation stream, leaving each batch unacknowledged until the test acknowledges it"""
+
+    def __init__(self):
+        self.submitted: List[Tuple[MutationBatch, asyncio.Future]] = []
+
+    async def submit(self, batch: MutationBatch) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.submitted.append((batch, future))
+        return future
+
+    @property
+    def sequences(self) -> List[int]:
+        return [x.replicationSequence for x, _ in self.submitted]
+
+    async def close(self) -> None:
+        # As with a real stream, closing fails whatever was not acknowledged
+        for _, acknowledged in self.submitted:
+            if not acknowledged.done():
+                acknowledged.set_exception(Exception("Mutation stream closed"))
+
+
+class FakeChannel:
+    """Stands in for a gRPC channel, only becoming ready once the test says so"""
+
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.closed = False
+
+    async def channel_ready(self) -> None:
+        await self.ready.wait()
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeConnection:
+    backup_port = 60000
+
+    def __init__(self):
+        self.mutations = FakeMutationChannel()
+
+
+class FakeServicerContext:
+    async def abort(self, code, details: str) -> None:
+        raise Exception(details)
+
+
+class FakeNodeConnections:
+    def __init__(self, batchers: Dict[int, FakeBatcher]):
+        self.__batchers = batchers
+
+    async def get_connection(self, backup_port: int) -> FakeBatcher:
+        # Only the port of the connection is used
+        return self.__batchers[backup_port]
+
+    async def get_mutation_batcher(self, backup_port: int) -> FakeBatcher:
+        return self.__batchers[backup_port]
+
+
+async def create_manager(
+    number_of_backups: int, ack_level: AckLevel = AckLevel.ACK_ALL_BACKUPS
+) -> Tuple[BackupStructureConnectionManager, List[FakeBatcher]]:
+    batchers = [FakeBatcher(60000 + i) for i in range(number_of_backups)]
+    node_connections = FakeNodeConnections({x.backup_port: x for x in batchers})
+
+    with mock.patch("servers.backup.connection_manager.backup_node_connections", node_connections):
+        manager = BackupStructureConnectionManager([x.backup_port for x in batchers], ack_level=ack_level)
+        await manager.establish_backup_connections()
+
+    return manager, batchers
+
+
+class TestBackupStructureConnectionManager(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_batches(self):
+        manager, (batcher,) = await create_manager(1, AckLevel.ACK_LOCAL)
+
+        async def apply_batch(name: str) -> None:
+            async with manager.batched():
+                for i in range(3):
+                    await manager.send_mutation_to_all_connections(mutation(f"{name}{i}"))
+                    # Let the other batch run in between
+                    await asyncio.sleep(0)
+
+        await asyncio.gather(apply_batch("a"), apply_batch("b"))
+        self.assertCountEqual([x for x, _ in batcher.submitted], [["a0", "a1", "a2"], ["b0", "b1", "b2"]])
+
+    async def test_single_mutation_during_batch(self):
+        manager, (batcher,) = await create_manager(1)
+        batch_started = asyncio.Event()
+
+        async def send_single() -> None:
+            await batch_started.wait()
+            await manager.send_mutation_to_all_connections(mutation("s"))
+
+        single = asyncio.ensure_future(send_single())
+        async with manager.batched():
+            await manager.send_mutation_to_all_connections(mutation("a0"))
+            batch_started.set()
+            await asyncio.sleep(0.01)
+
+            # Another request's mutation is sent on its own, and waits on the backup rather than the batch
+            self.assertEqual([x for x, _ in batcher.submitted], [["s"]])
+            self.assertFalse(single.done())
+            batcher.submitted[0][1].set_result(None)
+            await single
+
+            # Acknowledge the batch as soon as the block has sent it
+            asyncio.get_running_loop().call_soon(lambda: batcher.submitted[1][1].set_result(None))
+
+        self.assertEqual([x for x, _ in batcher.submitted], [["s"], ["a0"]])
+
+    async def test_ack_levels(self):
+        # Backups each level waits for out of three, with ACK_DEFAULT taking the structure's own level
+        for ack_level, requested_ack_level, number_to_wait_for in [
+            (AckLevel.ACK_ALL_BACKUPS, AckLevel.ACK_DEFAULT, 3),
+            (AckLevel.ACK_LOCAL, AckLevel.ACK_DEFAULT, 0),
+            (AckLevel.ACK_LOCAL, AckLevel.ACK_ALL_BACKUPS, 3),
+            (AckLevel.ACK_ALL_BACKUPS, AckLevel.ACK_LOCAL, 0),
+            (AckLevel.ACK_ALL_BACKUPS, AckLevel.ACK_FIRST_BACKUP, 1),
+            (AckLevel.ACK_ALL_BACKUPS, AckLevel.ACK_QUORUM, 2),
+        ]:
+            manager, batchers = await create_manager(3, ack_level)
+
+            with acknowledged_at(requested_ack_level):
+                send = asyncio.ensure_future(manager.send_mutation_to_all_connections(mutation("a")))
+
+            for number_applied, batcher in enumerate(batchers):
+                await asyncio.sleep(0.01)
+                self.assertEqual(send.done(), number_applied >= number_to_wait_for, AckLevel.Name(requested_ack_level))
+                batcher.submitted[0][1].set_result(None)
+
+            await send
+
+    async def test_ack_level_failures(self):
+        manager, batchers = await create_manager(3, AckLevel.ACK_QUORUM)
+        send = asyncio.ensure_future(manager.send_mutation_to_all_connections(mutation("a")))
+        await asyncio.sleep(0.01)
+
+        # A quorum can no longer be reached once two of the three backups have failed
+        batchers[0].submitted[0][1].set_exception(Exception("failed"))
+        await asyncio.sleep(0.01)
+        self.assertFalse(send.done())
+        batchers[1].submitted[0][1].set_exception(Exception("failed"))
+        with self.assertRaises(Exception):
+            await send
+
+        batchers[2].submitted[0][1].set_result(None)
+
+    async def test_quorum_with_failed_backup(self):
+        manager, batchers = await create_manager(3, AckLevel.ACK_QUORUM)
+        batchers[0].failed = True
+
+        # The two backups left are enough for a quorum, so the failed one holds nothing back
+        await manager.wait_for_replication_capacity()
+        send = asyncio.ensure_future(manager.send_mutation_to_all_connections(mutation("a")))
+        await asyncio.sleep(0.01)
+        for batcher in batchers[1:]:
+            batcher.submitted[0][1].set_result(None)
+        await send
+
+        # ...but not for every backup, so a write at that level is rejected before it is applied
+        with acknowledged_at(AckLevel.ACK_ALL_BACKUPS):
+            with self.assertRaises(Exception):
+                await manager.wait_for_replication_capacity()
+
+        batchers[1].failed = True
+        with self.assertRaises(Exception):
+            await manager.wait_for_replication_capacity()
+        with acknowledged_at(AckLevel.ACK_FIRST_BACKUP):
+            await manager.wait_for_replication_capacity()
+
+    async def test_nested_ack_levels(self):
+        manager, (batcher,) = await create_manager(1)
+
+        # An inner block at ACK_DEFAULT, like each mutation of a batch, keeps the level of the block around it
+        with acknowledged_at(AckLevel.ACK_LOCAL):
+            with acknowledged_at(AckLevel.ACK_DEFAULT):
+                await manager.send_mutation_to_all_connections(mutation("a"))
+
+        self.assertFalse(batcher.submitted[0][1].done())
+        batcher.submitted[0][1].set_result(None)
+
+
+class TestMutationBatcher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.connection = FakeConnection()
+        self.channel = self.connection.mutations
+        self.batcher = MutationBatcher(self.connection, max_queue_depth=4, resend_interval=0.01)
+
+    async def asyncTearDown(self):
+        await self.batcher.close()
+
+    async def test_write_behind_queue(self):
+        # The first mutation goes straight away, and later ones are batched while the backup is busy with it
+        first = self.batcher.submit([mutation("a")])
+        second = self.batcher.submit([mutation("b")])
+        third = self.batcher.submit([mutation("c")])
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(self.channel.sequences, [0, 1])
+        self.assertEqual([len(x.mutations) for x, _ in self.channel.submitted], [1, 2])
+        self.assertEqual(self.batcher.queue_depth, 3)
+        self.assertFalse(first.done())
+
+        for _, acknowledged in self.channel.submitted:
+            acknowledged.set_result(None)
+        await asyncio.gather(first, second, third)
+        self.assertEqual(self.batcher.queue_depth, 0)
+
+    async def test_backpressure(self):
+        submitted = [self.batcher.submit([mutation("a")])]
+        await asyncio.sleep(0.01)
+        submitted.append(self.batcher.submit([mutation("b"), mutation("c"), mutation("d")]))
+        await asyncio.sleep(0.01)
+
+        # A full queue holds writers back, and rejects them if the backup does not catch up in time
+        with self.assertRaises(Exception):
+            await self.batcher.wait_for_room(0.01)
+
+        waiting = asyncio.ensure_future(self.batcher.wait_for_room(1))
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiting.done())
+
+        self.channel.submitted[0][1].set_result(None)
+        await waiting
+        self.assertEqual(self.batcher.queue_depth, 3)
+
+        self.channel.submitted[1][1].set_result(None)
+        await asyncio.gather(*submitted)
+
+    async def test_resend_after_stream_breaks(self):
+        first = self.batcher.submit([mutation("a")])
+        await asyncio.sleep(0.01)
+        second = self.batcher.submit([mutation("b")])
+        await asyncio.sleep(0.01)
+
+        # Breaking the stream fails everything sent down it, which is sent again in order ahead of anything newer
+        for _, acknowledged in self.channel.submitted:
+            acknowledged.set_exception(Exception("stream broke"))
+        third = self.batcher.submit([mutation("c")])
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.channel.sequences, [0, 1, 0, 1, 2])
+        self.assertEqual(self.batcher.queue_depth, 3)
+        self.assertFalse(first.done() or second.done())
+
+        for _, acknowledged in self.channel.submitted[2:]:
+            acknowledged.set_result(None)
+        await asyncio.gather(first, second, third)
+        self.assertEqual(self.batcher.queue_depth, 0)
+
+    async def test_refused_batch_fails_backup(self):
+        first = self.batcher.submit([mutation("a")])
+        await asyncio.sleep(0.01)
+        second = self.batcher.submit([mutation("b")])
+        await asyncio.sleep(0.01)
+
+        # A backup that could not apply a batch is missing updates, so nothing more is sent to it
+        self.channel.submitted[0][1].set_exception(MutationRejected("Mutation does not refer to a structure"))
+        for future in (first, second, self.batcher.submit([mutation("c")])):
+            with self.assertRaises(Exception):
+                await future
+        with self.assertRaises(Exception):
+            await self.batcher.wait_for_room(1)
+
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.channel.sequences, [0, 1])
+        self.assertEqual(self.batcher.queue_depth, 0)
+
+    async def test_recover_failed_backup(self):
+        self.batcher.submit([mutation("a")])
+        await asyncio.sleep(0.01)
+        self.channel.submitted[0][1].set_exception(MutationRejected("Mutation does not refer to a structure"))
+        await asyncio.sleep(0.01)
+        self.assertTrue(self.batcher.failed)
+
+        # A recovered backup is sent mutations again, numbered from the start under a new source
+        self.batcher.recover()
+        self.assertFalse(self.batcher.failed)
+        await self.batcher.wait_for_room(1)
+        recovered = self.batcher.submit([mutation("b")])
+        await asyncio.sleep(0.01)
+
+        (first, _), (second, acknowledged) = self.channel.submitted
+        self.assertEqual(second.replicationSequence, 0)
+        self.assertNotEqual(second.replicationSource, first.replicationSource)
+        acknowledged.set_result(None)
+        await recovered
+
+
+class TestBackupStructureConnection(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.channels: List[FakeChannel] = []
+
+        def insecure_channel(_) -> FakeChannel:
+            self.channels.append(FakeChannel())
+            return self.channels[-1]
+
+        self.patches = [
+            mock.patch("servers.backup.connection.grpc.aio.insecure_channel", insecure_channel),
+            mock.patch("servers.backup.connection.FusedDataStructureStub"),
+            mock.patch("servers.backup.connection.MutationChannel", lambda _: FakeMutationChannel())
+        ]
+        for patch in self.patches:
+            patch.start()
+
+        self.connection = BackupStructureConnection(60000, ready_timeout=0.05)
+        establishing = asyncio.ensure_future(self.connection.establish_node_connection())
+        await asyncio.sleep(0)
+        self.channels[0].ready.set()
+        await establishing
+
+    async def asyncTearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    async def test_reconnect_swaps_in_ready_channel(self):
+        batcher = MutationBatcher(self.connection, resend_interval=0.01)
+        old_mutations = self.connection.mutations
+        first = batcher.submit([mutation("a")])
+        await asyncio.sleep(0.01)
+
+        # The old stream carries on until the new channel is ready
+        reconnecting = asyncio.ensure_future(self.connection.reconnect())
+        await asyncio.sleep(0.01)
+        self.assertIs(self.connection.mutations, old_mutations)
+        self.assertFalse(self.channels[0].closed)
+
+        self.channels[1].ready.set()
+        await reconnecting
+        self.assertIsNot(self.connection.mutations, old_mutations)
+        self.assertTrue(self.channels[0].closed)
+
+        # The batch the old stream left unacknowledged is sent again over the new one
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.connection.mutations.sequences, [0])
+        self.connection.mutations.submitted[0][1].set_result(None)
+        await first
+        await batcher.close()
+
+    async def test_failed_reconnect_keeps_connection(self):
+        old_mutations = self.connection.mutations
+
+        with self.assertRaises(Exception):
+            await self.connection.reconnect()
+
+        self.assertIs(self.connection.mutations, old_mutations)
+        self.assertTrue(self.channels[1].closed)
+        self.assertFalse(self.channels[0].closed)
+
+
+class UnhealthyConnection:
+    """Stands in for a backup connection whose channel has failed, reconnecting only once the test says so"""
+
+    def __init__(self, backup_port: int):
+        self.backup_port = backup_port
+        self.mutations = FakeMutationChannel()
+        self.is_healthy = True
+        self.reconnected = asyncio.Event()
+        self.reconnects = 0
+
+    async def establish_node_connection(self) -> None:
+        pass
+
+    async def reconnect(self) -> None:
+        self.reconnects += 1
+        await self.reconnected.wait()
+        self.is_healthy = True
+
+    async def close_node_connection(self) -> None:
+        pass
+
+
+class TestBackupNodeConnectionManager(unittest.IsolatedAsyncioTestCase):
+    async def test_reconnects_concurrently(self):
+        node_connections = BackupNodeConnectionManager(health_check_interval=0.01)
+        with mock.patch("servers.backup.node_connection_manager.BackupStructureConnection", UnhealthyConnection):
+            connections = [await node_connections.get_connection(x) for x in (60000, 60001)]
+
+        for connection in connections:
+            connection.is_healthy = False
+        await asyncio.sleep(0.1)
+
+        # Both backups are reconnected at once, and a reconnect still under way is not started again
+        self.assertEqual([x.reconnects for x in connections], [1, 1])
+
+        connections[0].reconnected.set()
+        await asyncio.sleep(0.05)
+        self.assertTrue(connections[0].is_healthy)
+        self.assertFalse(connections[1].is_healthy)
+        self.assertEqual([x.reconnects for x in connections], [1, 1])
+
+        await node_connections.close()
+
+    async def test_recovers_failed_backup(self):
+        node_connections = BackupNodeConnectionManager(health_check_interval=0.01)
+        with mock.patch("servers.backup.node_connection_manager.BackupStructureConnection", UnhealthyConnection):
+            connection = await node_connections.get_connection(60000)
+            batcher = await node_connections.get_mutation_batcher(60000)
+
+        batcher.submit([mutation("a")])
+        await asyncio.sleep(0.01)
+        connection.mutations.submitted[0][1].set_exception(MutationRejected("Mutation does not refer to a structure"))
+        await asyncio.sleep(0.01)
+        self.assertTrue(batcher.failed)
+
+        # A backup that refused a batch is reconnected, then replicated to again
+        connection.reconnected.set()
+        await asyncio.sleep(0.05)
+        self.assertEqual(connection.reconnects, 1)
+        self.assertFalse(batcher.failed)
+
+        await node_connections.close()
+
+
+class TestBackupNodeServicer(unittest.IsolatedAsyncioTestCase):
+    async def acks(self, *batches: Tuple[str, int], mutations: Sequence[StructureMutation] = ()) -> List[str]:
+        async def sequenced_mutations():
+            for i, (source, sequence) in enumerate(batches):
+                yield SequencedMutation(sequenceNumber=i, batch=MutationBatch(
+                    mutations=mutations, replicationSource=source, replicationSequence=sequence
+                ))
+
+        return [x.error async for x in self.servicer.MutationChannel(sequenced_mutations(), FakeServicerContext())]
+
+    async def test_replication_order(self):
+        self.servicer = BackupNodeServicer()
+
+        # Batches sent again after their acks were lost are acknowledged without being applied twice
+        self.assertEqual(await self.acks(("a", 0), ("a", 1), ("a", 0), ("a", 2)), ["", "", "", ""])
+
+        # A batch ahead of one still to be sent again breaks the stream
+        with self.assertRaises(Exception):
+            await self.acks(("a", 4))
+        self.assertEqual(await self.acks(("a", 3), ("a", 4)), ["", ""])
+
+        # The batches before the first one seen from a primary were lost, so it is refused
+        (error,) = await self.acks(("b", 5))
+        self.assertTrue(error)
+
+    async def test_resumes_partly_applied_batch(self):
+        self.servicer = BackupNodeServicer()
+        applied = []
+        stream_broken = asyncio.Event()
+
+        async def apply(applying: StructureMutation, _) -> StructureMutation:
+            if applying.structureIdentifier == "b" and not stream_broken.is_set():
+                await stream_broken.wait()
+            applied.append(applying.structureIdentifier)
+            return applying
+
+        self.servicer.MutationStream = apply
+        batch = [mutation(x) for x in "abc"]
+
+        # The stream breaks part way through the batch, which is then sent again
+        broken = asyncio.ensure_future(self.acks(("a", 0), mutations=batch))
+        await asyncio.sleep(0.01)
+        broken.cancel()
+        stream_broken.set()
+
+        self.assertEqual(await self.acks(("a", 0), mutations=batch), [""])
+        self.assertEqual(applied, ["a", "b", "c"])
+
+
+if __name__ == '__main__':
+    unittest.main()
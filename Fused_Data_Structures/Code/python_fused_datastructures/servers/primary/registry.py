@@ -3,7 +3,7 @@ from typing import Dict, Optional, List
 
 from servers.structures.primary.interface import PrimaryStructure
 from servers.structures.available_structures import primary_structures
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
 from shared.types import ClusterInformation
 
 
@@ -17,12 +17,13 @@ class PrimaryStructureRegistry:
         structure_type: StructureType,
         cluster_information: ClusterInformation,
         backup_ports: List[int],
+        ack_level: AckLevel = AckLevel.ACK_ALL_BACKUPS
     ) -> PrimaryStructure:
         structure_generator = self.__available_structures.get(structure_type)
         if structure_generator is None:
             raise Exception("Unrecognised structure type")
 
-        structure = structure_generator(cluster_information, backup_ports)
+        structure = structure_generator(cluster_information, backup_ports, ack_level)
         await structure.create_backup_connections()
 
         self.__structures[structure.identifier] = structure
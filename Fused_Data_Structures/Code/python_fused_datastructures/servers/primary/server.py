@@ -1,17 +1,24 @@
 import asyncio
 import logging
+from contextlib import AsyncExitStack
+from typing import AsyncIterator
 
 import grpc
 
-from shared.types import ClusterInformation
+from shared.mutation_channel import acknowledge_mutation
+from shared.types import ClusterInformation, DEFAULT_GALOIS_W
 from .registry import PrimaryStructureRegistry
+from servers.backup.connection_manager import acknowledged_at
+from servers.backup.node_connection_manager import backup_node_connections
 from servers.shared.events import RemoveItemEvent, SetItemEvent
 from protos.service_pb2 import (
     CreatePrimaryStructureRequest,
     CreatePrimaryStructureResponse,
     StructureMutation,
     ValueRequest,
-    ValueResponse, AllValuesRequest, AllValuesResponse,
+    ValueResponse, AllValuesRequest, AllValuesResponse, SequencedMutation, MutationAck, MutationBatch,
+    MutationBatchResponse, ValuesRequest, ValuesResponse, AckLevel, ReplicationQueueDepthsRequest,
+    ReplicationQueueDepthsResponse,
 )
 from protos.service_pb2_grpc import (
     PrimaryDataStructureServicer,
@@ -32,8 +39,10 @@ class PrimaryNodeServicer(PrimaryDataStructureServicer):
         structure = await self.__registry.create(
             request.type,
             ClusterInformation(request.clusterIdentifier,
-                               request.numberOfPrimaries, request.numberOfFaults),
+                               request.numberOfPrimaries, request.numberOfFaults,
+                               request.galoisW or DEFAULT_GALOIS_W, request.codingScheme),
             request.backupPorts,
+            request.ackLevel or AckLevel.ACK_ALL_BACKUPS,
         )
         # Return the identifier of the new structure in the response
         return CreatePrimaryStructureResponse(structureIdentifier=structure.identifier)
@@ -45,13 +54,20 @@ class PrimaryNodeServicer(PrimaryDataStructureServicer):
         if structure is None:
             return None
 
+        # Read before the value, so that a mutation applied in between can only make a cached value look stale
+        version = structure.version
+
+        # Nothing has changed since the requester cached its value, so there is no need to look it up again
+        if request.HasField("cachedVersion") and request.cachedVersion == version:
+            return ValueResponse(version=version, unchanged=True)
+
         # Convert the index based on the structure type
         # key = int(request.key) if isinstance(structure, PrimaryList) else request.key
         key = int(request.key)
         primary_node: PrimaryNode = structure[key]
 
         # Return the value at the specified key in the structure
-        return ValueResponse(value=primary_node.value)
+        return ValueResponse(value=primary_node.value, version=version)
 
     def GetAllValues(self, request: AllValuesRequest, _) -> AllValuesResponse:
         # Retrieve the structure from the registry
@@ -61,7 +77,28 @@ class PrimaryNodeServicer(PrimaryDataStructureServicer):
             return None
 
         # Return the value at the specified key in the structure
-        return AllValuesResponse(values=structure.values_as_map)
+        return AllValuesResponse(values=structure.values_as_map, version=structure.version)
+
+    async def GetValues(self, request: ValuesRequest, context: grpc.aio.ServicerContext) -> ValuesResponse:
+        # Retrieve the structure from the registry
+        structure = self.__registry.get(request.structureIdentifier)
+
+        if structure is None:
+            return None
+
+        if request.HasField("range"):
+            values = structure.values_in_range(request.range.start, request.range.stop)
+            return ValuesResponse(keys=values.keys(), values=values.values(), version=structure.version)
+
+        # Return the values in the order their keys were requested
+        values = []
+        for key in request.keys:
+            try:
+                values.append(structure[key].value)
+            except (IndexError, KeyError):
+                await context.abort(grpc.StatusCode.NOT_FOUND, f"Key {key} not in structure")
+
+        return ValuesResponse(values=values, version=structure.version)
 
     async def MutationStream(self, mutation: StructureMutation, _) -> StructureMutation:
         # Retrieve the structure from the registry
@@ -90,12 +127,52 @@ class PrimaryNodeServicer(PrimaryDataStructureServicer):
                 structure.structure_type
             )
 
-        # Pass the event to the data structure
-        await structure.process_event(event)
+        with acknowledged_at(mutation.ackLevel):
+            # Hold the mutation back while a backup is lagging, rather than queueing ever more for it
+            await structure.backup_connection_manager.wait_for_replication_capacity()
+
+            # Pass the event to the data structure, which returns once as many backups as the ack level asks for have it
+            await structure.process_event(event)
 
         # Echo the mutation back to the requester
         return mutation
 
+    async def MutationChannel(
+        self, mutations: AsyncIterator[SequencedMutation], context: grpc.aio.ServicerContext
+    ) -> AsyncIterator[MutationAck]:
+        # Mutations are applied one at a time in the order they arrive, so they are acknowledged in that order too
+        async for sequenced_mutation in mutations:
+            yield await acknowledge_mutation(self.MutationStream, sequenced_mutation, context)
+
+    async def ApplyMutationBatch(self, batch: MutationBatch, context: grpc.aio.ServicerContext) -> MutationBatchResponse:
+        structures = {x.structureIdentifier: self.__registry.get(x.structureIdentifier) for x in batch.mutations}
+
+        number_of_mutations_applied = 0
+        error = ""
+        # The whole batch is acknowledged at its own level, as its mutations are sent on to the backups together
+        with acknowledged_at(batch.ackLevel):
+            async with AsyncExitStack() as stack:
+                # Each structure's mutations are sent on to the backups together once the whole batch has been applied
+                for structure in structures.values():
+                    if structure is not None:
+                        await stack.enter_async_context(structure.backup_connection_manager.batched())
+
+                for mutation in batch.mutations:
+                    try:
+                        if await self.MutationStream(mutation, context) is None:
+                            error = "Mutation does not refer to a structure on this node"
+                            break
+                    except Exception as e:
+                        error = str(e) or type(e).__name__
+                        break
+
+                    number_of_mutations_applied += 1
+
+        return MutationBatchResponse(numberOfMutationsApplied=number_of_mutations_applied, error=error)
+
+    def GetReplicationQueueDepths(self, request: ReplicationQueueDepthsRequest, _) -> ReplicationQueueDepthsResponse:
+        return ReplicationQueueDepthsResponse(queueDepths=backup_node_connections.queue_depths)
+
 
 async def primary_server_thread(port: int) -> None:
     server = grpc.aio.server()
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from typing import List, Dict, Optional
+from array import array
+from typing import Dict, Iterator, List
 
 from protos.service_pb2 import StructureType
 from servers.observers.console import console_observer
 from servers.shared.decorators import emits, observed_by
 from servers.shared.events import MutationEvent, RemoveItemEvent, SetItemEvent
-from servers.structures.fused.interface import FusedStructure, FusedAuxNode, FusedNode
+from servers.structures.fused.interface import FusedStructure
+from servers.structures.generic.blocked_list import BlockedList
 from shared.types import ClusterInformation
 
 
@@ -14,7 +16,8 @@ from shared.types import ClusterInformation
 class FusedList(FusedStructure):
     def __init__(self, cluster_information: ClusterInformation, backup_code_position: int):
         super().__init__(cluster_information, backup_code_position)
-        self.__aux_structure: Dict[str, List[FusedAuxNode]] = {}
+        # Each primary's list of the fused positions holding its elements, in list order
+        self.__aux_structure: Dict[str, BlockedList[int]] = {}
         self.__aux_structure_initialised = False
         self.__structure_type = StructureType.LIST
 
@@ -26,7 +29,7 @@ class FusedList(FusedStructure):
 
     def _initialise_aux_structure(self) -> None:
         if not self.__aux_structure_initialised and self._registration_lock:
-            self.__aux_structure = {x: [] for x in self.primary_structure_identifiers}
+            self.__aux_structure = {x: BlockedList(indexed=True) for x in self.primary_structure_identifiers}
         self.__aux_structure_initialised = True
 
     @property
@@ -44,32 +47,37 @@ class FusedList(FusedStructure):
 
     @emits(SetItemEvent)
     def add(self, index: int, value: int, primary_structure_identifier: str) -> Dict:
-        aux_node = self._add(value, primary_structure_identifier)
-        self.__aux_structure.get(primary_structure_identifier).insert(index, aux_node)
+        position = self._add(value, primary_structure_identifier)
+        self.__aux_structure.get(primary_structure_identifier).insert(index, position)
 
         return {"index": index, "value": value, "primaryStructureIdentifier": primary_structure_identifier}
 
     @emits(RemoveItemEvent)
     def remove(self, index: int, value: int, value_to_replace_with: int, primary_structure_identifier: str) -> Dict:
-        aux_node = self.__aux_structure.get(primary_structure_identifier).pop(index)
-        self._remove(value, value_to_replace_with, aux_node, primary_structure_identifier)
+        position = self.__aux_structure.get(primary_structure_identifier).pop(index)
+        self._remove(value, value_to_replace_with, position, primary_structure_identifier)
 
         return {"index": index, "value": value, "valueToReplaceWith": value_to_replace_with, "primaryStructureIdentifier": primary_structure_identifier}
 
-    def get_index_data(self) -> List[List[int]]:
-        indexes: List[List[int]] = []
+    def _move_aux(self, primary_structure_identifier: str, aux_key: int, old_position: int, new_position: int) -> None:
+        # List indexes shift on every insert, so moved elements are found by their position rather than an aux key
+        aux_structure = self.__aux_structure.get(primary_structure_identifier)
+        aux_structure[aux_structure.index(old_position)] = new_position
 
-        node: Optional[FusedNode] = self._data_stack.get_first()
-        while node is not None:
-            positions = []
-            for primary_structure_identifier in self.primary_structure_identifiers:
-                aux_node: Optional[FusedAuxNode] = node.aux_nodes[primary_structure_identifier]
-                if aux_node is None:
-                    positions.append(-1)
-                else:
-                    positions.append(self.__aux_structure.get(primary_structure_identifier).index(aux_node))
+    def get_index_data_pages(self, page_size: int, number_of_fused_nodes: int) -> Iterator[List[int]]:
+        # A primary's elements fill the first fused positions, so each page looks up the list index of just the
+        # positions it covers below each primary's length - searching the blocks holding them once a page, rather than
+        # inverting every primary's whole list up front
+        number_of_primaries = self.number_of_primaries
+        aux_structures = [self.__aux_structure.get(x) for x in self.primary_structure_identifiers]
 
-            indexes.append(positions)
-            node = self._data_stack.get_next(node)
+        for start in range(0, number_of_fused_nodes, page_size):
+            stop = min(start + page_size, number_of_fused_nodes)
+            page = array("l", [-1]) * ((stop - start) * number_of_primaries)
 
-        return indexes
+            for j, aux_structure in enumerate(aux_structures):
+                positions = range(start, min(stop, len(aux_structure)))
+                for position, index in zip(positions, aux_structure.indexes(positions)):
+                    page[(position - start) * number_of_primaries + j] = index
+
+            yield page.tolist()
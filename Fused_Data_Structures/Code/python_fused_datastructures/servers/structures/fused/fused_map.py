@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from typing import Dict, SupportsIndex, Optional, List
+from typing import Dict, Iterator, SupportsIndex, Optional, List
 
 from protos.service_pb2 import StructureType
 from servers.observers.console import console_observer
 from servers.shared.decorators import emits, observed_by
 from servers.shared.events import MutationEvent, RemoveItemEvent, SetItemEvent
-from servers.structures.fused.interface import FusedStructure, FusedNode, FusedAuxNode
+from servers.structures.fused.interface import FusedStructure
 from shared.types import ClusterInformation
 
 
@@ -14,7 +14,8 @@ from shared.types import ClusterInformation
 class FusedMap(FusedStructure):
     def __init__(self, cluster_information: ClusterInformation, backup_code_position: int):
         super().__init__(cluster_information, backup_code_position)
-        self.__aux_structure: Dict[str, Dict[SupportsIndex, FusedAuxNode]] = {}
+        # Each primary's map from key to the fused position holding its value, with the key kept as the aux key
+        self.__aux_structure: Dict[str, Dict[SupportsIndex, int]] = {}
         self.__aux_structure_initialised = False
         self.__structure_type = StructureType.MAP
 
@@ -44,39 +45,26 @@ class FusedMap(FusedStructure):
 
     @emits(SetItemEvent)
     def set(self, key: SupportsIndex, value: int, old_value: Optional[int], primary_structure_identifier: str) -> Dict:
-        if key in self.__aux_structure.get(primary_structure_identifier):
-            node_to_update: FusedNode = self.__aux_structure.get(primary_structure_identifier)[key].fused_node
-            node_to_update.remove_element(old_value, primary_structure_identifier, self.backup_code_position, self.fusion_accessor)
-            node_to_update.add_element(value, primary_structure_identifier, self.backup_code_position, self.fusion_accessor)
+        aux_structure = self.__aux_structure.get(primary_structure_identifier)
+        if key in aux_structure:
+            self._update(aux_structure[key], old_value, value, primary_structure_identifier)
         else:
-            aux_node = self._add(value, primary_structure_identifier)
-            self.__aux_structure.get(primary_structure_identifier)[key] = aux_node
+            aux_structure[key] = self._add(value, primary_structure_identifier, int(key))
 
         return {"index": key, "value": value, "primaryStructureIdentifier": primary_structure_identifier}
 
     @emits(RemoveItemEvent)
     def remove(self, key: SupportsIndex, value: int, value_to_replace_with: int, primary_structure_identifier: str) -> Dict:
-        aux_node = self.__aux_structure.get(primary_structure_identifier).pop(key)
-        self._remove(value, value_to_replace_with, aux_node, primary_structure_identifier)
+        position = self.__aux_structure.get(primary_structure_identifier).pop(key)
+        self._remove(value, value_to_replace_with, position, primary_structure_identifier)
 
         return {"index": key, "value": value, "valueToReplaceWith": value_to_replace_with, "primaryStructureIdentifier": primary_structure_identifier}
 
-    def get_index_data(self) -> List[List[int]]:
-        indexes: List[List[int]] = []
-
-        node: Optional[FusedNode] = self._data_stack.get_first()
-        while node is not None:
-            positions = []
-            for primary_structure_identifier in self.primary_structure_identifiers:
-                aux_node: Optional[FusedAuxNode] = node.aux_nodes[primary_structure_identifier]
-                if aux_node is None:
-                    positions.append(-1)
-                else:
-                    aux_structure = self.__aux_structure.get(primary_structure_identifier)
-                    key = next((k for k, v in aux_structure.items() if v == aux_node), None)
-                    positions.append(key)
-
-            indexes.append(positions)
-            node = self._data_stack.get_next(node)
-
-        return indexes
+    def _move_aux(self, primary_structure_identifier: str, aux_key: int, old_position: int, new_position: int) -> None:
+        self.__aux_structure.get(primary_structure_identifier)[aux_key] = new_position
+
+    def get_index_data_pages(self, page_size: int, number_of_fused_nodes: int) -> Iterator[List[int]]:
+        # Every element keeps its key as its aux key, updated whenever a hole is filled, so exporting the index data
+        # is one pass over the stack rather than a search of the aux structure for each element
+        for start in range(0, number_of_fused_nodes, page_size):
+            yield self._data_stack.aux_keys(start, min(start + page_size, number_of_fused_nodes)).tolist()
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 from collections import deque
-from typing import List, Dict, Optional, Deque
+from typing import Dict, Deque, Iterator, List
 
 from protos.service_pb2 import StructureType
 from servers.observers.console import console_observer
 from servers.shared.decorators import emits, observed_by
 from servers.shared.events import MutationEvent, RemoveItemEvent, SetItemEvent
-from servers.structures.fused.interface import FusedStructure, FusedAuxNode, FusedNode
+from servers.structures.fused.interface import FusedStructure, NO_AUX_KEY
 from shared.types import ClusterInformation
 
 
@@ -15,7 +15,9 @@ from shared.types import ClusterInformation
 class FusedQueue(FusedStructure):
     def __init__(self, cluster_information: ClusterInformation, backup_code_position: int):
         super().__init__(cluster_information, backup_code_position)
-        self.__aux_structure: Dict[str, Deque[FusedAuxNode]] = {}
+        # Each primary's queue of the fused positions holding its elements, where the element enqueued n-th has aux key n
+        self.__aux_structure: Dict[str, Deque[int]] = {}
+        self.__number_dequeued: Dict[str, int] = {}
         self.__aux_structure_initialised = False
         self.__structure_type = StructureType.QUEUE
 
@@ -28,6 +30,7 @@ class FusedQueue(FusedStructure):
     def _initialise_aux_structure(self) -> None:
         if not self.__aux_structure_initialised and self._registration_lock:
             self.__aux_structure = {x: deque() for x in self.primary_structure_identifiers}
+            self.__number_dequeued = {x: 0 for x in self.primary_structure_identifiers}
         self.__aux_structure_initialised = True
 
     @property
@@ -45,34 +48,36 @@ class FusedQueue(FusedStructure):
 
     @emits(SetItemEvent)
     def enqueue(self, value: int, primary_structure_identifier: str) -> Dict:
-        aux_node = self._add(value, primary_structure_identifier)
-        self.__aux_structure.get(primary_structure_identifier).append(aux_node)
+        aux_structure = self.__aux_structure.get(primary_structure_identifier)
+        aux_key = self.__number_dequeued[primary_structure_identifier] + len(aux_structure)
+        aux_structure.append(self._add(value, primary_structure_identifier, aux_key))
         insert_index = len(self.__aux_structure) - 1
 
         return {"index": insert_index, "value": value, "primaryStructureIdentifier": primary_structure_identifier}
 
     @emits(RemoveItemEvent)
     def dequeue(self, value: int, value_to_replace_with: int, primary_structure_identifier: str) -> Dict:
-        aux_node = self.__aux_structure.get(primary_structure_identifier).popleft()
-        self._remove(value, value_to_replace_with, aux_node, primary_structure_identifier)
+        position = self.__aux_structure.get(primary_structure_identifier).popleft()
+        self.__number_dequeued[primary_structure_identifier] += 1
+        self._remove(value, value_to_replace_with, position, primary_structure_identifier)
         index = 0
 
         return {"index": index, "value": value, "valueToReplaceWith": value_to_replace_with, "primaryStructureIdentifier": primary_structure_identifier}
 
-    def get_index_data(self) -> List[List[int]]:
-        indexes: List[List[int]] = []
-
-        node: Optional[FusedNode] = self._data_stack.get_first()
-        while node is not None:
-            positions = []
-            for primary_structure_identifier in self.primary_structure_identifiers:
-                aux_node: Optional[FusedAuxNode] = node.aux_nodes[primary_structure_identifier]
-                if aux_node is None:
-                    positions.append(-1)
-                else:
-                    positions.append(self.__aux_structure.get(primary_structure_identifier).index(aux_node))
-
-            indexes.append(positions)
-            node = self._data_stack.get_next(node)
-
-        return indexes
+    def _move_aux(self, primary_structure_identifier: str, aux_key: int, old_position: int, new_position: int) -> None:
+        aux_structure = self.__aux_structure.get(primary_structure_identifier)
+        aux_structure[aux_key - self.__number_dequeued[primary_structure_identifier]] = new_position
+
+    def get_index_data_pages(self, page_size: int, number_of_fused_nodes: int) -> Iterator[List[int]]:
+        # An element's place in its queue is how many elements were enqueued before it and are still queued
+        number_of_primaries = self.number_of_primaries
+        for start in range(0, number_of_fused_nodes, page_size):
+            page = self._data_stack.aux_keys(start, min(start + page_size, number_of_fused_nodes)).tolist()
+            for j, primary_structure_identifier in enumerate(self.primary_structure_identifiers):
+                number_dequeued = self.__number_dequeued[primary_structure_identifier]
+                page[j::number_of_primaries] = [
+                    aux_key - number_dequeued if aux_key != NO_AUX_KEY else -1
+                    for aux_key in page[j::number_of_primaries]
+                ]
+
+            yield page
@@ -1,82 +1,116 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Dict, Optional, List
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from protos.service_pb2 import StructureType
-from servers.structures.generic.doubly_linked_list import DoublyLinkedNode, DoublyLinkedList
 from servers.structures.interface import Structure
 
-from uuid import uuid4
-
 from shared.types import ClusterInformation
 from shared.fusion import FusionAccessor
 
 
-class FusedNode(DoublyLinkedNode):
-    """Store of information in the fused structure"""
+# Aux key of a position holding no element, or of an element whose aux structure does not need to be told it moved
+NO_AUX_KEY = -1
+
+
+class FusedStack:
+    """Columnar stack of fused nodes, where each node is a position in a few packed arrays rather than an object
+
+    Node `p` holds its code in `codes[p]`, the aux key of each primary's element in `aux_keys[p * k + j]` and the number
+    of elements fused into it in `ref_counts[p]`. The elements of primary `j` always occupy the first `size(j)` nodes.
+    """
+
+    def __init__(self, number_of_primaries: int) -> None:
+        self.__number_of_primaries = number_of_primaries
+        self.__codes = array("l")
+        self.__aux_keys = array("l")
+        self.__ref_counts = bytearray() if number_of_primaries < 256 else array("I")
+        self.__sizes = [0] * number_of_primaries
+        self.__empty_aux_keys = array("l", [NO_AUX_KEY]) * number_of_primaries
 
-    def __init__(self, primary_structure_identifiers: List[str]) -> None:
-        super().__init__()
-        self.__identifier = str(uuid4())
-        self.__primary_structure_identifiers = primary_structure_identifiers
-        self.__encoded_data = 0
-        self.aux_nodes: Dict[str, Optional[FusedAuxNode]] = {x: None for x in primary_structure_identifiers}
-        self.__ref_count = 0
+    def __len__(self) -> int:
+        return len(self.__codes)
 
-    def __repr__(self):
-        return self.__identifier
+    @property
+    def codes(self) -> array:
+        return self.__codes
+
+    def size(self, primary_structure_position: int) -> int:
+        return self.__sizes[primary_structure_position]
+
+    def aux_keys(self, start: int, stop: int) -> array:
+        """Aux keys of the nodes from `start` up to `stop`, with each node's k keys in turn"""
+        return self.__aux_keys[start * self.__number_of_primaries:stop * self.__number_of_primaries]
 
-    def add_element(
+    def push_element(
         self,
         new_element,
-        primary_structure_identifier: str,
+        primary_structure_position: int,
+        aux_key: int,
+        backup_code_position: int,
+        fusion_accessor: FusionAccessor
+    ) -> int:
+        """Fuse `new_element` into the node above the primary's current top, returning its position"""
+        position = self.__sizes[primary_structure_position]
+        if position == len(self.__codes):
+            self.__codes.append(0)
+            self.__aux_keys.extend(self.__empty_aux_keys)
+            self.__ref_counts.append(0)
+
+        self.update_element(position, 0, new_element, primary_structure_position, backup_code_position, fusion_accessor)
+        self.__aux_keys[position * self.__number_of_primaries + primary_structure_position] = aux_key
+        self.__ref_counts[position] += 1
+        self.__sizes[primary_structure_position] += 1
+
+        return position
+
+    def pop_element(
+        self,
+        final_element,
+        primary_structure_position: int,
         backup_code_position: int,
         fusion_accessor: FusionAccessor
     ) -> None:
-        primary_structure_position = self.__primary_structure_identifiers.index(primary_structure_identifier)
+        """Remove `final_element`, the primary's top element, from the stack"""
+        position = self.__sizes[primary_structure_position] - 1
 
-        self.__encoded_data = fusion_accessor.get_updated_code(
-            self.__encoded_data or 0,
-            backup_code_position,
-            0,
-            int(new_element),
-            primary_structure_position
-        )
+        self.update_element(position, final_element, 0, primary_structure_position, backup_code_position, fusion_accessor)
+        self.__aux_keys[position * self.__number_of_primaries + primary_structure_position] = NO_AUX_KEY
+        self.__ref_counts[position] -= 1
+        self.__sizes[primary_structure_position] -= 1
 
-        self.__ref_count += 1
+        # Every primary's elements sit at the bottom of the stack, so only the top node can ever become empty
+        if self.__ref_counts[position] == 0:
+            del self.__codes[-1]
+            del self.__aux_keys[-self.__number_of_primaries:]
+            del self.__ref_counts[-1]
 
-    def remove_element(
+    def update_element(
         self,
+        position: int,
         old_element,
-        primary_structure_identifier: str,
+        new_element,
+        primary_structure_position: int,
         backup_code_position: int,
         fusion_accessor: FusionAccessor
     ) -> None:
-        primary_structure_position = self.__primary_structure_identifiers.index(primary_structure_identifier)
-
-        self.__encoded_data = fusion_accessor.get_updated_code(
-            self.__encoded_data or 0,
+        """Replace `old_element` with `new_element` in place, without changing the number of elements held"""
+        self.__codes[position] = fusion_accessor.get_updated_code(
+            self.__codes[position],
             backup_code_position,
             int(old_element),
-            0,
+            int(new_element),
             primary_structure_position
         )
 
-        self.__ref_count -= 1
-
-    def is_empty(self) -> bool:
-        return self.__ref_count == 0
-
-    @property
-    def encoded_data(self) -> int:
-        return self.__encoded_data
-
+    def move_aux_key(self, old_position: int, new_position: int, primary_structure_position: int) -> int:
+        """Copy the aux key of a primary's element to the position it is moving to, returning it"""
+        aux_key = self.__aux_keys[old_position * self.__number_of_primaries + primary_structure_position]
+        self.__aux_keys[new_position * self.__number_of_primaries + primary_structure_position] = aux_key
 
-@dataclass
-class FusedAuxNode:
-    fused_node: FusedNode
+        return aux_key
 
 
 class FusedStructure(Structure, ABC):
@@ -84,18 +118,34 @@ class FusedStructure(Structure, ABC):
         super().__init__(cluster_information)
         self.primary_structure_identifiers: List[str] = []
         self._registration_lock = False
-        self.__data_stack = DoublyLinkedList[FusedNode]()
-        self.__fused_node_top_of_stack: Dict[str, Optional[FusedNode]] = {}
+        self.__data_stack = FusedStack(cluster_information.number_of_primaries)
+        self.__primary_structure_positions: Dict[str, int] = {}
+        self.__version = 0
         self.__backup_code_position = backup_code_position
         self.__fusion_accessor = FusionAccessor(
             number_of_primaries=cluster_information.number_of_primaries,
-            number_of_faults=cluster_information.number_of_faults
+            number_of_faults=cluster_information.number_of_faults,
+            galois_w=cluster_information.galois_w,
+            coding_scheme=cluster_information.coding_scheme
         )
 
     @property
-    def _data_stack(self) -> DoublyLinkedList[FusedNode]:
+    def _data_stack(self) -> FusedStack:
         return self.__data_stack
 
+    @property
+    def version(self) -> int:
+        """Number of changes made to the fused nodes, so that reads spanning several awaits can detect a mutation"""
+        return self.__version
+
+    @property
+    def number_of_fused_nodes(self) -> int:
+        return len(self.__data_stack)
+
+    def number_of_fused_nodes_holding(self, primary_structure_positions: Iterable[int]) -> int:
+        """Number of fused nodes holding an element of any of the primaries, which are always the first of the stack"""
+        return max((self.__data_stack.size(x) for x in primary_structure_positions), default=0)
+
     @property
     def backup_code_position(self) -> int:
         return self.__backup_code_position
@@ -113,76 +163,71 @@ class FusedStructure(Structure, ABC):
         if self._registration_lock:
             raise Exception("All expected primaries have already been registered to this structure")
 
+        self.__primary_structure_positions[primary_structure_identifier] = len(self.primary_structure_identifiers)
         self.primary_structure_identifiers.append(primary_structure_identifier)
-        self.__fused_node_top_of_stack[primary_structure_identifier] = None
 
         if len(self.primary_structure_identifiers) == self.number_of_primaries:
             self._registration_lock = True
 
-    def _add(self, element, primary_structure_identifier: str) -> FusedAuxNode:
-        """Create/add to fused node logic and return it so the caller function can use it to add to aux structure"""
+    def _primary_structure_position(self, primary_structure_identifier: str) -> int:
+        return self.__primary_structure_positions[primary_structure_identifier]
+
+    def _add(self, element, primary_structure_identifier: str, aux_key: int = NO_AUX_KEY) -> int:
+        """Fuse a new element and return its position, so the caller function can use it to add to aux structure"""
         if not self._registration_lock:
             raise Exception("Not all expected primaries have been registered to this structure")
 
-        node_to_update: FusedNode
-        # logic to find which fused node to update
-        if self.__data_stack.is_empty() or self.__fused_node_top_of_stack[primary_structure_identifier] == self.__data_stack.get_last():
-            node_to_update = FusedNode(primary_structure_identifiers=self.primary_structure_identifiers)
-            self.__data_stack.insert_end(node_to_update)
-        else:
-            if self.__fused_node_top_of_stack[primary_structure_identifier] is None:
-                node_to_update = self.__data_stack.get_first()
-            else:
-                node_to_update = self.__data_stack.get_next(self.__fused_node_top_of_stack[primary_structure_identifier])
-        self.__fused_node_top_of_stack[primary_structure_identifier] = node_to_update
-
-        node_to_update.add_element(element, primary_structure_identifier, self.backup_code_position, self.fusion_accessor)
-
-        aux_node = FusedAuxNode(fused_node=node_to_update)
-        node_to_update.aux_nodes[primary_structure_identifier] = aux_node
-
-        return aux_node
+        self.__version += 1
+        return self.__data_stack.push_element(
+            element,
+            self._primary_structure_position(primary_structure_identifier),
+            aux_key,
+            self.backup_code_position,
+            self.fusion_accessor
+        )
 
-    def _remove(self, element, final_element, aux_node: FusedAuxNode, primary_structure_identifier: str):
-        """Remove data from fused node and return it so the caller function can use it to add to aux structure"""
+    def _update(self, position: int, old_element, new_element, primary_structure_identifier: str) -> None:
+        self.__version += 1
+        self.__data_stack.update_element(
+            position,
+            old_element,
+            new_element,
+            self._primary_structure_position(primary_structure_identifier),
+            self.backup_code_position,
+            self.fusion_accessor
+        )
 
-        node_to_update = aux_node.fused_node
+    def _remove(self, element, final_element, position: int, primary_structure_identifier: str) -> None:
+        """Remove an element from its fused node, moving the primary's final element into any hole left behind"""
+        primary_structure_position = self._primary_structure_position(primary_structure_identifier)
+        top_position = self.__data_stack.size(primary_structure_position) - 1
+        self.__version += 1
 
-        if node_to_update != self.__fused_node_top_of_stack[primary_structure_identifier]:
+        if position != top_position:
             # hole has been created
-            node_to_update.remove_element(
-                element, primary_structure_identifier, self.backup_code_position, self.fusion_accessor
-            )
-            node_to_update.add_element(
-                final_element, primary_structure_identifier, self.backup_code_position, self.fusion_accessor
-            )
-            final_aux_node = self.__fused_node_top_of_stack[primary_structure_identifier].aux_nodes[primary_structure_identifier]
-            final_aux_node.fused_node = node_to_update
-            node_to_update.aux_nodes[primary_structure_identifier] = final_aux_node
-            self.__fused_node_top_of_stack[primary_structure_identifier].aux_nodes[primary_structure_identifier] = None
-
-        self.__fused_node_top_of_stack[primary_structure_identifier].remove_element(
-            final_element, primary_structure_identifier, self.backup_code_position, self.fusion_accessor
-        )
-        final_node: FusedNode = self.__fused_node_top_of_stack[primary_structure_identifier]
-
-        if final_node.is_empty():
-            self.__data_stack.pop()
+            self._update(position, element, final_element, primary_structure_identifier)
+            aux_key = self.__data_stack.move_aux_key(top_position, position, primary_structure_position)
+            self._move_aux(primary_structure_identifier, aux_key, top_position, position)
 
-        self.__fused_node_top_of_stack[primary_structure_identifier] = self.__data_stack.get_previous(
-            self.__fused_node_top_of_stack[primary_structure_identifier]
+        self.__data_stack.pop_element(
+            final_element, primary_structure_position, self.backup_code_position, self.fusion_accessor
         )
 
-    def get_fused_data(self) -> List[int]:
-        data = []
+    @abstractmethod
+    def _move_aux(self, primary_structure_identifier: str, aux_key: int, old_position: int, new_position: int) -> None:
+        """Point the aux structure entry of an element that has moved between fused nodes at its new position"""
+        pass
 
-        node: Optional[FusedNode] = self._data_stack.get_first()
-        while node is not None:
-            data.append(node.encoded_data)
-            node = self._data_stack.get_next(node)
+    def get_fused_data(self, start: int = 0, stop: Optional[int] = None) -> List[int]:
+        return self.__data_stack.codes[start:stop].tolist()
 
-        return data
+    def get_index_data(self) -> List[List[int]]:
+        index_data = next(self.get_index_data_pages(max(len(self.__data_stack), 1), len(self.__data_stack)), [])
+        number_of_primaries = self.number_of_primaries
+
+        return [index_data[i:i + number_of_primaries] for i in range(0, len(index_data), number_of_primaries)]
 
     @abstractmethod
-    def get_index_data(self) -> List[List[int]]:
+    def get_index_data_pages(self, page_size: int, number_of_fused_nodes: int) -> Iterator[List[int]]:
+        """Index data of the first fused nodes, `page_size` at a time, with one entry per primary for each node in turn"""
         pass
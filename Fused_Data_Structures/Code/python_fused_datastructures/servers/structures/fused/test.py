@@ -0,0 +1,155 @@
+import random
+import unittest
+
+from servers.structures.fused.fused_list import FusedList
+from servers.structures.fused.interface import FusedStack, NO_AUX_KEY
+from shared.fusion import FusionAccessor
+from shared.types import ClusterInformation
+
+
+class TestFusedStack(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(347)
+
+    def expected_codes(self, elements, backup_code_position, fusion_accessor):
+        # Encode each node from scratch out of the elements every primary holds at it
+        codes = []
+        for position in range(max(map(len, elements), default=0)):
+            code = 0
+            for primary_structure_position, primary_elements in enumerate(elements):
+                if position < len(primary_elements):
+                    code = fusion_accessor.get_updated_code(
+                        code, backup_code_position, 0, primary_elements[position][0], primary_structure_position
+                    )
+            codes.append(code)
+
+        return codes
+
+    def test_matches_model(self):
+        number_of_primaries = 4
+        fusion_accessor = FusionAccessor(number_of_primaries, 3)
+
+        for backup_code_position in range(3):
+            stack = FusedStack(number_of_primaries)
+            # (value, aux key) of each element of each primary, in the order they sit in the stack
+            elements = [[] for _ in range(number_of_primaries)]
+            next_aux_key = 0
+
+            for _ in range(2000):
+                j = self.random.randrange(number_of_primaries)
+                operation = self.random.random()
+
+                if operation < 0.45 or not elements[j]:
+                    value = self.random.getrandbits(16)
+                    position = stack.push_element(value, j, next_aux_key, backup_code_position, fusion_accessor)
+                    self.assertEqual(position, len(elements[j]))
+                    elements[j].append((value, next_aux_key))
+                    next_aux_key += 1
+                elif operation < 0.65:
+                    value, _ = elements[j].pop()
+                    stack.pop_element(value, j, backup_code_position, fusion_accessor)
+                elif operation < 0.9:
+                    # Remove from the middle by moving the primary's final element into the hole, as FusedStructure does
+                    position = self.random.randrange(len(elements[j]))
+                    top_position = len(elements[j]) - 1
+                    value, _ = elements[j][position]
+                    final_value, final_aux_key = elements[j][top_position]
+
+                    if position != top_position:
+                        stack.update_element(position, value, final_value, j, backup_code_position, fusion_accessor)
+                        self.assertEqual(stack.move_aux_key(top_position, position, j), final_aux_key)
+                        elements[j][position] = elements[j][top_position]
+
+                    stack.pop_element(final_value, j, backup_code_position, fusion_accessor)
+                    elements[j].pop()
+                else:
+                    position = self.random.randrange(len(elements[j]))
+                    value, aux_key = elements[j][position]
+                    new_value = self.random.getrandbits(16)
+                    stack.update_element(position, value, new_value, j, backup_code_position, fusion_accessor)
+                    elements[j][position] = (new_value, aux_key)
+
+                # Only as many nodes are kept as the longest primary needs
+                self.assertEqual(len(stack), max(map(len, elements)))
+                self.assertEqual([stack.size(x) for x in range(number_of_primaries)], list(map(len, elements)))
+
+            self.assertEqual(
+                list(stack.codes), self.expected_codes(elements, backup_code_position, fusion_accessor)
+            )
+            self.assertEqual(list(stack.aux_keys(0, len(stack))), [
+                elements[j][position][1] if position < len(elements[j]) else NO_AUX_KEY
+                for position in range(len(stack)) for j in range(number_of_primaries)
+            ])
+
+    def test_top_node_dropped_when_empty(self):
+        fusion_accessor = FusionAccessor(3, 1)
+        stack = FusedStack(3)
+
+        stack.push_element(1, 0, 10, 0, fusion_accessor)
+        stack.push_element(2, 0, 11, 0, fusion_accessor)
+        stack.push_element(3, 1, 20, 0, fusion_accessor)
+        self.assertEqual(list(stack.codes), [1 ^ 3, 2])
+
+        # The top node still holds primary 0's element after primary 1 leaves the bottom node
+        stack.pop_element(3, 1, 0, fusion_accessor)
+        self.assertEqual(list(stack.codes), [1, 2])
+        stack.pop_element(2, 0, 0, fusion_accessor)
+        self.assertEqual(list(stack.codes), [1])
+        self.assertEqual(list(stack.aux_keys(0, 1)), [10, NO_AUX_KEY, NO_AUX_KEY])
+
+        stack.pop_element(1, 0, 0, fusion_accessor)
+        self.assertEqual(len(stack), 0)
+        self.assertEqual(list(stack.aux_keys(0, 1)), [])
+
+    def test_ref_counts_beyond_a_byte(self):
+        # More primaries than a byte can count need wider ref counts
+        number_of_primaries = 300
+        fusion_accessor = FusionAccessor(number_of_primaries, 1)
+        stack = FusedStack(number_of_primaries)
+
+        for j in range(number_of_primaries):
+            self.assertEqual(stack.push_element(j, j, j, 0, fusion_accessor), 0)
+        self.assertEqual(len(stack), 1)
+
+        for j in range(number_of_primaries - 1):
+            stack.pop_element(j, j, 0, fusion_accessor)
+            self.assertEqual(len(stack), 1)
+
+        self.assertEqual(stack.codes[0], number_of_primaries - 1)
+        stack.pop_element(number_of_primaries - 1, number_of_primaries - 1, 0, fusion_accessor)
+        self.assertEqual(len(stack), 0)
+
+
+class TestFusedList(unittest.IsolatedAsyncioTestCase):
+    async def test_index_data_pages(self):
+        rng = random.Random(347)
+        fused_list = FusedList(ClusterInformation("cluster", 3, 1), 0)
+        identifiers = [f"primary{j}" for j in range(3)]
+        for identifier in identifiers:
+            fused_list.register_primary_structure_identifier(identifier)
+        fused_list._initialise_aux_structure()
+
+        # Only the list positions matter to the index data, so every value is zero
+        lengths = [0] * len(identifiers)
+        for _ in range(600):
+            j = rng.randrange(len(identifiers))
+            if lengths[j] and rng.random() < 0.3:
+                await fused_list.remove(rng.randrange(lengths[j]), 0, 0, identifiers[j])
+                lengths[j] -= 1
+            else:
+                await fused_list.add(rng.randrange(lengths[j] + 1), 0, identifiers[j])
+                lengths[j] += 1
+
+        # Pages of any size read the same index data as a single page, however few of the fused nodes are asked for
+        index_data = [x for row in fused_list.get_index_data() for x in row]
+        for number_of_fused_nodes in (max(lengths), min(lengths), 0):
+            pages = list(fused_list.get_index_data_pages(7, number_of_fused_nodes))
+            self.assertTrue(all(len(x) == 7 * 3 for x in pages[:-1]))
+            self.assertEqual([x for page in pages for x in page], index_data[:number_of_fused_nodes * 3])
+
+        for j, length in enumerate(lengths):
+            self.assertEqual(sorted(x for x in index_data[j::3] if x != -1), list(range(length)))
+
+
+if __name__ == '__main__':
+    unittest.main()
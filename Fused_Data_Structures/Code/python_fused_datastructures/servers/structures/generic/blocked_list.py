@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from typing import Dict, Generic, Iterable, Iterator, List, Tuple, TypeVar, Union
+
+T = TypeVar('T')
+
+# Blocks are split once they hold twice this many items, and merged into a neighbour below half of it
+BLOCK_SIZE = 256
+
+
+class BlockedList(Generic[T]):
+    """
+    List stored as a sequence of bounded blocks, with a Fenwick tree over the block lengths, so that insert, pop and
+    access by index cost O(log n + BLOCK_SIZE) rather than O(n). When `indexed`, items must be unique and hashable,
+    and each one's rank can also be found in O(log n + BLOCK_SIZE)
+    """
+
+    def __init__(self, items: Iterable[T] = (), indexed: bool = False):
+        self.__indexed = indexed
+        self.__blocks: List[List[T]] = []
+        self.__item_blocks: Dict[T, List[T]] = {}
+        self.__block_indexes: Dict[int, int] = {}
+        self.__tree: List[int] = [0]
+        self.__step = 0
+
+        items = list(items)
+        self.__length = len(items)
+        for start in range(0, len(items), BLOCK_SIZE):
+            self.__blocks.append(items[start:start + BLOCK_SIZE])
+
+        if indexed:
+            for block in self.__blocks:
+                self.__item_blocks.update(dict.fromkeys(block, block))
+
+        self.__rebuild()
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __iter__(self) -> Iterator[T]:
+        for block in self.__blocks:
+            yield from block
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            return self.__slice(index)
+
+        block_index, offset = self.__locate(self.__normalise_index(index))
+        return self.__blocks[block_index][offset]
+
+    def __setitem__(self, index: int, item: T) -> None:
+        block_index, offset = self.__locate(self.__normalise_index(index))
+        block = self.__blocks[block_index]
+
+        if self.__indexed:
+            del self.__item_blocks[block[offset]]
+            self.__item_blocks[item] = block
+        block[offset] = item
+
+    def append(self, item: T) -> None:
+        self.insert(self.__length, item)
+
+    def insert(self, index: int, item: T) -> None:
+        # Out of range indexes are clamped, as with list.insert
+        if index < 0:
+            index = max(index + self.__length, 0)
+        index = min(index, self.__length)
+
+        if not self.__blocks:
+            self.__blocks.append([])
+            self.__rebuild()
+
+        if index == self.__length:
+            block_index = len(self.__blocks) - 1
+            offset = len(self.__blocks[block_index])
+        else:
+            block_index, offset = self.__locate(index)
+
+        block = self.__blocks[block_index]
+        block.insert(offset, item)
+        self.__length += 1
+        if self.__indexed:
+            self.__item_blocks[item] = block
+
+        if len(block) > 2 * BLOCK_SIZE:
+            self.__split(block_index)
+        else:
+            self.__adjust(block_index, 1)
+
+    def pop(self, index: int = -1) -> T:
+        block_index, offset = self.__locate(self.__normalise_index(index))
+        block = self.__blocks[block_index]
+
+        item = block.pop(offset)
+        self.__length -= 1
+        if self.__indexed:
+            del self.__item_blocks[item]
+
+        if len(block) < BLOCK_SIZE // 2 and len(self.__blocks) > 1:
+            self.__merge(block_index)
+        elif not block:
+            self.__blocks.clear()
+            self.__rebuild()
+        else:
+            self.__adjust(block_index, -1)
+
+        return item
+
+    def index(self, item: T) -> int:
+        if not self.__indexed:
+            for position, x in enumerate(self):
+                if x == item:
+                    return position
+            raise ValueError(f"{item} is not in list")
+
+        block = self.__item_blocks.get(item)
+        if block is None:
+            raise ValueError(f"{item} is not in list")
+
+        block_index = self.__block_indexes[id(block)]
+        return self.__prefix(block_index) + block.index(item)
+
+    def indexes(self, items: Iterable[T]) -> List[int]:
+        """Rank of each of `items`, searching each block they are found in once however many of them it holds"""
+        items = list(items)
+        if not self.__indexed:
+            return [self.index(x) for x in items]
+
+        wanted_by_block: Dict[int, List[int]] = {}
+        for i, item in enumerate(items):
+            block = self.__item_blocks.get(item)
+            if block is None:
+                raise ValueError(f"{item} is not in list")
+            wanted_by_block.setdefault(self.__block_indexes[id(block)], []).append(i)
+
+        ranks = [0] * len(items)
+        for block_index, wanted in wanted_by_block.items():
+            block = self.__blocks[block_index]
+            start = self.__prefix(block_index)
+
+            if len(wanted) == 1:
+                ranks[wanted[0]] = start + block.index(items[wanted[0]])
+                continue
+
+            offsets = {x: i for i, x in enumerate(block)}
+            for i in wanted:
+                ranks[i] = start + offsets[items[i]]
+
+        return ranks
+
+    def __normalise_index(self, index: int) -> int:
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("list index out of range")
+
+        return index
+
+    def __slice(self, index: slice) -> List[T]:
+        start, stop, step = index.indices(self.__length)
+        if step != 1:
+            return [self[i] for i in range(start, stop, step)]
+
+        # Find the first block once, then copy whole blocks rather than locating every item
+        items = []
+        if start >= stop:
+            return items
+
+        block_index, offset = self.__locate(start)
+        while len(items) < stop - start:
+            block = self.__blocks[block_index]
+            items.extend(block[offset:offset + stop - start - len(items)])
+            block_index += 1
+            offset = 0
+
+        return items
+
+    def __locate(self, index: int) -> Tuple[int, int]:
+        # Descend the Fenwick tree to the last block whose preceding blocks hold no more than `index` items
+        position = 0
+        step = self.__step
+        while step:
+            next_position = position + step
+            if next_position < len(self.__tree) and self.__tree[next_position] <= index:
+                position = next_position
+                index -= self.__tree[next_position]
+            step >>= 1
+
+        return position, index
+
+    def __prefix(self, block_index: int) -> int:
+        total = 0
+        while block_index:
+            total += self.__tree[block_index]
+            block_index -= block_index & -block_index
+
+        return total
+
+    def __adjust(self, block_index: int, delta: int) -> None:
+        position = block_index + 1
+        while position < len(self.__tree):
+            self.__tree[position] += delta
+            position += position & -position
+
+    def __split(self, block_index: int) -> None:
+        block = self.__blocks[block_index]
+        second_half = block[BLOCK_SIZE:]
+        del block[BLOCK_SIZE:]
+
+        self.__blocks.insert(block_index + 1, second_half)
+        if self.__indexed:
+            self.__item_blocks.update(dict.fromkeys(second_half, second_half))
+
+        self.__rebuild()
+
+    def __merge(self, block_index: int) -> None:
+        first = block_index if block_index + 1 < len(self.__blocks) else block_index - 1
+        block, next_block = self.__blocks[first], self.__blocks[first + 1]
+
+        block.extend(next_block)
+        del self.__blocks[first + 1]
+        if self.__indexed:
+            self.__item_blocks.update(dict.fromkeys(next_block, block))
+
+        if len(block) > 2 * BLOCK_SIZE:
+            self.__split(first)
+        else:
+            self.__rebuild()
+
+    def __rebuild(self) -> None:
+        # Blocks only change after O(BLOCK_SIZE) mutations, so rebuilding the tree in O(n / BLOCK_SIZE) is amortised
+        self.__tree = [0] + [len(x) for x in self.__blocks]
+        for position in range(1, len(self.__tree)):
+            parent = position + (position & -position)
+            if parent < len(self.__tree):
+                self.__tree[parent] += self.__tree[position]
+
+        self.__step = 1 << (len(self.__blocks).bit_length() - 1) if self.__blocks else 0
+        self.__block_indexes = {id(x): i for i, x in enumerate(self.__blocks)}
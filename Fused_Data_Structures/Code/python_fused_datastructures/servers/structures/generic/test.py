@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from servers.structures.generic import blocked_list
+from servers.structures.generic.blocked_list import BlockedList
+
+
+class TestBlockedList(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(347)
+        # Small blocks so that splits and merges happen constantly
+        self.block_size = blocked_list.BLOCK_SIZE
+        blocked_list.BLOCK_SIZE = 4
+
+    def tearDown(self):
+        blocked_list.BLOCK_SIZE = self.block_size
+
+    def test_matches_list(self):
+        for indexed in (False, True):
+            expected = list(range(50))
+            items = BlockedList(expected, indexed=indexed)
+            next_item = len(expected)
+
+            for _ in range(5000):
+                operation = self.random.random()
+                if operation < 0.45 or not expected:
+                    index = self.random.randint(-len(expected) - 2, len(expected) + 2)
+                    expected.insert(index, next_item)
+                    items.insert(index, next_item)
+                    next_item += 1
+                elif operation < 0.9:
+                    index = self.random.randrange(-len(expected), len(expected))
+                    self.assertEqual(items.pop(index), expected.pop(index))
+                else:
+                    index = self.random.randrange(len(expected))
+                    expected[index] = next_item
+                    items[index] = next_item
+                    next_item += 1
+
+                self.assertEqual(len(items), len(expected))
+                if expected:
+                    index = self.random.randrange(len(expected))
+                    self.assertEqual(items[index], expected[index])
+                    self.assertEqual(items.index(expected[index]), index)
+
+                    sample = self.random.sample(range(len(expected)), min(len(expected), 10))
+                    self.assertEqual(items.indexes(expected[x] for x in sample), sample)
+
+                    start, stop = self.random.randint(-3, len(expected) + 3), self.random.randint(-3, len(expected) + 3)
+                    self.assertEqual(items[start:stop], expected[start:stop])
+
+            self.assertEqual(list(items), expected)
+
+    def test_empty(self):
+        items = BlockedList(indexed=True)
+        items.append(1)
+        self.assertEqual(items.pop(), 1)
+        self.assertEqual(list(items), [])
+
+        with self.assertRaises(IndexError):
+            items.pop()
+        with self.assertRaises(IndexError):
+            _ = items[0]
+        with self.assertRaises(ValueError):
+            items.index(1)
+
+        items.insert(5, 2)
+        self.assertEqual(list(items), [2])
+        self.assertEqual(items[1:], [])
+        self.assertEqual(items[::-1], [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,3 +29,11 @@ class Structure(ABC):
     @property
     def number_of_faults(self) -> int:
         return self.__cluster_information.number_of_faults
+
+    @property
+    def galois_w(self) -> int:
+        return self.__cluster_information.galois_w
+
+    @property
+    def coding_scheme(self) -> int:
+        return self.__cluster_information.coding_scheme
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict
 from uuid import uuid4
 
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
 from servers.backup.connection_manager import BackupStructureConnectionManager
 from servers.structures.generic.doubly_linked_list import DoublyLinkedNode, DoublyLinkedList
 from servers.structures.interface import Structure
@@ -27,15 +27,26 @@ class PrimaryAuxNode:
 
 
 class PrimaryStructure(Structure):
-    def __init__(self, cluster_information: ClusterInformation, backup_ports: List[int]):
+    def __init__(
+        self,
+        cluster_information: ClusterInformation,
+        backup_ports: List[int],
+        ack_level: AckLevel = AckLevel.ACK_ALL_BACKUPS
+    ):
         super().__init__(cluster_information)
-        self.__backup_connection_manager = BackupStructureConnectionManager(backup_ports)
+        self.__backup_connection_manager = BackupStructureConnectionManager(backup_ports, ack_level=ack_level)
         self.__data_stack = DoublyLinkedList[PrimaryAuxNode]()
+        self.__version = 0
 
     @property
     def backup_connection_manager(self) -> BackupStructureConnectionManager:
         return self.__backup_connection_manager
 
+    @property
+    def version(self) -> int:
+        """Number of mutations applied, so that clients can tell whether values they have cached are still current"""
+        return self.__version
+
     @abstractmethod
     async def create_backup_connections(self) -> None:
         pass
@@ -49,6 +60,11 @@ class PrimaryStructure(Structure):
     def values_as_map(self) -> Dict[int, int]:
         pass
 
+    @abstractmethod
+    def values_in_range(self, start: int, stop: int) -> Dict[int, int]:
+        """Values with a key in [start, stop), in key order"""
+        pass
+
     @property
     @abstractmethod
     def structure_type(self) -> StructureType:
@@ -61,7 +77,9 @@ class PrimaryStructure(Structure):
             primary_structure_identifier=self.identifier,
             cluster_identifier=self.cluster_identifier,
             number_of_primaries=self.number_of_primaries,
-            number_of_faults=self.number_of_faults
+            number_of_faults=self.number_of_faults,
+            galois_w=self.galois_w,
+            coding_scheme=self.coding_scheme
         )
 
     def _add(self, value) -> PrimaryNode:
@@ -70,12 +88,18 @@ class PrimaryStructure(Structure):
         aux_node = PrimaryAuxNode(primary_node=node)
         node.aux_node = aux_node
         self.__data_stack.insert_end(aux_node)
+        self.__version += 1
         return node
 
+    def _update(self, primary_node: PrimaryNode, value) -> None:
+        primary_node.value = value
+        self.__version += 1
+
     def _remove(self, primary_node: PrimaryNode) -> PrimaryNode:
         """Removes primary node from auxiliary data stack and returns node that filled gap"""
         final_aux_node: PrimaryAuxNode = self.__data_stack.get_last()
         self.__data_stack.replace_node_with_tail(primary_node.aux_node)
+        self.__version += 1
         return final_aux_node.primary_node
 
 
@@ -2,20 +2,26 @@ from __future__ import annotations
 
 from typing import List, Dict
 
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
 from servers.observers.backup import backup_observer
 from servers.observers.console import console_observer
 from servers.shared.decorators import emits, observed_by, self_await
 from servers.shared.events import MutationEvent, RemoveItemEvent, SetItemEvent
+from servers.structures.generic.blocked_list import BlockedList
 from servers.structures.primary.interface import PrimaryStructure, PrimaryNode
 from shared.types import ClusterInformation
 
 
 @observed_by(observers=[console_observer], async_observers=[backup_observer])
 class PrimaryList(PrimaryStructure):
-    def __init__(self, cluster_information: ClusterInformation, backup_ports: List[int]):
-        super().__init__(cluster_information, backup_ports)
-        self.__items: List[PrimaryNode] = []
+    def __init__(
+        self,
+        cluster_information: ClusterInformation,
+        backup_ports: List[int],
+        ack_level: AckLevel = AckLevel.ACK_ALL_BACKUPS
+    ):
+        super().__init__(cluster_information, backup_ports, ack_level)
+        self.__items: BlockedList[PrimaryNode] = BlockedList()
         self.__structure_type = StructureType.LIST
 
     def __str__(self) -> str:
@@ -53,6 +59,10 @@ class PrimaryList(PrimaryStructure):
 
         return values
 
+    def values_in_range(self, start: int, stop: int) -> Dict[int, int]:
+        start, stop, _ = slice(start, stop).indices(len(self.__items))
+        return {start + i: x.value for i, x in enumerate(self.__items[start:stop])}
+
     @property
     def structure_type(self):
         return self.__structure_type
@@ -74,6 +84,11 @@ class PrimaryList(PrimaryStructure):
     @self_await
     @emits(SetItemEvent)
     def add(self, index: int, value: int) -> Dict:
+        # Out of range indexes are clamped as with list.insert, and the backups are sent the index actually used
+        if index < 0:
+            index = max(index + len(self.__items), 0)
+        index = min(index, len(self.__items))
+
         primary_node = self._add(value)
         self.__items.insert(index, primary_node)
         return {"index": index, "value": value}
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Dict, SupportsIndex, List
 
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
 from servers.observers.backup import backup_observer
 from servers.observers.console import console_observer
 from servers.shared.decorators import emits, observed_by, self_await
@@ -13,8 +13,13 @@ from shared.types import ClusterInformation
 
 @observed_by(observers=[console_observer], async_observers=[backup_observer])
 class PrimaryMap(PrimaryStructure):
-    def __init__(self, cluster_information: ClusterInformation, backup_ports: List[int]):
-        super().__init__(cluster_information, backup_ports)
+    def __init__(
+        self,
+        cluster_information: ClusterInformation,
+        backup_ports: List[int],
+        ack_level: AckLevel = AckLevel.ACK_ALL_BACKUPS
+    ):
+        super().__init__(cluster_information, backup_ports, ack_level)
         self.__items: Dict[SupportsIndex, PrimaryNode] = {}
         self.__structure_type = StructureType.MAP
 
@@ -36,6 +41,15 @@ class PrimaryMap(PrimaryStructure):
 
         return values
 
+    def values_in_range(self, start: int, stop: int) -> Dict[int, int]:
+        # Map keys are sparse, so only keys that are present in the range are returned
+        if stop - start < len(self.__items):
+            keys = [x for x in range(start, stop) if x in self.__items]
+        else:
+            keys = sorted(x for x in self.__items if start <= x < stop)
+
+        return {x: self.__items[x].value for x in keys}
+
     @property
     def structure_type(self):
         return self.__structure_type
@@ -54,7 +68,7 @@ class PrimaryMap(PrimaryStructure):
         if key in self.__items:
             primary_node = self.__items[key]
             old_value = primary_node.value
-            primary_node.value = value
+            self._update(primary_node, value)
         else:
             primary_node = self._add(value)
             self.__items[key] = primary_node
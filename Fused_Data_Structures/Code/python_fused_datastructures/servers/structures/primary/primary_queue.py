@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from collections import deque
+from itertools import islice
 from typing import List, Dict, Deque
 
-from protos.service_pb2 import StructureType
+from protos.service_pb2 import StructureType, AckLevel
 from servers.observers.backup import backup_observer
 from servers.observers.console import console_observer
 from servers.shared.decorators import emits, observed_by, self_await
@@ -14,8 +15,13 @@ from shared.types import ClusterInformation
 
 @observed_by(observers=[console_observer], async_observers=[backup_observer])
 class PrimaryQueue(PrimaryStructure):
-    def __init__(self, cluster_information: ClusterInformation, backup_ports: List[int]):
-        super().__init__(cluster_information, backup_ports)
+    def __init__(
+        self,
+        cluster_information: ClusterInformation,
+        backup_ports: List[int],
+        ack_level: AckLevel = AckLevel.ACK_ALL_BACKUPS
+    ):
+        super().__init__(cluster_information, backup_ports, ack_level)
         self.__queue: Deque[PrimaryNode] = deque()
         self.__structure_type = StructureType.QUEUE
 
@@ -54,6 +60,10 @@ class PrimaryQueue(PrimaryStructure):
 
         return values
 
+    def values_in_range(self, start: int, stop: int) -> Dict[int, int]:
+        start, stop, _ = slice(start, stop).indices(len(self.__queue))
+        return {start + i: x.value for i, x in enumerate(islice(self.__queue, start, stop))}
+
     @property
     def structure_type(self):
         return self.__structure_type
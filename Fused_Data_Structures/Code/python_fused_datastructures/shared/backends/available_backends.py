@@ -0,0 +1,32 @@
+from typing import Dict, Optional
+
+from shared.backends.interface import FusionBackend
+
+# Each backend depends on something that may not be installed on every host, so only those that import are offered
+fusion_backends: Dict[str, FusionBackend] = {}
+
+try:
+    from shared.backends.jerasure_backend import JerasureBackend
+
+    fusion_backends["jerasure"] = JerasureBackend()
+except ImportError:
+    pass
+
+try:
+    from shared.backends.numpy_backend import NumpyBackend
+
+    fusion_backends["numpy"] = NumpyBackend()
+except ImportError:
+    pass
+
+DEFAULT_BACKEND = next(iter(fusion_backends), None)
+
+
+def get_backend(name: Optional[str] = None) -> FusionBackend:
+    """Return the named fusion backend, or the compiled one when it is available and no name is given"""
+    name = name or DEFAULT_BACKEND
+
+    if name not in fusion_backends:
+        raise Exception(f"Fusion backend '{name}' is not available - build python_jerasure or install numpy")
+
+    return fusion_backends[name]
@@ -0,0 +1,68 @@
+import argparse
+import random
+import time
+from array import array
+from typing import Callable
+
+from protos.service_pb2 import CodingScheme
+from shared.backends.available_backends import fusion_backends
+from shared.fusion import FusionAccessor
+
+
+def best_time(function: Callable[[], None], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def benchmark(number_of_primaries: int, number_of_faults: int, number_of_stripes: int, repeats: int) -> None:
+    """Time encoding, decoding and updating whole fused stacks under every coding scheme and backend, at w = 8"""
+    rng = random.Random(347)
+    data = array("l", [rng.getrandbits(63) for _ in range(number_of_primaries * number_of_stripes)])
+    old_values = array("l", [rng.getrandbits(63) for _ in range(number_of_stripes)])
+    new_values = array("l", [rng.getrandbits(63) for _ in range(number_of_stripes)])
+    source_ids = array("i", [rng.randrange(number_of_primaries) for _ in range(number_of_stripes)])
+
+    # Losing the first primaries is the worst case, forcing the decoder to read from every surviving backup
+    erasures = list(range(number_of_faults))
+
+    print(f"{number_of_primaries} primaries, {number_of_faults} faults, {number_of_stripes} stripes, best of {repeats}")
+    print(f"{'scheme':<12} {'backend':<9} {'encode (ms)':>12} {'decode (ms)':>12} {'update (ms)':>12}")
+
+    for scheme in CodingScheme.values():
+        for backend in fusion_backends.values():
+            accessor = FusionAccessor(number_of_primaries, number_of_faults, 8, backend, scheme)
+            codes = array("l", [0] * number_of_faults * number_of_stripes)
+            accessor.get_encoded_columns(data, codes)
+
+            decoder = accessor.get_decoder(erasures)
+            damaged = array("l", data)
+            update_codes = array("l", codes[number_of_stripes:2 * number_of_stripes])
+
+            encode = best_time(lambda: accessor.get_encoded_columns(data, codes), repeats)
+            decode = best_time(lambda: decoder.decode_columns(codes, damaged), repeats)
+            update = best_time(
+                lambda: accessor.get_updated_codes(update_codes, 1, old_values, new_values, source_ids), repeats
+            )
+            if damaged != data:
+                raise Exception(f"{CodingScheme.Name(scheme)} decoding with the {backend.name} backend lost data")
+
+            print(
+                f"{CodingScheme.Name(scheme):<12} {backend.name:<9} "
+                f"{encode * 1000:>12.2f} {decode * 1000:>12.2f} {update * 1000:>12.2f}"
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the cost of each coding scheme")
+    parser.add_argument("--primaries", type=int, default=10)
+    parser.add_argument("--faults", type=int, default=4)
+    parser.add_argument("--stripes", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    arguments = parser.parse_args()
+
+    benchmark(arguments.primaries, arguments.faults, arguments.stripes, arguments.repeats)
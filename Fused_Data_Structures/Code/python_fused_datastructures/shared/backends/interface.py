@@ -0,0 +1,129 @@
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, Sequence, Tuple
+
+from protos.service_pb2 import CodingScheme
+
+Buffer = Any
+
+
+class FusionBackend(ABC):
+    """Reed-Solomon arithmetic used to maintain and decode fused data, mirroring the python_jerasure API
+
+    Vandermonde codes are maintained with GF(2^w) multiplies by the *_rs_* and *_columns methods, while Cauchy codes
+    are bitmatrix codes over GF(2^8), maintained with XORs alone by the *_bitmatrix_* methods
+    """
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        pass
+
+    @abstractmethod
+    def calculate_rs_matrix(
+        self, number_of_primaries: int, number_of_faults: int, galois_w: int, out: Optional[Buffer] = None
+    ) -> Optional[List[int]]:
+        pass
+
+    @abstractmethod
+    def calculate_coding_matrix(
+        self, scheme: int, number_of_primaries: int, number_of_faults: int, galois_w: int, out: Optional[Buffer] = None
+    ) -> Optional[List[int]]:
+        pass
+
+    @abstractmethod
+    def calculate_rs_codes(
+        self,
+        number_of_primaries: int,
+        number_of_faults: int,
+        galois_w: int,
+        matrix: Buffer,
+        codes: Buffer,
+        code_index: int,
+        old_values: Buffer,
+        new_values: Buffer,
+        source_ids: Buffer,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def calculate_decoding_matrix(
+        self,
+        number_of_primaries: int,
+        number_of_faults: int,
+        galois_w: int,
+        erasures: Sequence[int],
+        decoding_matrix_out: Optional[Buffer] = None,
+        dm_ids_out: Optional[Buffer] = None,
+        scheme: int = CodingScheme.VANDERMONDE,
+    ) -> Optional[Tuple[List[int], List[int]]]:
+        pass
+
+    @abstractmethod
+    def decode_data(
+        self,
+        number_of_primaries: int,
+        number_of_faults: int,
+        galois_w: int,
+        decoding_rows: Buffer,
+        dm_ids: Buffer,
+        erased_ids: Buffer,
+        codes: Sequence[int],
+        data: Sequence[int],
+        out: Optional[Buffer] = None,
+    ) -> Optional[List[int]]:
+        pass
+
+    @abstractmethod
+    def decode_columns(
+        self,
+        number_of_primaries: int,
+        number_of_faults: int,
+        galois_w: int,
+        decoding_rows: Buffer,
+        dm_ids: Buffer,
+        erased_ids: Buffer,
+        codes: Buffer,
+        data: Buffer,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def encode_columns(
+        self, number_of_primaries: int, number_of_faults: int, galois_w: int, matrix: Buffer, data: Buffer, codes: Buffer
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def calculate_bitmatrix_codes(
+        self,
+        number_of_primaries: int,
+        number_of_faults: int,
+        galois_w: int,
+        matrix: Buffer,
+        codes: Buffer,
+        code_index: int,
+        old_values: Buffer,
+        new_values: Buffer,
+        source_ids: Buffer,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def decode_bitmatrix_columns(
+        self,
+        number_of_primaries: int,
+        number_of_faults: int,
+        galois_w: int,
+        decoding_rows: Buffer,
+        dm_ids: Buffer,
+        erased_ids: Buffer,
+        codes: Buffer,
+        data: Buffer,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def encode_bitmatrix_columns(
+        self, number_of_primaries: int, number_of_faults: int, galois_w: int, matrix: Buffer, data: Buffer, codes: Buffer
+    ) -> None:
+        pass
@@ -0,0 +1,70 @@
+import python_jerasure
+
+from shared.backends.interface import FusionBackend
+
+
+class JerasureBackend(FusionBackend):
+    """Backend calling straight into the compiled python_jerasure extension"""
+
+    @property
+    def name(self) -> str:
+        return "jerasure"
+
+    def calculate_rs_matrix(self, number_of_primaries, number_of_faults, galois_w, out=None):
+        return python_jerasure.calculate_rs_matrix(number_of_primaries, number_of_faults, galois_w, out)
+
+    def calculate_coding_matrix(self, scheme, number_of_primaries, number_of_faults, galois_w, out=None):
+        return python_jerasure.calculate_coding_matrix(scheme, number_of_primaries, number_of_faults, galois_w, out)
+
+    def calculate_rs_codes(
+        self, number_of_primaries, number_of_faults, galois_w, matrix, codes, code_index, old_values, new_values, source_ids
+    ):
+        python_jerasure.calculate_rs_codes(
+            number_of_primaries, number_of_faults, galois_w, matrix, codes, code_index, old_values, new_values, source_ids
+        )
+
+    def calculate_decoding_matrix(
+        self,
+        number_of_primaries,
+        number_of_faults,
+        galois_w,
+        erasures,
+        decoding_matrix_out=None,
+        dm_ids_out=None,
+        scheme=python_jerasure.VANDERMONDE
+    ):
+        return python_jerasure.calculate_decoding_matrix(
+            number_of_primaries, number_of_faults, galois_w, erasures, decoding_matrix_out, dm_ids_out, scheme
+        )
+
+    def decode_data(
+        self, number_of_primaries, number_of_faults, galois_w, decoding_rows, dm_ids, erased_ids, codes, data, out=None
+    ):
+        return python_jerasure.decode_data(
+            number_of_primaries, number_of_faults, galois_w, decoding_rows, dm_ids, erased_ids, codes, data, out
+        )
+
+    def decode_columns(self, number_of_primaries, number_of_faults, galois_w, decoding_rows, dm_ids, erased_ids, codes, data):
+        python_jerasure.decode_columns(
+            number_of_primaries, number_of_faults, galois_w, decoding_rows, dm_ids, erased_ids, codes, data
+        )
+
+    def encode_columns(self, number_of_primaries, number_of_faults, galois_w, matrix, data, codes):
+        python_jerasure.encode_columns(number_of_primaries, number_of_faults, galois_w, matrix, data, codes)
+
+    def calculate_bitmatrix_codes(
+        self, number_of_primaries, number_of_faults, galois_w, matrix, codes, code_index, old_values, new_values, source_ids
+    ):
+        python_jerasure.calculate_bitmatrix_codes(
+            number_of_primaries, number_of_faults, galois_w, matrix, codes, code_index, old_values, new_values, source_ids
+        )
+
+    def decode_bitmatrix_columns(
+        self, number_of_primaries, number_of_faults, galois_w, decoding_rows, dm_ids, erased_ids, codes, data
+    ):
+        python_jerasure.decode_bitmatrix_columns(
+            number_of_primaries, number_of_faults, galois_w, decoding_rows, dm_ids, erased_ids, codes, data
+        )
+
+    def encode_bitmatrix_columns(self, number_of_primaries, number_of_faults, galois_w, matrix, data, codes):
+        python_jerasure.encode_bitmatrix_columns(number_of_primaries, number_of_faults, galois_w, matrix, data, codes)
@@ -0,0 +1,550 @@
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+from protos.service_pb2 import CodingScheme
+from shared.backends.interface import FusionBackend
+
+# Primitive polynomials used by Jerasure, so both backends produce identical codes
+PRIMITIVE_POLYNOMIALS = {8: 0o435, 16: 0o210013}
+WORD_TYPES = {8: np.uint8, 16: np.uint16}
+
+# Bitmatrix codes split each long into w packets of one byte, so every stripe is a single long
+BITMATRIX_W = 8
+
+
+@lru_cache(maxsize=None)
+def galois_tables(galois_w: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Log and antilog tables for GF(2^w), with the antilog table repeated so summed logs never need reducing"""
+    field_size = 1 << galois_w
+    log_table = np.zeros(field_size, dtype=np.int64)
+    antilog_table = np.zeros(2 * (field_size - 1), dtype=np.int64)
+
+    element = 1
+    for power in range(field_size - 1):
+        log_table[element] = power
+        antilog_table[power] = element
+
+        element <<= 1
+        if element & field_size:
+            element = (element ^ PRIMITIVE_POLYNOMIALS[galois_w]) & (field_size - 1)
+
+    antilog_table[field_size - 1:] = antilog_table[:field_size - 1]
+
+    return log_table, antilog_table
+
+
+@lru_cache(maxsize=None)
+def multiplication_table() -> np.ndarray:
+    """Every product in GF(2^8) as bytes - at 64KB, rows indexed by a multiplier are cheap enough to gather directly"""
+    log_table, antilog_table = galois_tables(8)
+    table = antilog_table[log_table[:, None] + log_table[None, :]].astype(np.uint8)
+    table[0, :] = table[:, 0] = 0
+
+    return table
+
+
+def check_word_size(galois_w: int) -> None:
+    if galois_w not in PRIMITIVE_POLYNOMIALS:
+        raise ValueError("w must be 8 or 16 for the NumPy backend")
+
+
+def single_multiply(x: int, y: int, galois_w: int) -> int:
+    if x == 0 or y == 0:
+        return 0
+
+    log_table, antilog_table = galois_tables(galois_w)
+    return int(antilog_table[log_table[x] + log_table[y]])
+
+
+def single_divide(x: int, y: int, galois_w: int) -> int:
+    if y == 0:
+        raise ZeroDivisionError("division by zero in GF(2^w)")
+    if x == 0:
+        return 0
+
+    log_table, antilog_table = galois_tables(galois_w)
+    return int(antilog_table[log_table[x] - log_table[y] + (1 << galois_w) - 1])
+
+
+def vandermonde_coding_matrix(number_of_primaries: int, number_of_faults: int, galois_w: int) -> List[List[int]]:
+    """Port of reed_sol_vandermonde_coding_matrix, returning the last `number_of_faults` rows of the distribution matrix"""
+    rows, cols = number_of_primaries + number_of_faults, number_of_primaries
+
+    if cols <= 0 or cols >= rows or (1 << galois_w) < rows:
+        raise ValueError("cannot build a Vandermonde matrix for this number of primaries and faults")
+
+    # Extended Vandermonde matrix: identity first and last rows, i^j everywhere in between
+    dist = [[0] * cols for _ in range(rows)]
+    dist[0][0] = 1
+    dist[rows - 1][cols - 1] = 1
+    for i in range(1, rows - 1):
+        value = 1
+        for j in range(cols):
+            dist[i][j] = value
+            value = single_multiply(value, i, galois_w)
+
+    # Column operations turning the first `cols` rows into the identity
+    for i in range(1, cols):
+        j = next(j for j in range(i, rows) if dist[j][i] != 0)
+        dist[i], dist[j] = dist[j], dist[i]
+
+        if dist[i][i] != 1:
+            inverse = single_divide(1, dist[i][i], galois_w)
+            for row in dist:
+                row[i] = single_multiply(inverse, row[i], galois_w)
+
+        for j in range(cols):
+            factor = dist[i][j]
+            if j != i and factor != 0:
+                for row in dist:
+                    row[j] ^= single_multiply(factor, row[i], galois_w)
+
+    # Scale columns so the first coding row is all ones, then rows so the first coding column is all ones
+    for j in range(cols):
+        if dist[cols][j] != 1:
+            inverse = single_divide(1, dist[cols][j], galois_w)
+            for i in range(cols, rows):
+                dist[i][j] = single_multiply(inverse, dist[i][j], galois_w)
+
+    for i in range(cols + 1, rows):
+        if dist[i][0] != 1:
+            inverse = single_divide(1, dist[i][0], galois_w)
+            dist[i] = [single_multiply(x, inverse, galois_w) for x in dist[i]]
+
+    return dist[cols:]
+
+
+def cauchy_coding_matrix(number_of_primaries: int, number_of_faults: int, galois_w: int) -> List[List[int]]:
+    """Cauchy matrix with element (i, j) = 1 / (i ^ (m + j))"""
+    if number_of_primaries <= 0 or number_of_faults <= 0 or (1 << galois_w) < number_of_primaries + number_of_faults:
+        raise ValueError("cannot build a Cauchy matrix for this number of primaries and faults")
+
+    return [
+        [single_divide(1, i ^ (number_of_faults + j), galois_w) for j in range(number_of_primaries)]
+        for i in range(number_of_faults)
+    ]
+
+
+def count_bitmatrix_ones(element: int, galois_w: int) -> int:
+    """Number of ones in the bitmatrix of an element, which is the number of XORs needed to multiply by it"""
+    return sum(bin(single_multiply(element, 1 << x, galois_w)).count("1") for x in range(galois_w))
+
+
+def cauchy_good_coding_matrix(number_of_primaries: int, number_of_faults: int, galois_w: int) -> List[List[int]]:
+    """Port of the Cauchy "good" construction in python_jerasure, picking the row scalings with the fewest XORs"""
+    matrix = cauchy_coding_matrix(number_of_primaries, number_of_faults, galois_w)
+
+    # Scale columns so the first row is all ones
+    for j in range(number_of_primaries):
+        if matrix[0][j] != 1:
+            inverse = single_divide(1, matrix[0][j], galois_w)
+            for row in matrix:
+                row[j] = single_multiply(row[j], inverse, galois_w)
+
+    # Scale every other row by the inverse of whichever of its elements leaves the fewest ones
+    for i in range(1, number_of_faults):
+        best_scale = 1
+        best_ones = sum(count_bitmatrix_ones(x, galois_w) for x in matrix[i])
+
+        for element in matrix[i]:
+            if element == 1:
+                continue
+
+            scale = single_divide(1, element, galois_w)
+            ones = sum(count_bitmatrix_ones(single_multiply(x, scale, galois_w), galois_w) for x in matrix[i])
+            if ones < best_ones:
+                best_ones, best_scale = ones, scale
+
+        matrix[i] = [single_multiply(x, best_scale, galois_w) for x in matrix[i]]
+
+    return matrix
+
+
+CODING_MATRICES = {
+    CodingScheme.VANDERMONDE: vandermonde_coding_matrix,
+    CodingScheme.CAUCHY: cauchy_coding_matrix,
+    CodingScheme.CAUCHY_GOOD: cauchy_good_coding_matrix,
+}
+
+
+def coding_matrix(scheme: int, number_of_primaries: int, number_of_faults: int, galois_w: int) -> List[List[int]]:
+    check_word_size(galois_w)
+    if scheme not in CODING_MATRICES:
+        raise ValueError(f"unknown coding scheme {scheme}")
+
+    return CODING_MATRICES[scheme](number_of_primaries, number_of_faults, galois_w)
+
+
+def check_bitmatrix_word_size(galois_w: int) -> None:
+    if galois_w != BITMATRIX_W:
+        raise ValueError("bitmatrix codes split each long into w packets of one byte, so w must be 8")
+
+
+def bitmatrix(rows: np.ndarray) -> np.ndarray:
+    """Expand an (r x k) matrix over GF(2^8) into its (8r x 8k) bitmatrix, where entry (l, x) of each element's block
+    says whether packet x is XORed into packet l"""
+    powers = multiplication_table()[rows.astype(np.int64)[..., None], 1 << np.arange(BITMATRIX_W)]
+    bits = (powers[..., None] >> np.arange(BITMATRIX_W)) & 1
+
+    # bits is indexed (i, j, x, l), and the bitmatrix (i, l, j, x)
+    return bits.transpose(0, 3, 1, 2).reshape(BITMATRIX_W * rows.shape[0], BITMATRIX_W * rows.shape[1]).astype(bool)
+
+
+def invert_matrix(matrix: List[List[int]], galois_w: int) -> List[List[int]]:
+    """Gauss-Jordan inversion over GF(2^w)"""
+    size = len(matrix)
+    matrix = [list(row) for row in matrix]
+    inverse = [[int(i == j) for j in range(size)] for i in range(size)]
+
+    for i in range(size):
+        pivot = next((j for j in range(i, size) if matrix[j][i] != 0), None)
+        if pivot is None:
+            raise ValueError("could not invert decoding matrix")
+
+        matrix[i], matrix[pivot] = matrix[pivot], matrix[i]
+        inverse[i], inverse[pivot] = inverse[pivot], inverse[i]
+
+        scale = single_divide(1, matrix[i][i], galois_w)
+        matrix[i] = [single_multiply(x, scale, galois_w) for x in matrix[i]]
+        inverse[i] = [single_multiply(x, scale, galois_w) for x in inverse[i]]
+
+        for j in range(size):
+            factor = matrix[j][i]
+            if j != i and factor != 0:
+                matrix[j] = [x ^ single_multiply(factor, y, galois_w) for x, y in zip(matrix[j], matrix[i])]
+                inverse[j] = [x ^ single_multiply(factor, y, galois_w) for x, y in zip(inverse[j], inverse[i])]
+
+    return inverse
+
+
+def as_longs(values, name: str) -> np.ndarray:
+    """View a buffer of native longs (or raw bytes) as int64 without copying, or copy any other integers"""
+    try:
+        view = memoryview(values)
+    except TypeError:
+        try:
+            return np.array(values, dtype=np.int64).reshape(-1)
+        except (TypeError, ValueError) as error:
+            raise TypeError(f"{name} must be a sequence of integers") from error
+
+    if view.itemsize == 1:
+        if view.nbytes % 8 != 0:
+            raise ValueError(f"{name} must hold a whole number of longs")
+        return np.frombuffer(view, dtype=np.int64)
+
+    dtype = np.dtype(view.format)
+    if dtype.kind not in "iu":
+        raise TypeError(f"{name} must be a buffer of integers")
+
+    return np.frombuffer(view, dtype=dtype).astype(np.int64, copy=False)
+
+
+def as_ints(values, name: str) -> np.ndarray:
+    """View the raw bytes of a buffer as native ints, as the C extension's y* arguments do"""
+    view = memoryview(values)
+    if view.nbytes % np.dtype(np.intc).itemsize != 0:
+        raise ValueError(f"{name} must hold a whole number of ints")
+
+    return np.frombuffer(view.cast("B"), dtype=np.intc)
+
+
+def as_writable(values, dtype, length: int, name: str) -> np.ndarray:
+    view = memoryview(values)
+    if view.readonly:
+        raise TypeError(f"{name} must be a writable buffer")
+    if view.nbytes != length * np.dtype(dtype).itemsize:
+        raise ValueError(f"{name} must hold {length} integers")
+
+    return np.frombuffer(view.cast("B"), dtype=dtype)
+
+
+class NumpyBackend(FusionBackend):
+    """Backend performing GF(2^w) arithmetic with log/antilog tables over whole NumPy arrays"""
+
+    @property
+    def name(self) -> str:
+        return "numpy"
+
+    @staticmethod
+    def multiply(coefficients: np.ndarray, words: np.ndarray, galois_w: int) -> np.ndarray:
+        """Multiply each row of words by its coefficient"""
+        coefficients = np.asarray(coefficients, dtype=np.int64).reshape(-1, 1)
+
+        if galois_w == 8:
+            return multiplication_table()[coefficients, words]
+
+        log_table, antilog_table = galois_tables(galois_w)
+
+        products = antilog_table[log_table[words] + log_table[coefficients]]
+        products[(words == 0) | (coefficients == 0)] = 0
+
+        return products.astype(WORD_TYPES[galois_w])
+
+    def dot(self, coefficients: np.ndarray, sources: np.ndarray, galois_w: int) -> np.ndarray:
+        """Multiply an (r x k) matrix by k columns of longs, returning r columns of longs"""
+        sources = np.ascontiguousarray(sources, dtype=np.int64)
+        words = sources.view(WORD_TYPES[galois_w]).reshape(sources.shape[0], -1)
+        result = np.zeros((len(coefficients), words.shape[1]), dtype=WORD_TYPES[galois_w])
+
+        for row, row_coefficients in zip(result, coefficients):
+            # Rows of ones (XOR parity) need no table lookups
+            products = words if np.all(row_coefficients == 1) else self.multiply(row_coefficients, words, galois_w)
+            np.bitwise_xor.reduce(products, axis=0, out=row)
+
+        return result.view(np.int64)
+
+    @staticmethod
+    def bitmatrix_dot(coefficients: np.ndarray, sources: np.ndarray) -> np.ndarray:
+        """Multiply an (r x k) matrix by k columns of longs with XORs alone, returning r columns of longs"""
+        sources = np.ascontiguousarray(sources, dtype=np.int64)
+        number_of_sources, number_of_stripes = sources.shape
+
+        # Plane x of each source holds byte x of every stripe, so one XOR of planes applies a bitmatrix entry to all stripes
+        planes = sources.view(np.uint8).reshape(number_of_sources, number_of_stripes, BITMATRIX_W)
+        planes = planes.transpose(0, 2, 1).reshape(number_of_sources * BITMATRIX_W, number_of_stripes)
+        result = np.zeros((len(coefficients) * BITMATRIX_W, number_of_stripes), dtype=np.uint8)
+
+        for row, bits in zip(result, bitmatrix(np.asarray(coefficients))):
+            if bits.any():
+                np.bitwise_xor.reduce(planes[bits], axis=0, out=row)
+
+        result = result.reshape(len(coefficients), BITMATRIX_W, number_of_stripes).transpose(0, 2, 1)
+        return np.ascontiguousarray(result).view(np.int64).reshape(len(coefficients), number_of_stripes)
+
+    def calculate_rs_matrix(self, number_of_primaries, number_of_faults, galois_w, out=None):
+        return self.calculate_coding_matrix(CodingScheme.VANDERMONDE, number_of_primaries, number_of_faults, galois_w, out)
+
+    def calculate_coding_matrix(self, scheme, number_of_primaries, number_of_faults, galois_w, out=None):
+        matrix = [x for row in coding_matrix(scheme, number_of_primaries, number_of_faults, galois_w) for x in row]
+
+        if out is None:
+            return matrix
+
+        as_writable(out, np.intc, len(matrix), "matrix")[:] = matrix
+
+    def calculate_rs_codes(
+        self, number_of_primaries, number_of_faults, galois_w, matrix, codes, code_index, old_values, new_values, source_ids
+    ):
+        check_word_size(galois_w)
+        matrix = as_ints(matrix, "matrix")
+        codes_array = as_writable(codes, np.int64, memoryview(codes).nbytes // 8, "codes")
+        old_values, new_values = as_longs(old_values, "old_values"), as_longs(new_values, "new_values")
+        source_ids = as_ints(source_ids, "positions")
+
+        if not 0 <= code_index < number_of_faults:
+            raise ValueError("code_index out of range in calculate_rs_codes")
+        if len(matrix) != number_of_primaries * number_of_faults:
+            raise ValueError("matrix must hold num_primary_structures * num_backup_structures ints")
+        if not len(codes_array) == len(old_values) == len(new_values) == len(source_ids):
+            raise ValueError("codes, old_values, new_values and positions must describe the same number of updates")
+        if np.any((source_ids < 0) | (source_ids >= number_of_primaries)):
+            raise ValueError("position out of range in calculate_rs_codes")
+
+        # c_i' = c_i + m_i_j * (d_j' - d_j), for every update at once
+        row = matrix[code_index * number_of_primaries:(code_index + 1) * number_of_primaries]
+        differences = (old_values ^ new_values).view(WORD_TYPES[galois_w]).reshape(len(codes_array), 64 // galois_w)
+
+        if np.all(row[source_ids] == 1):
+            codes_array ^= old_values ^ new_values
+            return
+
+        code_words = codes_array.view(WORD_TYPES[galois_w]).reshape(len(codes_array), 64 // galois_w)
+        code_words ^= self.multiply(row[source_ids], differences, galois_w)
+
+    def calculate_decoding_matrix(
+        self,
+        number_of_primaries,
+        number_of_faults,
+        galois_w,
+        erasures,
+        decoding_matrix_out=None,
+        dm_ids_out=None,
+        scheme=CodingScheme.VANDERMONDE
+    ):
+        check_word_size(galois_w)
+        if (decoding_matrix_out is None) != (dm_ids_out is None):
+            raise TypeError("decoding_matrix and dm_ids outputs must be supplied together")
+
+        erased = set(as_longs(erasures, "erasures").tolist())
+        if any(not 0 <= x < number_of_primaries + number_of_faults for x in erased):
+            raise ValueError("erasure out of range in calculate_decoding_matrix")
+        if len(erased) > number_of_faults:
+            raise ValueError("too many erasures to decode in calculate_decoding_matrix")
+
+        # Invert the rows of the distribution matrix belonging to the first k surviving devices
+        matrix = coding_matrix(scheme, number_of_primaries, number_of_faults, galois_w)
+        dm_ids = [x for x in range(number_of_primaries + number_of_faults) if x not in erased][:number_of_primaries]
+        rows = [
+            [int(x == device) for x in range(number_of_primaries)] if device < number_of_primaries
+            else matrix[device - number_of_primaries]
+            for device in dm_ids
+        ]
+        decoding_matrix = [x for row in invert_matrix(rows, galois_w) for x in row]
+
+        if decoding_matrix_out is None:
+            return decoding_matrix, dm_ids
+
+        as_writable(decoding_matrix_out, np.intc, len(decoding_matrix), "decoding_matrix")[:] = decoding_matrix
+        as_writable(dm_ids_out, np.intc, len(dm_ids), "dm_ids")[:] = dm_ids
+
+    def __check_decoding_rows(
+        self, number_of_primaries, number_of_faults, decoding_rows, dm_ids, erased_ids, function
+    ) -> Tuple[np.ndarray, ...]:
+        decoding_rows, dm_ids = as_ints(decoding_rows, "decoding_rows"), as_ints(dm_ids, "dm_ids")
+        erased_ids = as_ints(erased_ids, "erased_ids")
+
+        if len(decoding_rows) != len(erased_ids) * number_of_primaries or len(dm_ids) != number_of_primaries:
+            raise ValueError("decoding matrix does not match the number of erasures")
+        # Checked like the C extension does, as a negative id would otherwise index from the end
+        if np.any((dm_ids < 0) | (dm_ids >= number_of_primaries + number_of_faults)):
+            raise ValueError(f"dm_ids out of range in {function}")
+        if np.any((erased_ids < 0) | (erased_ids >= number_of_primaries)):
+            raise ValueError(f"erased_ids out of range in {function}")
+
+        return decoding_rows.reshape(len(erased_ids), number_of_primaries), dm_ids, erased_ids
+
+    def decode_data(
+        self, number_of_primaries, number_of_faults, galois_w, decoding_rows, dm_ids, erased_ids, codes, data, out=None
+    ):
+        check_word_size(galois_w)
+        decoding_rows, dm_ids, erased_ids = self.__check_decoding_rows(
+            number_of_primaries, number_of_faults, decoding_rows, dm_ids, erased_ids, "decode_data"
+        )
+        codes, data = as_longs(codes, "codes"), as_longs(data, "data")
+
+        if number_of_faults <= 0 or len(codes) % number_of_faults != 0:
+            raise ValueError("len(codes) must be a multiple of num_backup_structures in decode_data")
+
+        number_of_stripes = len(codes) // number_of_faults
+        if len(data) != number_of_stripes * number_of_primaries:
+            raise ValueError(f"data must hold {number_of_stripes * number_of_primaries} integers")
+
+        recovered = data.copy() if out is None else as_writable(out, np.int64, len(data), "out")
+        recovered[:] = data
+
+        # Decode stripe-major data by gathering each surviving device into a column
+        stripes = recovered.reshape(number_of_stripes, number_of_primaries)
+        code_stripes = codes.reshape(number_of_stripes, number_of_faults)
+        sources = np.stack([
+            stripes[:, x] if x < number_of_primaries else code_stripes[:, x - number_of_primaries] for x in dm_ids
+        ])
+
+        for erased_id, column in zip(erased_ids, self.dot(decoding_rows, sources, galois_w)):
+            stripes[:, erased_id] = column
+
+        if out is None:
+            return recovered.tolist()
+
+    def decode_columns(self, number_of_primaries, number_of_faults, galois_w, decoding_rows, dm_ids, erased_ids, codes, data):
+        check_word_size(galois_w)
+        decoding_rows, dm_ids, erased_ids = self.__check_decoding_rows(
+            number_of_primaries, number_of_faults, decoding_rows, dm_ids, erased_ids, "decode_columns"
+        )
+
+        if number_of_primaries <= 0 or memoryview(data).nbytes % (number_of_primaries * 8) != 0:
+            raise ValueError("data must hold one column of longs per primary in decode_columns")
+
+        number_of_stripes = memoryview(data).nbytes // (number_of_primaries * 8)
+        data = as_writable(data, np.int64, number_of_primaries * number_of_stripes, "data")
+        codes = as_longs(codes, "codes")
+
+        if len(codes) != number_of_faults * number_of_stripes:
+            raise ValueError("codes must hold one column of longs per backup in decode_columns")
+
+        columns = np.concatenate([data, codes]).reshape(number_of_primaries + number_of_faults, number_of_stripes)
+        data.reshape(number_of_primaries, number_of_stripes)[erased_ids] = self.dot(decoding_rows, columns[dm_ids], galois_w)
+
+    def encode_columns(self, number_of_primaries, number_of_faults, galois_w, matrix, data, codes):
+        check_word_size(galois_w)
+        matrix = as_ints(matrix, "matrix")
+
+        if len(matrix) != number_of_primaries * number_of_faults:
+            raise ValueError("matrix must hold num_primary_structures * num_backup_structures ints")
+        if number_of_primaries <= 0 or memoryview(data).nbytes % (number_of_primaries * 8) != 0:
+            raise ValueError("data must hold one column of longs per primary in encode_columns")
+
+        number_of_stripes = memoryview(data).nbytes // (number_of_primaries * 8)
+        data = as_longs(data, "data")
+        codes = as_writable(codes, np.int64, number_of_faults * number_of_stripes, "codes")
+
+        # Each code column is the dot product of its matrix row with every data column
+        codes.reshape(number_of_faults, number_of_stripes)[:] = self.dot(
+            matrix.reshape(number_of_faults, number_of_primaries),
+            data.reshape(number_of_primaries, number_of_stripes),
+            galois_w
+        )
+
+    def calculate_bitmatrix_codes(
+        self, number_of_primaries, number_of_faults, galois_w, matrix, codes, code_index, old_values, new_values, source_ids
+    ):
+        check_bitmatrix_word_size(galois_w)
+        matrix = as_ints(matrix, "matrix")
+        codes_array = as_writable(codes, np.int64, memoryview(codes).nbytes // 8, "codes")
+        old_values, new_values = as_longs(old_values, "old_values"), as_longs(new_values, "new_values")
+        source_ids = as_ints(source_ids, "positions")
+
+        if not 0 <= code_index < number_of_faults:
+            raise ValueError("code_index out of range in calculate_bitmatrix_codes")
+        if len(matrix) != number_of_primaries * number_of_faults:
+            raise ValueError("matrix must hold num_primary_structures * num_backup_structures ints")
+        if not len(codes_array) == len(old_values) == len(new_values) == len(source_ids):
+            raise ValueError("codes, old_values, new_values and positions must describe the same number of updates")
+        if np.any((source_ids < 0) | (source_ids >= number_of_primaries)):
+            raise ValueError("position out of range in calculate_bitmatrix_codes")
+
+        row = matrix[code_index * number_of_primaries:(code_index + 1) * number_of_primaries]
+        if np.all(row[source_ids] == 1):
+            codes_array ^= old_values ^ new_values
+            return
+
+        # Spread column x of each element's bitmatrix into a long with a one in byte l wherever packet x is XORed into
+        # packet l - multiplying it by a byte of difference then copies that byte into every such packet
+        blocks = bitmatrix(row.reshape(1, -1)).reshape(BITMATRIX_W, number_of_primaries, BITMATRIX_W)
+        spreads = np.bitwise_or.reduce(
+            blocks.astype(np.uint64) << (8 * np.arange(BITMATRIX_W, dtype=np.uint64)).reshape(-1, 1, 1), axis=0
+        )
+
+        differences = (old_values ^ new_values).view(np.uint8).reshape(len(codes_array), BITMATRIX_W)
+        codes_array ^= np.bitwise_xor.reduce(spreads[source_ids] * differences, axis=1).view(np.int64)
+
+    def decode_bitmatrix_columns(
+        self, number_of_primaries, number_of_faults, galois_w, decoding_rows, dm_ids, erased_ids, codes, data
+    ):
+        check_bitmatrix_word_size(galois_w)
+        decoding_rows, dm_ids, erased_ids = self.__check_decoding_rows(
+            number_of_primaries, number_of_faults, decoding_rows, dm_ids, erased_ids, "decode_bitmatrix_columns"
+        )
+
+        if number_of_primaries <= 0 or memoryview(data).nbytes % (number_of_primaries * 8) != 0:
+            raise ValueError("data must hold one column of longs per primary in decode_bitmatrix_columns")
+
+        number_of_stripes = memoryview(data).nbytes // (number_of_primaries * 8)
+        data = as_writable(data, np.int64, number_of_primaries * number_of_stripes, "data")
+        codes = as_longs(codes, "codes")
+
+        if len(codes) != number_of_faults * number_of_stripes:
+            raise ValueError("codes must hold one column of longs per backup in decode_bitmatrix_columns")
+        if len(erased_ids) == 0:
+            return
+
+        columns = np.concatenate([data, codes]).reshape(number_of_primaries + number_of_faults, number_of_stripes)
+        data.reshape(number_of_primaries, number_of_stripes)[erased_ids] = self.bitmatrix_dot(decoding_rows, columns[dm_ids])
+
+    def encode_bitmatrix_columns(self, number_of_primaries, number_of_faults, galois_w, matrix, data, codes):
+        check_bitmatrix_word_size(galois_w)
+        matrix = as_ints(matrix, "matrix")
+
+        if len(matrix) != number_of_primaries * number_of_faults:
+            raise ValueError("matrix must hold num_primary_structures * num_backup_structures ints")
+        if number_of_primaries <= 0 or memoryview(data).nbytes % (number_of_primaries * 8) != 0:
+            raise ValueError("data must hold one column of longs per primary in encode_bitmatrix_columns")
+
+        number_of_stripes = memoryview(data).nbytes // (number_of_primaries * 8)
+        data = as_longs(data, "data")
+        codes = as_writable(codes, np.int64, number_of_faults * number_of_stripes, "codes")
+
+        codes.reshape(number_of_faults, number_of_stripes)[:] = self.bitmatrix_dot(
+            matrix.reshape(number_of_faults, number_of_primaries), data.reshape(number_of_primaries, number_of_stripes)
+        )
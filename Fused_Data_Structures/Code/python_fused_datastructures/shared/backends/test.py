@@ -0,0 +1,285 @@
+import random
+import unittest
+from array import array
+from itertools import combinations
+
+from protos.service_pb2 import CodingScheme
+from shared.backends.available_backends import fusion_backends
+from shared.fusion import FusionAccessor
+
+CONFIGURATIONS = [(1, 1), (2, 1), (3, 3), (4, 2), (5, 3)]
+BITMATRIX_SCHEMES = [CodingScheme.CAUCHY, CodingScheme.CAUCHY_GOOD]
+
+# What to do about each backend the parity tests need but could not import
+MISSING_BACKENDS = {
+    "jerasure": "python_jerasure is not built (run make in python_jerasure)",
+    "numpy": "numpy is not installed (install the numpy extra)",
+}
+
+
+def missing_backends() -> str:
+    return "; ".join(reason for name, reason in MISSING_BACKENDS.items() if name not in fusion_backends)
+
+
+@unittest.skipIf(missing_backends(), f"backend parity tests need both backends: {missing_backends()}")
+class TestBackendParity(unittest.TestCase):
+    def setUp(self):
+        self.jerasure = fusion_backends["jerasure"]
+        self.numpy = fusion_backends["numpy"]
+        self.random = random.Random(347)
+
+    def random_longs(self, n, w):
+        # Stay within the positive range of a long, as values from Python do
+        return array('l', [self.random.getrandbits(63) if w == 16 else self.random.getrandbits(7) for _ in range(n)])
+
+    def test_calculate_rs_matrix(self):
+        for w in (8, 16):
+            for k, m in CONFIGURATIONS + [(10, 6)]:
+                self.assertEqual(self.numpy.calculate_rs_matrix(k, m, w), self.jerasure.calculate_rs_matrix(k, m, w))
+
+        # Test writing into a caller-supplied buffer
+        out = array('i', [0] * 9)
+        self.numpy.calculate_rs_matrix(3, 3, 16, out)
+        self.assertEqual(list(out), self.jerasure.calculate_rs_matrix(3, 3, 16))
+
+    def test_calculate_rs_codes(self):
+        for w in (8, 16):
+            for k, m in CONFIGURATIONS:
+                matrix = array('i', self.jerasure.calculate_rs_matrix(k, m, w))
+                old_values, new_values = self.random_longs(50, w), self.random_longs(50, w)
+                positions = array('i', [self.random.randrange(k) for _ in range(50)])
+
+                for code_index in range(m):
+                    initial_codes = self.random_longs(50, w)
+                    codes = [array('l', initial_codes), array('l', initial_codes)]
+
+                    self.jerasure.calculate_rs_codes(k, m, w, matrix, codes[0], code_index, old_values, new_values, positions)
+                    self.numpy.calculate_rs_codes(k, m, w, matrix, codes[1], code_index, old_values, new_values, positions)
+                    self.assertEqual(codes[0], codes[1])
+
+    def test_calculate_decoding_matrix(self):
+        for w in (8, 16):
+            for k, m in CONFIGURATIONS:
+                for number_of_erasures in range(m + 1):
+                    for erasures in combinations(range(k + m), number_of_erasures):
+                        self.assertEqual(
+                            self.numpy.calculate_decoding_matrix(k, m, w, list(erasures)),
+                            self.jerasure.calculate_decoding_matrix(k, m, w, list(erasures))
+                        )
+
+    def test_encode_and_decode_columns(self):
+        for w in (8, 16):
+            for k, m in CONFIGURATIONS:
+                matrix = array('i', self.jerasure.calculate_rs_matrix(k, m, w))
+                data = self.random_longs(k * 20, w)
+                codes = [array('l', [0] * m * 20), array('l', [0] * m * 20)]
+
+                self.jerasure.encode_columns(k, m, w, matrix, data, codes[0])
+                self.numpy.encode_columns(k, m, w, matrix, data, codes[1])
+                self.assertEqual(codes[0], codes[1])
+
+                for erasures in combinations(range(k + m), m):
+                    decoding_matrix, dm_ids = self.jerasure.calculate_decoding_matrix(k, m, w, list(erasures))
+                    erased_ids = [x for x in erasures if x < k]
+                    decoding_rows = array('i', [decoding_matrix[i * k + j] for i in erased_ids for j in range(k)])
+
+                    for backend in (self.jerasure, self.numpy):
+                        damaged = array('l', data)
+                        for x in erased_ids:
+                            damaged[x * 20:(x + 1) * 20] = array('l', [0] * 20)
+
+                        backend.decode_columns(
+                            k, m, w, decoding_rows, array('i', dm_ids), array('i', erased_ids), codes[0], damaged)
+                        self.assertEqual(damaged, data)
+
+    def test_decode_data(self):
+        decoding_matrix, dm_ids = self.jerasure.calculate_decoding_matrix(3, 3, 16, [0, 2])
+        decoding_rows = array('i', decoding_matrix[0:3] + decoding_matrix[6:9])
+        arguments = (3, 3, 16, decoding_rows, array('i', dm_ids), array('i', [0, 2]))
+        codes, data = [678, 41143, 61441] * 2, [0, 456, 0] * 2
+
+        self.assertEqual(self.numpy.decode_data(*arguments, codes, data), self.jerasure.decode_data(*arguments, codes, data))
+
+        # Test recovery in place, reading from buffers
+        out = array('l', data)
+        self.assertIsNone(self.numpy.decode_data(*arguments, array('q', codes), out, out))
+        self.assertEqual(list(out), [123, 456, 789] * 2)
+
+    def test_invalid_arguments(self):
+        matrix = array('i', self.jerasure.calculate_rs_matrix(3, 3, 16))
+
+        for backend in (self.jerasure, self.numpy):
+            # Test more erasures than backups
+            self.assertRaises(ValueError, backend.calculate_decoding_matrix, 3, 3, 16, [0, 1, 2, 3])
+
+            # Test read-only codes buffer
+            self.assertRaises(TypeError, backend.calculate_rs_codes,
+                              3, 3, 16, matrix, bytes(8), 1, array('l', [0]), array('l', [1]), array('i', [0]))
+
+            # Test mismatched buffer lengths and out of range positions
+            self.assertRaises(ValueError, backend.calculate_rs_codes,
+                              3, 3, 16, matrix, array('l', [0, 0]), 1, array('l', [0]), array('l', [1]), array('i', [0]))
+            self.assertRaises(ValueError, backend.calculate_rs_codes,
+                              3, 3, 16, matrix, array('l', [0]), 1, array('l', [0]), array('l', [1]), array('i', [3]))
+
+            # Test out of range decoding ids, which must not index from the end or past the data
+            rows = array('i', [1, 0, 0])
+            for dm_ids, erased_ids in [([0, 1, 6], [2]), ([-1, 1, 2], [0]), ([0, 1, 2], [3]), ([0, 1, 2], [-1])]:
+                dm_ids, erased_ids = array('i', dm_ids), array('i', erased_ids)
+                for w, decode in [(16, backend.decode_columns), (8, backend.decode_bitmatrix_columns)]:
+                    with self.assertRaisesRegex(ValueError, "out of range"):
+                        decode(3, 3, w, rows, dm_ids, erased_ids, array('l', [0] * 6), array('l', [0] * 6))
+                with self.assertRaisesRegex(ValueError, "out of range"):
+                    backend.decode_data(3, 3, 16, rows, dm_ids, erased_ids, array('l', [0] * 6), array('l', [0] * 6))
+
+    def test_fusion_accessor(self):
+        # Test that a fused stack maintained by one backend can be recovered by the other
+        for maintain, recover in [(self.jerasure, self.numpy), (self.numpy, self.jerasure)]:
+            data = self.random_longs(3, 16)
+            accessor = FusionAccessor(3, 3, backend=maintain)
+
+            codes = [0, 0, 0]
+            for code_index in range(3):
+                for source_id, value in enumerate(data):
+                    codes[code_index] = accessor.get_updated_code(codes[code_index], code_index, 0, value, source_id)
+
+            recovered = FusionAccessor(3, 3, backend=recover).get_recovered_data(codes, [0, 0, 0], [0, 1, 2, -1])
+            self.assertEqual(recovered, list(data))
+
+    def test_parity_decoder(self):
+        # Test every single lost primary is rebuilt from XOR parity alone, by both backends
+        for backend in (self.jerasure, self.numpy):
+            accessor = FusionAccessor(5, 3, backend=backend)
+            self.assertEqual([accessor.is_parity_code(x) for x in range(3)], [True, False, False])
+
+            data = self.random_longs(5 * 20, 16)
+            codes = array('l', [0] * 3 * 20)
+            matrix = array('i', backend.calculate_rs_matrix(5, 3, 16))
+            backend.encode_columns(5, 3, 16, matrix, data, codes)
+
+            for lost in range(5):
+                decoder = accessor.get_decoder([lost])
+                self.assertTrue(decoder.is_parity_decoder)
+
+                damaged = array('l', data)
+                damaged[lost * 20:(lost + 1) * 20] = array('l', [0] * 20)
+                decoder.decode_columns(codes, damaged)
+                self.assertEqual(damaged, data)
+
+            # Test losing the parity backup as well falls back to matrix inversion
+            self.assertFalse(accessor.get_decoder([1, 5]).is_parity_decoder)
+
+    def test_calculate_coding_matrix(self):
+        for scheme in CodingScheme.values():
+            for k, m in CONFIGURATIONS + [(10, 6)]:
+                self.assertEqual(
+                    self.numpy.calculate_coding_matrix(scheme, k, m, 8), self.jerasure.calculate_coding_matrix(scheme, k, m, 8)
+                )
+
+    def test_calculate_bitmatrix_codes(self):
+        for scheme in BITMATRIX_SCHEMES:
+            for k, m in CONFIGURATIONS:
+                matrix = array('i', self.jerasure.calculate_coding_matrix(scheme, k, m, 8))
+                old_values, new_values = self.random_longs(50, 16), self.random_longs(50, 16)
+                positions = array('i', [self.random.randrange(k) for _ in range(50)])
+
+                for code_index in range(m):
+                    initial_codes = self.random_longs(50, 16)
+                    codes = [array('l', initial_codes), array('l', initial_codes)]
+
+                    self.jerasure.calculate_bitmatrix_codes(
+                        k, m, 8, matrix, codes[0], code_index, old_values, new_values, positions)
+                    self.numpy.calculate_bitmatrix_codes(
+                        k, m, 8, matrix, codes[1], code_index, old_values, new_values, positions)
+                    self.assertEqual(codes[0], codes[1])
+
+    def test_encode_and_decode_bitmatrix_columns(self):
+        for scheme in BITMATRIX_SCHEMES:
+            for k, m in CONFIGURATIONS:
+                matrix = array('i', self.jerasure.calculate_coding_matrix(scheme, k, m, 8))
+                data = self.random_longs(k * 20, 16)
+                codes = [array('l', [0] * m * 20), array('l', [0] * m * 20)]
+
+                self.jerasure.encode_bitmatrix_columns(k, m, 8, matrix, data, codes[0])
+                self.numpy.encode_bitmatrix_columns(k, m, 8, matrix, data, codes[1])
+                self.assertEqual(codes[0], codes[1])
+
+                for erasures in combinations(range(k + m), m):
+                    decoding_matrix, dm_ids = self.numpy.calculate_decoding_matrix(k, m, 8, list(erasures), scheme=scheme)
+                    self.assertEqual(
+                        (decoding_matrix, dm_ids),
+                        self.jerasure.calculate_decoding_matrix(k, m, 8, list(erasures), scheme=scheme)
+                    )
+
+                    erased_ids = [x for x in erasures if x < k]
+                    decoding_rows = array('i', [decoding_matrix[i * k + j] for i in erased_ids for j in range(k)])
+
+                    for backend in (self.jerasure, self.numpy):
+                        damaged = array('l', data)
+                        for x in erased_ids:
+                            damaged[x * 20:(x + 1) * 20] = array('l', [0] * 20)
+
+                        backend.decode_bitmatrix_columns(
+                            k, m, 8, decoding_rows, array('i', dm_ids), array('i', erased_ids), codes[0], damaged)
+                        self.assertEqual(damaged, data)
+
+    def test_coding_scheme_accessor(self):
+        # Test codes maintained update by update under each scheme decode, with XOR parity only where row 0 is ones
+        for scheme in CodingScheme.values():
+            for backend in (self.jerasure, self.numpy):
+                accessor = FusionAccessor(4, 2, galois_w=8, backend=backend, coding_scheme=scheme)
+                data = self.random_longs(4 * 10, 16)
+
+                codes = array('l', [0] * 2 * 10)
+                for code_index in range(2):
+                    column = array('l', [0] * 4 * 10)
+                    accessor.get_updated_codes(
+                        column, code_index, array('l', [0] * 4 * 10), data, array('i', [x // 10 for x in range(40)]))
+                    for x in range(40):
+                        codes[code_index * 10 + x % 10] ^= column[x]
+
+                encoded = array('l', [0] * 2 * 10)
+                accessor.get_encoded_columns(data, encoded)
+                self.assertEqual(encoded, codes)
+
+                for erasures in ([1], [0, 3], [2, 4]):
+                    decoder = accessor.get_decoder(erasures)
+                    self.assertEqual(decoder.is_parity_decoder, erasures == [1] and scheme != CodingScheme.CAUCHY)
+
+                    damaged = array('l', data)
+                    for x in erasures:
+                        if x < 4:
+                            damaged[x * 10:(x + 1) * 10] = array('l', [0] * 10)
+                    decoder.decode_columns(codes, damaged)
+                    self.assertEqual(damaged, data)
+
+                # Test recovery of stripe-major data through the same decoders
+                stripes = [data[j * 10] for j in range(4)]
+                recovered = accessor.get_recovered_data(codes[0::10], [0, stripes[1], 0, stripes[3]], [0, 2, -1])
+                self.assertEqual(recovered, stripes)
+
+        # Test bitmatrix schemes need one-byte packets
+        self.assertRaises(Exception, FusionAccessor, 4, 2, galois_w=16, coding_scheme=CodingScheme.CAUCHY)
+
+    def test_multiplication_tables(self):
+        # Test single updates by table lookup match the backend's batch updates, for negative values too
+        for scheme, w in [(CodingScheme.VANDERMONDE, 8), (CodingScheme.VANDERMONDE, 16)] + [(x, 8) for x in BITMATRIX_SCHEMES]:
+            for backend in (self.jerasure, self.numpy):
+                accessor = FusionAccessor(5, 3, galois_w=w, backend=backend, coding_scheme=scheme)
+                old_values = array('l', [self.random.getrandbits(64) - (1 << 63) for _ in range(20)] + [0, -1, 7])
+                new_values = array('l', [self.random.getrandbits(64) - (1 << 63) for _ in range(20)] + [-1, 0, 7])
+                source_ids = array('i', [self.random.randrange(5) for _ in range(23)])
+
+                for code_index in range(3):
+                    codes = self.random_longs(23, 16)
+                    expected = array('l', codes)
+                    accessor.get_updated_codes(expected, code_index, old_values, new_values, source_ids)
+
+                    for code, old_value, new_value, source_id, updated in zip(
+                        codes, old_values, new_values, source_ids, expected
+                    ):
+                        self.assertEqual(accessor.get_updated_code(code, code_index, old_value, new_value, source_id), updated)
+
+
+if __name__ == '__main__':
+    unittest.main()
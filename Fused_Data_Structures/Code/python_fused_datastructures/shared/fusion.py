@@ -1,37 +1,347 @@
-from typing import List
+from array import array
+from functools import lru_cache
+from typing import Callable, List, Iterable, Optional, Sequence, Tuple
 
-import python_jerasure
+from protos.service_pb2 import CodingScheme
+from shared.backends.available_backends import get_backend
+from shared.backends.interface import FusionBackend
+from shared.types import DEFAULT_CODING_SCHEME, DEFAULT_GALOIS_W
 
-GALOIS_W = 16
+DECODER_CACHE_SIZE = 64
+MULTIPLICATION_TABLE_CACHE_SIZE = 1024
+
+# Codes are linear, so the update for any difference is the XOR of the updates for each of its bytes on their own
+BYTES_PER_LONG = 8
+LONG_MASK = (1 << 64) - 1
+
+
+class Decoder:
+    """Decodes stripes for one erasure pattern, against decoding rows that are inverted once"""
+
+    def __init__(
+        self,
+        backend: FusionBackend,
+        number_of_primaries: int,
+        number_of_faults: int,
+        galois_w: int,
+        coding_scheme: int,
+        erasures: Tuple[int, ...]
+    ):
+        self.__backend = backend
+        self.__number_of_primaries = number_of_primaries
+        self.__number_of_faults = number_of_faults
+        self.__galois_w = galois_w
+        self.__coding_scheme = coding_scheme
+
+        # Only rows belonging to erased primaries are needed - erased backups are never rebuilt
+        self.__erased_ids = array("i", [x for x in erasures if x < number_of_primaries])
+        first_row = get_coding_matrix(backend, number_of_primaries, number_of_faults, galois_w, coding_scheme)[
+            :number_of_primaries
+        ]
+        self.__is_parity_decoder = (
+            len(self.__erased_ids) == 1 and number_of_primaries not in erasures and all(x == 1 for x in first_row)
+        )
+
+        if self.__is_parity_decoder:
+            # The first coding row is all ones, so backup 0 is XOR parity and a single lost primary
+            # is the XOR of that parity with every surviving primary - no matrix inversion needed
+            self.__dm_ids = array("i", [x for x in range(number_of_primaries + 1) if x != self.__erased_ids[0]])
+            self.__decoding_rows = array("i", [1]) * number_of_primaries
+            return
+
+        decoding_matrix = array("i", [0]) * (number_of_primaries * number_of_primaries)
+        self.__dm_ids = array("i", [0]) * number_of_primaries
+
+        backend.calculate_decoding_matrix(
+            number_of_primaries,
+            number_of_faults,
+            galois_w,
+            array("i", erasures),
+            decoding_matrix,
+            self.__dm_ids,
+            coding_scheme
+        )
+
+        self.__decoding_rows = array("i")
+        for i in self.__erased_ids:
+            self.__decoding_rows.extend(decoding_matrix[i * number_of_primaries:(i + 1) * number_of_primaries])
+
+    @property
+    def is_parity_decoder(self) -> bool:
+        return self.__is_parity_decoder
+
+    def decode(
+        self,
+        code_words: Sequence[int],
+        data_words: Sequence[int],
+        out: Optional[array] = None
+    ) -> Optional[List[int]]:
+        """Recover erased data for any number of stripes, laid out one stripe after another, into `out` if given"""
+        if is_bitmatrix_scheme(self.__coding_scheme):
+            return self.__decode_bitmatrix(code_words, data_words, out)
+
+        return self.__backend.decode_data(
+            self.__number_of_primaries,
+            self.__number_of_faults,
+            self.__galois_w,
+            self.__decoding_rows,
+            self.__dm_ids,
+            self.__erased_ids,
+            code_words,
+            data_words,
+            out
+        )
+
+    def __decode_bitmatrix(
+        self,
+        code_words: Sequence[int],
+        data_words: Sequence[int],
+        out: Optional[array] = None
+    ) -> Optional[List[int]]:
+        # Bitmatrix codes are only decoded a column at a time, so transpose the stripes into columns and back
+        number_of_primaries, number_of_faults = self.__number_of_primaries, self.__number_of_faults
+        code_words, data_words = array("l", code_words), array("l", data_words)
+
+        code_columns = array("l")
+        for i in range(number_of_faults):
+            code_columns.extend(code_words[i::number_of_faults])
+
+        data_columns = array("l")
+        for j in range(number_of_primaries):
+            data_columns.extend(data_words[j::number_of_primaries])
+
+        self.decode_columns(code_columns, data_columns)
+
+        number_of_stripes = len(data_words) // number_of_primaries
+        recovered = out if out is not None else data_words
+        for j in range(number_of_primaries):
+            recovered[j::number_of_primaries] = data_columns[j * number_of_stripes:(j + 1) * number_of_stripes]
+
+        if out is None:
+            return recovered.tolist()
+
+    def decode_columns(self, code_columns: array, data_columns: array) -> None:
+        """Recover erased data for a whole stack in place, with each device's values stored contiguously"""
+        decode_columns = (
+            self.__backend.decode_bitmatrix_columns if is_bitmatrix_scheme(self.__coding_scheme)
+            else self.__backend.decode_columns
+        )
+        decode_columns(
+            self.__number_of_primaries,
+            self.__number_of_faults,
+            self.__galois_w,
+            self.__decoding_rows,
+            self.__dm_ids,
+            self.__erased_ids,
+            code_columns,
+            data_columns
+        )
+
+
+def is_bitmatrix_scheme(coding_scheme: int) -> bool:
+    """Cauchy codes are bitmatrix codes, maintained with XORs alone rather than GF(2^w) multiplies"""
+    return coding_scheme in (CodingScheme.CAUCHY, CodingScheme.CAUCHY_GOOD)
+
+
+def check_coding_scheme(galois_w: int, coding_scheme: int) -> None:
+    """Ensure the coding scheme exists, and that bitmatrix schemes use one-byte packets"""
+    if coding_scheme not in CodingScheme.values():
+        raise Exception(f"Unknown coding scheme {coding_scheme}")
+    if is_bitmatrix_scheme(coding_scheme) and galois_w != 8:
+        raise Exception(
+            f"{CodingScheme.Name(coding_scheme)} codes split each value into 8 one-byte packets, so need a Galois word size of 8"
+        )
+
+
+def check_galois_w(number_of_primaries: int, number_of_faults: int, galois_w: int) -> None:
+    """Ensure every primary and backup can be given a distinct row of the distribution matrix over GF(2^w)"""
+    if galois_w not in (8, 16):
+        raise Exception(f"Galois word size must be 8 or 16, not {galois_w}")
+    if number_of_primaries + number_of_faults > 1 << galois_w:
+        raise Exception(
+            f"A cluster of {number_of_primaries + number_of_faults} nodes needs a Galois word size above {galois_w}"
+        )
+
+
+def get_code_calculator(backend: FusionBackend, coding_scheme: int) -> Callable[..., None]:
+    return backend.calculate_bitmatrix_codes if is_bitmatrix_scheme(coding_scheme) else backend.calculate_rs_codes
+
+
+@lru_cache(maxsize=None)
+def get_coding_matrix(
+    backend: FusionBackend, number_of_primaries: int, number_of_faults: int, galois_w: int, coding_scheme: int
+) -> array:
+    """Coding matrix shared by every accessor in the process with the same shape of cluster - it must not be modified"""
+    matrix = array("i", [0]) * (number_of_primaries * number_of_faults)
+    backend.calculate_coding_matrix(coding_scheme, number_of_primaries, number_of_faults, galois_w, matrix)
+
+    return matrix
+
+
+@lru_cache(maxsize=MULTIPLICATION_TABLE_CACHE_SIZE)
+def get_multiplication_table(
+    backend: FusionBackend,
+    number_of_primaries: int,
+    number_of_faults: int,
+    galois_w: int,
+    coding_scheme: int,
+    code_index: int,
+    source_id: int
+) -> array:
+    """Code updates for every value of every byte of a difference from `source_id`, indexed by position * 256 + value"""
+    differences = array("l", [0]) * (BYTES_PER_LONG * 256)
+    for position in range(BYTES_PER_LONG):
+        for value in range(256):
+            # Stored as signed longs, so the top byte wraps around
+            difference = value << (8 * position)
+            differences[position * 256 + value] = difference - (1 << 64) if difference >> 63 else difference
+
+    table = array("l", [0]) * len(differences)
+    get_code_calculator(backend, coding_scheme)(
+        number_of_primaries,
+        number_of_faults,
+        galois_w,
+        get_coding_matrix(backend, number_of_primaries, number_of_faults, galois_w, coding_scheme),
+        table,
+        code_index,
+        array("l", [0]) * len(differences),
+        differences,
+        array("i", [source_id]) * len(differences)
+    )
+
+    return table
+
+
+@lru_cache(maxsize=DECODER_CACHE_SIZE)
+def get_decoder(
+    backend: FusionBackend,
+    number_of_primaries: int,
+    number_of_faults: int,
+    galois_w: int,
+    coding_scheme: int,
+    erasures: Tuple[int, ...]
+) -> Decoder:
+    return Decoder(backend, number_of_primaries, number_of_faults, galois_w, coding_scheme, erasures)
 
 
 class FusionAccessor:
-    def __init__(self, number_of_primaries: int, number_of_faults: int):
+    def __init__(
+        self,
+        number_of_primaries: int,
+        number_of_faults: int,
+        galois_w: int = DEFAULT_GALOIS_W,
+        backend: Optional[FusionBackend] = None,
+        coding_scheme: int = DEFAULT_CODING_SCHEME
+    ):
+        check_galois_w(number_of_primaries, number_of_faults, galois_w)
+        check_coding_scheme(galois_w, coding_scheme)
+
         self.__number_of_primaries = number_of_primaries
         self.__number_of_faults = number_of_faults
+        self.__galois_w = galois_w
+        self.__coding_scheme = coding_scheme
+        self.__backend = backend or get_backend()
+
+        self.__coding_matrix = get_coding_matrix(
+            self.__backend, number_of_primaries, number_of_faults, galois_w, coding_scheme
+        )
+
+        # Codes whose row is all ones are plain XOR parity of the primaries, and never need GF arithmetic
+        self.__parity_codes = frozenset(
+            i for i in range(number_of_faults)
+            if all(x == 1 for x in self.__coding_matrix[i * number_of_primaries:(i + 1) * number_of_primaries])
+        )
+
+    @property
+    def backend(self) -> FusionBackend:
+        return self.__backend
 
-        self.__rs_array = python_jerasure.calculate_rs_matrix(number_of_primaries, number_of_faults, GALOIS_W)
+    @property
+    def galois_w(self) -> int:
+        return self.__galois_w
 
-    def get_updated_code(self, code: int, code_index: int, old_value: int, new_value: int, source_id: int):
-        rs_matrix_element = self.__rs_array[code_index *  self.__number_of_primaries + source_id]
-        return python_jerasure.calculate_rs_code(
+    @property
+    def coding_scheme(self) -> int:
+        return self.__coding_scheme
+
+    def is_parity_code(self, code_index: int) -> bool:
+        return code_index in self.__parity_codes
+
+    def get_updated_code(self, code: int, code_index: int, old_value: int, new_value: int, source_id: int) -> int:
+        if code_index in self.__parity_codes:
+            return code ^ old_value ^ new_value
+
+        table = get_multiplication_table(
+            self.__backend,
             self.__number_of_primaries,
             self.__number_of_faults,
-            GALOIS_W,
-            code,
+            self.__galois_w,
+            self.__coding_scheme,
             code_index,
-            old_value,
-            new_value,
-            source_id,
-            rs_matrix_element
+            source_id
         )
 
-    def get_recovered_data(self, code_words: List[int], data_words: List[int], erasures: List[int]):
-        return python_jerasure.recover_data(
+        # Look up the update for each non-zero byte of the difference
+        difference = (old_value ^ new_value) & LONG_MASK
+        offset = 0
+        while difference:
+            code ^= table[offset + (difference & 0xFF)]
+            difference >>= 8
+            offset += 256
+
+        return code
+
+    def get_updated_codes(
+        self,
+        codes: array,
+        code_index: int,
+        old_values: array,
+        new_values: array,
+        source_ids: array
+    ) -> None:
+        """Apply every (old value -> new value) update from `source_ids` to `codes` in place, in a single call"""
+        get_code_calculator(self.__backend, self.__coding_scheme)(
             self.__number_of_primaries,
             self.__number_of_faults,
-            GALOIS_W,
-            code_words,
-            data_words,
-            erasures
+            self.__galois_w,
+            self.__coding_matrix,
+            codes,
+            code_index,
+            old_values,
+            new_values,
+            source_ids
+        )
+
+    def get_decoder(self, erasures: Iterable[int]) -> Decoder:
+        return get_decoder(
+            self.__backend,
+            self.__number_of_primaries,
+            self.__number_of_faults,
+            self.__galois_w,
+            self.__coding_scheme,
+            tuple(sorted(set(erasures)))
+        )
+
+    def get_encoded_columns(self, data_columns: array, code_columns: array) -> None:
+        """Calculate every code column of a whole stack from its data columns, writing them into `code_columns`"""
+        encode_columns = (
+            self.__backend.encode_bitmatrix_columns if is_bitmatrix_scheme(self.__coding_scheme)
+            else self.__backend.encode_columns
         )
+        encode_columns(
+            self.__number_of_primaries,
+            self.__number_of_faults,
+            self.__galois_w,
+            self.__coding_matrix,
+            data_columns,
+            code_columns
+        )
+
+    def get_recovered_data(
+        self,
+        code_words: Sequence[int],
+        data_words: Sequence[int],
+        erasures: Iterable[int],
+        out: Optional[array] = None
+    ):
+        return self.get_decoder(x for x in erasures if x != -1).decode(code_words, data_words, out)
@@ -0,0 +1,138 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Union
+
+import grpc
+
+from protos.service_pb2 import MutationAck, MutationBatch, SequencedMutation, StructureMutation
+
+# Mutations that can be sent down a channel before the first of them has to be acknowledged
+MUTATION_WINDOW = 128
+
+
+class MutationRejected(Exception):
+    """The node received a mutation, but could not apply it - unlike a broken stream, sending it again will not help"""
+
+
+class MutationChannel:
+    """
+    Long-lived bidirectional stream of mutations to a node, opened on first use. Mutations are numbered and sent in
+    order without waiting on each other, while their acks come back asynchronously - at most `window` at a time are
+    left unacknowledged
+    """
+
+    def __init__(
+        self,
+        open_stream: Callable[[AsyncIterator[SequencedMutation]], AsyncIterator[MutationAck]],
+        window: int = MUTATION_WINDOW
+    ):
+        self.__open_stream = open_stream
+        self.__window = asyncio.Semaphore(window)
+        self.__next_sequence_number = 0
+        self.__pending: Dict[int, asyncio.Future] = {}
+        self.__outgoing: Optional[asyncio.Queue] = None
+        self.__reader: Optional[asyncio.Task] = None
+
+    async def submit(self, mutation: Union[StructureMutation, MutationBatch]) -> asyncio.Future:
+        """Send a mutation or batch after everything submitted before it, returning a future completed by its ack"""
+        await self.__window.acquire()
+        if self.__reader is None:
+            self.__open()
+
+        sequence_number = self.__next_sequence_number
+        self.__next_sequence_number += 1
+
+        future = asyncio.get_running_loop().create_future()
+        self.__pending[sequence_number] = future
+        if isinstance(mutation, MutationBatch):
+            self.__outgoing.put_nowait(SequencedMutation(sequenceNumber=sequence_number, batch=mutation))
+        else:
+            self.__outgoing.put_nowait(SequencedMutation(sequenceNumber=sequence_number, mutation=mutation))
+
+        return future
+
+    async def send(self, mutation: StructureMutation) -> None:
+        """Send a mutation and wait until it has been applied"""
+        await (await self.submit(mutation))
+
+    async def close(self) -> None:
+        if self.__reader is not None:
+            self.__outgoing.put_nowait(None)
+            await self.__reader
+
+    def __open(self) -> None:
+        self.__outgoing = asyncio.Queue()
+        self.__reader = asyncio.ensure_future(self.__read_acks(self.__open_stream(self.__requests(self.__outgoing))))
+
+    @staticmethod
+    async def __requests(outgoing: asyncio.Queue) -> AsyncIterator[SequencedMutation]:
+        while True:
+            mutation = await outgoing.get()
+            if mutation is None:
+                return
+
+            yield mutation
+
+    async def __read_acks(self, acks: AsyncIterator[MutationAck]) -> None:
+        error = Exception("Mutation stream closed before every mutation was acknowledged")
+        try:
+            # The node applies mutations in the order they were sent, so acks arrive in that order too
+            async for ack in acks:
+                future = self.__pending.pop(ack.sequenceNumber)
+                self.__window.release()
+
+                # A caller that stopped waiting, e.g. after a timeout, has cancelled its future already
+                if future.done():
+                    continue
+                if ack.error:
+                    future.set_exception(MutationRejected(ack.error))
+                else:
+                    future.set_result(None)
+        except grpc.aio.AioRpcError as e:
+            error = e
+
+        # Fail anything left unacknowledged, and let the next mutation open a fresh stream
+        for future in self.__pending.values():
+            self.__window.release()
+            if not future.done():
+                future.set_exception(error)
+
+        self.__pending.clear()
+        self.__reader = None
+        # End the broken stream's requests too, rather than leaving them waiting on mutations that will never come
+        self.__outgoing.put_nowait(None)
+
+
+async def acknowledge_mutation(
+    apply: Callable[[StructureMutation, Any], Awaitable[Optional[StructureMutation]]],
+    sequenced_mutation: SequencedMutation,
+    context: Any
+) -> MutationAck:
+    """Apply a mutation or batch received over a mutation channel with a node's unary handler, acknowledging the outcome"""
+    if sequenced_mutation.WhichOneof("payload") == "batch":
+        mutations = sequenced_mutation.batch.mutations
+    else:
+        mutations = [sequenced_mutation.mutation]
+
+    # A failed mutation does not stop the rest of its batch from being applied
+    errors = []
+    for mutation in mutations:
+        error = await apply_mutation(apply, mutation, context)
+        if error:
+            errors.append(error)
+
+    return MutationAck(sequenceNumber=sequenced_mutation.sequenceNumber, error="; ".join(errors))
+
+
+async def apply_mutation(
+    apply: Callable[[StructureMutation, Any], Awaitable[Optional[StructureMutation]]],
+    mutation: StructureMutation,
+    context: Any
+) -> Optional[str]:
+    """Apply a single mutation with a node's unary handler, returning why it failed if it did"""
+    try:
+        if await apply(mutation, context) is None:
+            return "Mutation does not refer to a structure on this node"
+    except Exception as e:
+        return str(e) or type(e).__name__
+
+    return None
@@ -1,11 +1,19 @@
 import multiprocessing
 from typing import NamedTuple, List
 
+from protos.service_pb2 import CodingScheme
+
+# Word size of the Galois field codes are calculated in - 8 is cheaper, but only supports clusters of up to 256 nodes
+DEFAULT_GALOIS_W = 16
+DEFAULT_CODING_SCHEME = CodingScheme.VANDERMONDE
+
 
 class ClusterInformation(NamedTuple):
     cluster_identifier: str
     number_of_primaries: int
     number_of_faults: int
+    galois_w: int = DEFAULT_GALOIS_W
+    coding_scheme: int = DEFAULT_CODING_SCHEME
 
 
 class NodeProcesses(NamedTuple):
@@ -1,13 +1,31 @@
 #include "python_jerasure.h"
 
-char recover_docs[] = "Recover a list of data from Reed-Solomon codes";
-char gen_rs_matrix_docs[] = "Generate Reed-Solomon matrix for the specified number of primary and backup nodes";
+char recover_docs[] = "Recover a list of data from Reed-Solomon codes, or write it into an optional output buffer";
+char gen_rs_matrix_docs[] = "Generate Reed-Solomon matrix for the specified number of primary and backup nodes, optionally into an int buffer";
 char calculate_rs_code_docs[] = "Calculate a Reed-Solomon code for the provided value";
+char calculate_rs_codes_docs[] = "Apply a batch of value updates to a buffer of Reed-Solomon codes in place";
+char calculate_decoding_matrix_docs[] = "Invert the distribution matrix of a coding scheme for the specified set of erasures, optionally into int buffers";
+char decode_data_docs[] = "Recover the erased data of any number of stripes using a precomputed decoding matrix, optionally in place";
+char decode_columns_docs[] = "Recover erased columns of data in place, where each device's values are stored contiguously";
+char encode_columns_docs[] = "Calculate every column of Reed-Solomon codes from columns of data, writing them in place";
+char calculate_coding_matrix_docs[] = "Generate the coding matrix of a VANDERMONDE, CAUCHY or CAUCHY_GOOD scheme, optionally into an int buffer";
+char calculate_bitmatrix_codes_docs[] = "Apply a batch of value updates to a buffer of bitmatrix codes in place, using XORs alone";
+char encode_bitmatrix_columns_docs[] = "Calculate every column of bitmatrix codes from columns of data with a scheduled series of XORs";
+char decode_bitmatrix_columns_docs[] = "Recover erased columns of bitmatrix coded data in place with a scheduled series of XORs";
 
 PyMethodDef python_jerasure_functions[] = {
     { "recover_data", (PyCFunction)recover_data, METH_VARARGS, recover_docs },
     { "calculate_rs_code", (PyCFunction)calculate_rs_code, METH_VARARGS, calculate_rs_code_docs },
+    { "calculate_rs_codes", (PyCFunction)calculate_rs_codes, METH_VARARGS, calculate_rs_codes_docs },
     { "calculate_rs_matrix", (PyCFunction)calculate_rs_matrix, METH_VARARGS, gen_rs_matrix_docs },
+    { "calculate_decoding_matrix", (PyCFunction)calculate_decoding_matrix, METH_VARARGS, calculate_decoding_matrix_docs },
+    { "decode_data", (PyCFunction)decode_data, METH_VARARGS, decode_data_docs },
+    { "decode_columns", (PyCFunction)decode_columns, METH_VARARGS, decode_columns_docs },
+    { "encode_columns", (PyCFunction)encode_columns, METH_VARARGS, encode_columns_docs },
+    { "calculate_coding_matrix", (PyCFunction)calculate_coding_matrix, METH_VARARGS, calculate_coding_matrix_docs },
+    { "calculate_bitmatrix_codes", (PyCFunction)calculate_bitmatrix_codes, METH_VARARGS, calculate_bitmatrix_codes_docs },
+    { "encode_bitmatrix_columns", (PyCFunction)encode_bitmatrix_columns, METH_VARARGS, encode_bitmatrix_columns_docs },
+    { "decode_bitmatrix_columns", (PyCFunction)decode_bitmatrix_columns, METH_VARARGS, decode_bitmatrix_columns_docs },
     { NULL }
 };
 
@@ -26,5 +44,13 @@ PyModuleDef python_jerasure_module = {
 };
 
 PyMODINIT_FUNC PyInit_python_jerasure(void) {
-    return PyModule_Create(&python_jerasure_module);
+    PyObject* module = PyModule_Create(&python_jerasure_module);
+
+    if (module && (PyModule_AddIntConstant(module, "VANDERMONDE", 0) < 0 || PyModule_AddIntConstant(module, "CAUCHY", 1) < 0
+            || PyModule_AddIntConstant(module, "CAUCHY_GOOD", 2) < 0)) {
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    return module;
 }
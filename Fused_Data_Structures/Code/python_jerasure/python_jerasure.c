@@ -1,27 +1,546 @@
 #include <Python.h>
 
+#include "./libjerasure/galois.h"
 #include "./libjerasure/jerasure.h"
 #include "./libjerasure/reed_sol.h"
 
+// Coding schemes, exported to Python as module constants
+#define VANDERMONDE 0
+#define CAUCHY 1
+#define CAUCHY_GOOD 2
+
+// Bitmatrix codes split each long into w packets of one byte, so every stripe is a single long
+#define BITMATRIX_W 8
+
+static int check_word_size(int w)
+{
+    if (w != 8 && w != 16 && w != 32) {
+        PyErr_SetString(PyExc_ValueError, "w must be 8, 16 or 32");
+        return 0;
+    }
+
+    return 1;
+}
+
+// Jerasure can only build a distribution matrix with one distinct row per device, so k + m must not exceed 2^w
+static int check_matrix_size(int num_primary_structures, int num_backup_structures, int w)
+{
+    if (num_primary_structures <= 0 || num_backup_structures <= 0
+        || (w < 30 && num_primary_structures + num_backup_structures > (1 << w))) {
+        PyErr_Format(PyExc_ValueError, "cannot build a Reed-Solomon matrix for %d primaries and %d backups with w = %d",
+            num_primary_structures, num_backup_structures, w);
+        return 0;
+    }
+
+    return 1;
+}
+
+// Decoding reads the devices in dm_ids and rebuilds the primaries in erased_ids, both of which index straight into
+// the caller's buffers, so every id must name a device they hold
+static int check_decoding_ids(int* dm_ids, int* erased_ids, Py_ssize_t num_erased, int num_primary_structures,
+    int num_backup_structures, const char* function)
+{
+    Py_ssize_t i;
+
+    for (i = 0; i < num_primary_structures; i++) {
+        if (dm_ids[i] < 0 || dm_ids[i] >= num_primary_structures + num_backup_structures) {
+            PyErr_Format(PyExc_ValueError, "dm_ids out of range in %s", function);
+            return 0;
+        }
+    }
+    for (i = 0; i < num_erased; i++) {
+        if (erased_ids[i] < 0 || erased_ids[i] >= num_primary_structures) {
+            PyErr_Format(PyExc_ValueError, "erased_ids out of range in %s", function);
+            return 0;
+        }
+    }
+
+    return 1;
+}
+
+// Full GF(2^8) multiplication table packed into bytes, so the 256 byte row read by each multiply stays in L1
+static unsigned char w08_products[256][256];
+static int w08_products_created = 0;
+
+static void create_w08_products(void)
+{
+    int x, y;
+
+    for (x = 0; x < 256; x++) {
+        for (y = 0; y < 256; y++) {
+            w08_products[x][y] = (unsigned char)galois_single_multiply(x, y, 8);
+        }
+    }
+
+    w08_products_created = 1;
+}
+
+// Add mat_element * region into dest one byte at a time, using a single row of the product table
+static void update_w08_region(int mat_element, unsigned char* region, unsigned char* dest, Py_ssize_t nbytes)
+{
+    Py_ssize_t i;
+    const unsigned char* row;
+
+    if (!w08_products_created) {
+        create_w08_products();
+    }
+
+    row = w08_products[mat_element & 0xff];
+    for (i = 0; i < nbytes; i++) {
+        dest[i] ^= row[region[i]];
+    }
+}
+
+// Add mat_element * diff into code, as jerasure_update_single_code does, without allocating any intermediate regions
+static void update_code(int w, int mat_element, long diff, long* code)
+{
+    // Multiplying by one is the identity in any GF(2^w), so rows of ones (XOR parity) need no table lookups
+    if (mat_element == 1) {
+        *code ^= diff;
+        return;
+    }
+    if (mat_element == 0) {
+        return;
+    }
+
+    switch (w) {
+    case 8:
+        update_w08_region(mat_element, (unsigned char*)&diff, (unsigned char*)code, sizeof(long));
+        break;
+    case 16:
+        galois_w16_region_multiply((char*)&diff, mat_element, sizeof(long), (char*)code, 1);
+        break;
+    case 32:
+        galois_w32_region_multiply((char*)&diff, mat_element, sizeof(long), (char*)code, 1);
+        break;
+    }
+}
+
+// Add mat_element * region into dest, where both regions hold nbytes
+static void update_region(int w, int mat_element, char* region, char* dest, int nbytes)
+{
+    if (mat_element == 1) {
+        galois_region_xor(region, dest, dest, nbytes);
+        return;
+    }
+    if (mat_element == 0) {
+        return;
+    }
+
+    switch (w) {
+    case 8:
+        update_w08_region(mat_element, (unsigned char*)region, (unsigned char*)dest, nbytes);
+        break;
+    case 16:
+        galois_w16_region_multiply(region, mat_element, nbytes, dest, 1);
+        break;
+    case 32:
+        galois_w32_region_multiply(region, mat_element, nbytes, dest, 1);
+        break;
+    }
+}
+
+// Read exactly n integers from a Python sequence into out
+static int read_long_sequence(PyObject* sequence, long* out, Py_ssize_t n, const char* name)
+{
+    Py_ssize_t i;
+    PyObject** items;
+    PyObject* fast = PySequence_Fast(sequence, name);
+
+    if (!fast) {
+        return 0;
+    }
+    if (PySequence_Fast_GET_SIZE(fast) != n) {
+        PyErr_Format(PyExc_ValueError, "%s must hold %zd integers", name, n);
+        Py_DECREF(fast);
+        return 0;
+    }
+
+    items = PySequence_Fast_ITEMS(fast);
+    for (i = 0; i < n; i++) {
+        out[i] = PyLong_AsLong(items[i]);
+
+        if (out[i] == -1 && PyErr_Occurred()) {
+            Py_DECREF(fast);
+            return 0;
+        }
+    }
+
+    Py_DECREF(fast);
+    return 1;
+}
+
+static PyObject* build_long_list(long* values, Py_ssize_t n)
+{
+    Py_ssize_t i;
+    PyObject* list = PyList_New(n);
+
+    if (!list) {
+        return NULL;
+    }
+
+    for (i = 0; i < n; i++) {
+        PyList_SET_ITEM(list, i, PyLong_FromLong(values[i]));
+    }
+
+    return list;
+}
+
+// Integer values borrowed from a buffer of native longs, or copied out of any other buffer or sequence of integers
+typedef struct {
+    Py_buffer view;
+    long* values;
+    Py_ssize_t length;
+    int has_view;
+    int owns_values;
+} long_values;
+
+// Return the struct character of a single native integer format, or 0 for anything else
+static char integer_format(const char* format)
+{
+    if (!format) {
+        return 'B';
+    }
+    if (format[0] == '@' || format[0] == '=') {
+        format++;
+    }
+    if (format[0] == '\0' || format[1] != '\0' || !strchr("bBhHiIlLqQc", format[0])) {
+        return 0;
+    }
+
+    return format[0];
+}
+
+static int get_long_values(PyObject* object, long_values* out, const char* name)
+{
+    Py_ssize_t i;
+    char format;
+
+    memset(out, 0, sizeof(long_values));
+
+    if (!PyObject_CheckBuffer(object)) {
+        out->length = PySequence_Size(object);
+        if (out->length < 0) {
+            return 0;
+        }
+
+        out->values = (long*)malloc((out->length + 1) * sizeof(long));
+        out->owns_values = 1;
+
+        return read_long_sequence(object, out->values, out->length, name);
+    }
+
+    if (PyObject_GetBuffer(object, &out->view, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) < 0) {
+        return 0;
+    }
+    out->has_view = 1;
+
+    format = integer_format(out->view.format);
+    if (!format) {
+        PyErr_Format(PyExc_TypeError, "%s must be a buffer of integers", name);
+        return 0;
+    }
+
+    // Byte buffers and buffers of 8 byte integers already hold packed longs, so are used without copying
+    if (out->view.itemsize == 1 || out->view.itemsize == sizeof(long)) {
+        if (out->view.len % sizeof(long) != 0) {
+            PyErr_Format(PyExc_ValueError, "%s must hold a whole number of longs", name);
+            return 0;
+        }
+
+        out->values = (long*)out->view.buf;
+        out->length = out->view.len / sizeof(long);
+
+        return 1;
+    }
+
+    out->length = out->view.len / out->view.itemsize;
+    out->values = (long*)malloc((out->length + 1) * sizeof(long));
+    out->owns_values = 1;
+
+    for (i = 0; i < out->length; i++) {
+        switch (format) {
+        case 'h':
+            out->values[i] = ((short*)out->view.buf)[i];
+            break;
+        case 'H':
+            out->values[i] = ((unsigned short*)out->view.buf)[i];
+            break;
+        case 'i':
+            out->values[i] = ((int*)out->view.buf)[i];
+            break;
+        case 'I':
+            out->values[i] = ((unsigned int*)out->view.buf)[i];
+            break;
+        default:
+            PyErr_Format(PyExc_TypeError, "%s must be a buffer of integers", name);
+            return 0;
+        }
+    }
+
+    return 1;
+}
+
+static void release_long_values(long_values* values)
+{
+    if (values->owns_values) {
+        free(values->values);
+    }
+    if (values->has_view) {
+        PyBuffer_Release(&values->view);
+    }
+
+    memset(values, 0, sizeof(long_values));
+}
+
+// Acquire a writable buffer with room for exactly n items of itemsize bytes, as the output of name
+static int get_output_buffer(PyObject* object, Py_buffer* view, Py_ssize_t n, Py_ssize_t itemsize, const char* name)
+{
+    if (PyObject_GetBuffer(object, view, PyBUF_WRITABLE | PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) < 0) {
+        // Match the TypeError raised for read-only buffers passed as w* arguments
+        if (PyErr_ExceptionMatches(PyExc_BufferError)) {
+            PyErr_Clear();
+            PyErr_Format(PyExc_TypeError, "%s must be a writable buffer", name);
+        }
+        return 0;
+    }
+    if (!integer_format(view->format) || (view->itemsize != 1 && view->itemsize != itemsize)) {
+        PyErr_Format(PyExc_TypeError, "%s must be a buffer of %zd byte integers", name, itemsize);
+        PyBuffer_Release(view);
+        return 0;
+    }
+    if (view->len != n * itemsize) {
+        PyErr_Format(PyExc_ValueError, "%s must hold %zd integers", name, n);
+        PyBuffer_Release(view);
+        return 0;
+    }
+
+    return 1;
+}
+
+// Write n ints into out if it was supplied, returning None, or into a new list otherwise
+static PyObject* return_ints(int* values, Py_ssize_t n, PyObject* out, const char* name)
+{
+    Py_ssize_t i;
+    Py_buffer view;
+    PyObject* list;
+
+    if (out && out != Py_None) {
+        if (!get_output_buffer(out, &view, n, sizeof(int), name)) {
+            return NULL;
+        }
+
+        memcpy(view.buf, values, n * sizeof(int));
+        PyBuffer_Release(&view);
+
+        Py_RETURN_NONE;
+    }
+
+    list = PyList_New(n);
+    if (!list) {
+        return NULL;
+    }
+
+    for (i = 0; i < n; i++) {
+        PyList_SET_ITEM(list, i, PyLong_FromLong(values[i]));
+    }
+
+    return list;
+}
+
+// Number of ones in the w * w bitmatrix of n, which is the number of XORs needed to multiply by n
+static int count_bitmatrix_ones(int n, int w)
+{
+    int i, j, ones = 0;
+
+    for (i = 0; i < w; i++) {
+        for (j = 0; j < w; j++) {
+            if (n & (1 << j)) {
+                ones++;
+            }
+        }
+        n = galois_single_multiply(n, 2, w);
+    }
+
+    return ones;
+}
+
+// Cauchy matrix over GF(2^w), with element (i, j) = 1 / (i ^ (m + j))
+static int* cauchy_coding_matrix(int k, int m, int w)
+{
+    int i, j;
+    int* matrix = (int*)malloc(k * m * sizeof(int));
+
+    for (i = 0; i < m; i++) {
+        for (j = 0; j < k; j++) {
+            matrix[i * k + j] = galois_single_divide(1, i ^ (m + j), w);
+        }
+    }
+
+    return matrix;
+}
+
+// Scale the columns of a Cauchy matrix so the first row is all ones, then scale each other row by whichever of its
+// elements leaves the fewest ones in its bitmatrix - any such scaling keeps every square submatrix invertible
+static int* cauchy_good_coding_matrix(int k, int m, int w)
+{
+    int i, j, x, scale, ones, best_ones, best_scale;
+    int* matrix = cauchy_coding_matrix(k, m, w);
+
+    for (j = 0; j < k; j++) {
+        if (matrix[j] != 1) {
+            scale = galois_single_divide(1, matrix[j], w);
+            for (i = 0; i < m; i++) {
+                matrix[i * k + j] = galois_single_multiply(matrix[i * k + j], scale, w);
+            }
+        }
+    }
+
+    for (i = 1; i < m; i++) {
+        best_scale = 1;
+        best_ones = 0;
+        for (x = 0; x < k; x++) {
+            best_ones += count_bitmatrix_ones(matrix[i * k + x], w);
+        }
+
+        for (j = 0; j < k; j++) {
+            if (matrix[i * k + j] == 1) {
+                continue;
+            }
+
+            scale = galois_single_divide(1, matrix[i * k + j], w);
+            ones = 0;
+            for (x = 0; x < k; x++) {
+                ones += count_bitmatrix_ones(galois_single_multiply(matrix[i * k + x], scale, w), w);
+            }
+
+            if (ones < best_ones) {
+                best_ones = ones;
+                best_scale = scale;
+            }
+        }
+
+        for (x = 0; x < k; x++) {
+            matrix[i * k + x] = galois_single_multiply(matrix[i * k + x], best_scale, w);
+        }
+    }
+
+    return matrix;
+}
+
+// Build the coding matrix of a scheme, raising ValueError and returning NULL for anything that cannot be built
+static int* coding_matrix(int scheme, int num_primary_structures, int num_backup_structures, int w)
+{
+    if (!check_word_size(w) || !check_matrix_size(num_primary_structures, num_backup_structures, w)) {
+        return NULL;
+    }
+
+    switch (scheme) {
+    case VANDERMONDE:
+        return reed_sol_vandermonde_coding_matrix(num_primary_structures, num_backup_structures, w);
+    case CAUCHY:
+        return cauchy_coding_matrix(num_primary_structures, num_backup_structures, w);
+    case CAUCHY_GOOD:
+        return cauchy_good_coding_matrix(num_primary_structures, num_backup_structures, w);
+    }
+
+    PyErr_Format(PyExc_ValueError, "unknown coding scheme %d", scheme);
+    return NULL;
+}
+
+static int check_bitmatrix_word_size(int w)
+{
+    if (w != BITMATRIX_W) {
+        PyErr_SetString(PyExc_ValueError, "bitmatrix codes split each long into w packets of one byte, so w must be 8");
+        return 0;
+    }
+
+    return 1;
+}
+
+// Transpose a column of longs into w planes, where plane x holds byte x of every stripe contiguously
+static void column_to_planes(unsigned char* column, unsigned char* planes, Py_ssize_t num_stripes, Py_ssize_t plane_size)
+{
+    Py_ssize_t s;
+    int x;
+
+    for (s = 0; s < num_stripes; s++) {
+        for (x = 0; x < BITMATRIX_W; x++) {
+            planes[x * plane_size + s] = column[s * BITMATRIX_W + x];
+        }
+    }
+}
+
+static void planes_to_column(unsigned char* planes, unsigned char* column, Py_ssize_t num_stripes, Py_ssize_t plane_size)
+{
+    Py_ssize_t s;
+    int x;
+
+    for (s = 0; s < num_stripes; s++) {
+        for (x = 0; x < BITMATRIX_W; x++) {
+            column[s * BITMATRIX_W + x] = planes[x * plane_size + s];
+        }
+    }
+}
+
+// Compute outputs = rows * inputs with XORs alone, scheduling the bitmatrix of rows over whole planes of packets
+static void schedule_columns(int num_inputs, int num_outputs, int* rows, unsigned char** inputs, unsigned char** outputs,
+    Py_ssize_t num_stripes)
+{
+    int i;
+    int *bitmatrix, **schedule;
+    char** planes;
+
+    // Packets are XORed a long at a time, so each plane is padded to a whole number of longs
+    Py_ssize_t plane_size = ((num_stripes + sizeof(long) - 1) / sizeof(long)) * sizeof(long);
+    unsigned char* plane_buffer = (unsigned char*)calloc((num_inputs + num_outputs) * BITMATRIX_W, plane_size);
+
+    planes = (char**)malloc((num_inputs + num_outputs) * sizeof(char*));
+    for (i = 0; i < num_inputs + num_outputs; i++) {
+        planes[i] = (char*)plane_buffer + i * BITMATRIX_W * plane_size;
+    }
+    for (i = 0; i < num_inputs; i++) {
+        column_to_planes(inputs[i], (unsigned char*)planes[i], num_stripes, plane_size);
+    }
+
+    bitmatrix = jerasure_matrix_to_bitmatrix(num_inputs, num_outputs, BITMATRIX_W, rows);
+    schedule = jerasure_smart_bitmatrix_to_schedule(num_inputs, num_outputs, BITMATRIX_W, bitmatrix);
+    jerasure_do_scheduled_operations(planes, schedule, plane_size);
+
+    for (i = 0; i < num_outputs; i++) {
+        planes_to_column((unsigned char*)planes[num_inputs + i], outputs[i], num_stripes, plane_size);
+    }
+
+    jerasure_free_schedule(schedule);
+    free(bitmatrix);
+    free(planes);
+    free(plane_buffer);
+}
+
 PyObject* calculate_rs_matrix(PyObject* self, PyObject* args)
 {
-    int num_primary_structures, num_backup_structures, w, i;
+    int num_primary_structures, num_backup_structures, w;
+
+    PyObject* matrixOut = NULL;
 
-    if (!PyArg_ParseTuple(args, "iii", &num_primary_structures, &num_backup_structures, &w)) {
+    if (!PyArg_ParseTuple(args, "iii|O", &num_primary_structures, &num_backup_structures, &w, &matrixOut)) {
         printf("could not parse all arguments in calculate_rs_matrix\n");
         return NULL;
     }
 
+    if (!check_word_size(w) || !check_matrix_size(num_primary_structures, num_backup_structures, w)) {
+        return NULL;
+    }
+
     // Require RS matrix from jerasure...
     int* matrixRaw = reed_sol_vandermonde_coding_matrix(num_primary_structures, num_backup_structures, w);
 
-    // Convert result to Python list...
-    PyObject* matrixList = PyList_New(num_primary_structures * num_backup_structures);
-    for (i = 0; i < num_primary_structures * num_backup_structures; i++) {
-        PyList_SetItem(matrixList, i, PyLong_FromLong(matrixRaw[i]));
-    }
+    // Write result into the output buffer, or a new Python list...
+    PyObject* result = return_ints(matrixRaw, num_primary_structures * num_backup_structures, matrixOut, "matrix");
+
+    free(matrixRaw);
 
-    return matrixList;
+    return result;
 }
 
 PyObject* calculate_rs_code(PyObject* self, PyObject* args)
@@ -34,23 +553,82 @@ PyObject* calculate_rs_code(PyObject* self, PyObject* args)
         return NULL;
     }
 
+    if (!check_word_size(w)) {
+        return NULL;
+    }
+
     long code_long = (long)code;
-    long old_value_long = (long)old_value;
-    long new_value_long = (long)new_value;
 
-    char* code_char = (char*)malloc(sizeof(char) * sizeof(long));
-    char* old_value_char = (char*)malloc(sizeof(char) * sizeof(long));
-    char* new_value_char = (char*)malloc(sizeof(char) * sizeof(long));
+    update_code(w, mat_element, (long)old_value ^ (long)new_value, &code_long);
+
+    return PyLong_FromLong(code_long);
+}
+
+PyObject* calculate_rs_codes(PyObject* self, PyObject* args)
+{
+    int num_primary_structures, num_backup_structures, w, code_index;
+    int *matrix_row, *positions_raw;
+    long *codes_raw, *old_values_raw, *new_values_raw;
+    Py_ssize_t i, num_updates;
+
+    Py_buffer matrix, codes, old_values, new_values, positions;
+
+    if (!PyArg_ParseTuple(args, "iiiy*w*iy*y*y*", &num_primary_structures, &num_backup_structures, &w, &matrix, &codes,
+            &code_index, &old_values, &new_values, &positions)) {
+        printf("could not parse all arguments in calculate_rs_codes\n");
+        return NULL;
+    }
+
+    PyObject* result = NULL;
+    num_updates = codes.len / sizeof(long);
+
+    // Ensure all buffers describe the same number of updates...
+    if (!check_word_size(w)) {
+        goto done;
+    }
+    if (code_index < 0 || code_index >= num_backup_structures) {
+        PyErr_SetString(PyExc_ValueError, "code_index out of range in calculate_rs_codes");
+        goto done;
+    }
+    if (matrix.len != (Py_ssize_t)(num_primary_structures * num_backup_structures * sizeof(int))) {
+        PyErr_SetString(PyExc_ValueError, "matrix must hold num_primary_structures * num_backup_structures ints");
+        goto done;
+    }
+    if (codes.len % sizeof(long) != 0 || old_values.len != codes.len || new_values.len != codes.len
+        || positions.len != (Py_ssize_t)(num_updates * sizeof(int))) {
+        PyErr_SetString(PyExc_ValueError, "codes, old_values, new_values and positions must describe the same number of updates");
+        goto done;
+    }
+
+    matrix_row = (int*)matrix.buf + code_index * num_primary_structures;
+    codes_raw = (long*)codes.buf;
+    old_values_raw = (long*)old_values.buf;
+    new_values_raw = (long*)new_values.buf;
+    positions_raw = (int*)positions.buf;
+
+    for (i = 0; i < num_updates; i++) {
+        if (positions_raw[i] < 0 || positions_raw[i] >= num_primary_structures) {
+            PyErr_SetString(PyExc_ValueError, "position out of range in calculate_rs_codes");
+            goto done;
+        }
+    }
+
+    // Apply each update to its code in place: c_i' = c_i + m_i_j * (d_j' - d_j)
+    for (i = 0; i < num_updates; i++) {
+        update_code(w, matrix_row[positions_raw[i]], old_values_raw[i] ^ new_values_raw[i], &codes_raw[i]);
+    }
 
-    // Convert the code/old value/new value into a long char*, as required by jerasure..
-    memcpy(code_char, &code_long, sizeof(long));
-    memcpy(old_value_char, &old_value_long, sizeof(long));
-    memcpy(new_value_char, &new_value_long, sizeof(long));
+    Py_INCREF(Py_None);
+    result = Py_None;
 
-    jerasure_update_single_code(num_primary_structures, num_backup_structures, w, mat_element, code_char, code_index,
-        sizeof(long), old_value_char, new_value_char, position);
+done:
+    PyBuffer_Release(&matrix);
+    PyBuffer_Release(&codes);
+    PyBuffer_Release(&old_values);
+    PyBuffer_Release(&new_values);
+    PyBuffer_Release(&positions);
 
-    return PyLong_FromLong(*(long*)code_char);
+    return result;
 }
 
 PyObject* recover_data(PyObject* self, PyObject* args)
@@ -60,95 +638,705 @@ PyObject* recover_data(PyObject* self, PyObject* args)
     PyObject* dataRaw = NULL;
     PyObject* codesRaw = NULL;
     PyObject* erasuresRaw = NULL;
+    PyObject* dataOut = NULL;
+    PyObject* result = NULL;
+
+    long_values data, codes, erasures_long;
+    Py_buffer out;
+    int has_out = 0;
+
+    char **data_ptrs = NULL, **coding_ptrs = NULL;
+    int *erasures = NULL, *matrix = NULL;
+    long* recovered = NULL;
 
-    if (!PyArg_ParseTuple(
-            args, "iiiOOO", &num_primary_structures, &num_backup_structures, &w, &codesRaw, &dataRaw, &erasuresRaw)) {
+    if (!PyArg_ParseTuple(args, "iiiOOO|O", &num_primary_structures, &num_backup_structures, &w, &codesRaw, &dataRaw,
+            &erasuresRaw, &dataOut)) {
         printf("could not parse all arguments in recover\n");
         return NULL;
     }
 
-    PyObject* dataIter = PyObject_GetIter(dataRaw);
-    PyObject* codesIter = PyObject_GetIter(codesRaw);
-    PyObject* erasuresIter = PyObject_GetIter(erasuresRaw);
+    memset(&data, 0, sizeof(long_values));
+    memset(&codes, 0, sizeof(long_values));
+    memset(&erasures_long, 0, sizeof(long_values));
 
-    // Ensure all expected inputs are lists...
-    if (!codesIter || !dataIter || !erasuresIter) {
-        printf("could not build iterators for all input lists in recover\n");
-        return NULL;
+    if (!check_word_size(w) || !check_matrix_size(num_primary_structures, num_backup_structures, w)) {
+        goto done;
     }
 
-    // Allocate memory for input lists...
-    char** data = (char**)malloc(num_primary_structures * sizeof(char*));
-    char** codes = (char**)malloc(num_backup_structures * sizeof(char*));
-    int* erasures = (int*)malloc((num_backup_structures + 1) * sizeof(int));
+    // Read data, codes and erasures from lists or buffers...
+    if (!get_long_values(dataRaw, &data, "data") || !get_long_values(codesRaw, &codes, "codes")
+        || !get_long_values(erasuresRaw, &erasures_long, "erasures")) {
+        goto done;
+    }
+    if (data.length < num_primary_structures) {
+        PyErr_SetString(PyExc_ValueError, "len(data) < num_primary_structures in recover");
+        goto done;
+    }
+    if (codes.length < num_backup_structures) {
+        PyErr_SetString(PyExc_ValueError, "len(codes) < num_backup_structures in recover");
+        goto done;
+    }
+    if (erasures_long.length < num_backup_structures + 1) {
+        PyErr_SetString(PyExc_ValueError, "len(erasures) < num_backup_structures + 1 in recover");
+        goto done;
+    }
+
+    // Decode straight into the output buffer when one is supplied, otherwise into a copy of the data...
+    if (dataOut && dataOut != Py_None) {
+        if (!get_output_buffer(dataOut, &out, num_primary_structures, sizeof(long), "out")) {
+            goto done;
+        }
+
+        has_out = 1;
+        recovered = (long*)out.buf;
+    } else {
+        recovered = (long*)malloc(num_primary_structures * sizeof(long));
+    }
+    memmove(recovered, data.values, num_primary_structures * sizeof(long));
+
+    // Point jerasure at each long of the data and codes, and copy codes so the caller's buffer is never written...
+    data_ptrs = (char**)malloc(num_primary_structures * sizeof(char*));
+    coding_ptrs = (char**)malloc(num_backup_structures * sizeof(char*));
+    erasures = (int*)malloc((num_backup_structures + 1) * sizeof(int));
 
-    // Read data list...
     for (i = 0; i < num_primary_structures; i++) {
-        PyObject* next = PyIter_Next(dataIter);
+        data_ptrs[i] = (char*)&recovered[i];
+    }
+    for (i = 0; i < num_backup_structures; i++) {
+        coding_ptrs[i] = (char*)malloc(sizeof(long));
+        memcpy(coding_ptrs[i], &codes.values[i], sizeof(long));
+    }
+    for (i = 0; i < num_backup_structures + 1; i++) {
+        erasures[i] = (int)erasures_long.values[i];
+    }
 
-        if (!next) {
-            printf("len(data) < num_primary_structures in recover\n");
-            return NULL;
+    // Calculate RS matrix and decode...
+    matrix = reed_sol_vandermonde_coding_matrix(num_primary_structures, num_backup_structures, w);
+    jerasure_matrix_decode(num_primary_structures, num_backup_structures, w, matrix, 1, erasures, data_ptrs, coding_ptrs, sizeof(long));
+
+    if (has_out) {
+        Py_INCREF(Py_None);
+        result = Py_None;
+    } else {
+        result = build_long_list(recovered, num_primary_structures);
+    }
+
+done:
+    if (coding_ptrs) {
+        for (i = 0; i < num_backup_structures; i++) {
+            free(coding_ptrs[i]);
         }
-        if (!PyLong_Check(next)) {
-            printf("encountered non-integer data list member in recover\n");
-            return NULL;
+    }
+    if (has_out) {
+        PyBuffer_Release(&out);
+    } else {
+        free(recovered);
+    }
+    free(data_ptrs);
+    free(coding_ptrs);
+    free(erasures);
+    free(matrix);
+    release_long_values(&data);
+    release_long_values(&codes);
+    release_long_values(&erasures_long);
+
+    return result;
+}
+
+PyObject* calculate_decoding_matrix(PyObject* self, PyObject* args)
+{
+    int num_primary_structures, num_backup_structures, w, i, scheme = VANDERMONDE;
+
+    PyObject* erasuresRaw = NULL;
+    PyObject* decodingMatrixOut = NULL;
+    PyObject* dmIdsOut = NULL;
+    PyObject* result = NULL;
+
+    long_values erasures_long;
+    int *matrix = NULL, *erasures = NULL, *erased = NULL, *decoding_matrix = NULL, *dm_ids = NULL;
+
+    if (!PyArg_ParseTuple(args, "iiiO|OOi", &num_primary_structures, &num_backup_structures, &w, &erasuresRaw,
+            &decodingMatrixOut, &dmIdsOut, &scheme)) {
+        printf("could not parse all arguments in calculate_decoding_matrix\n");
+        return NULL;
+    }
+
+    if (!check_word_size(w) || !check_matrix_size(num_primary_structures, num_backup_structures, w)) {
+        return NULL;
+    }
+    if ((decodingMatrixOut && decodingMatrixOut != Py_None) != (dmIdsOut && dmIdsOut != Py_None)) {
+        PyErr_SetString(PyExc_TypeError, "decoding_matrix and dm_ids outputs must be supplied together");
+        return NULL;
+    }
+
+    // Read erasures list or buffer and terminate it with -1, as required by jerasure...
+    if (!get_long_values(erasuresRaw, &erasures_long, "erasures")) {
+        goto done;
+    }
+
+    erasures = (int*)malloc((erasures_long.length + 1) * sizeof(int));
+    for (i = 0; i < erasures_long.length; i++) {
+        if (erasures_long.values[i] < 0 || erasures_long.values[i] >= num_primary_structures + num_backup_structures) {
+            PyErr_SetString(PyExc_ValueError, "erasure out of range in calculate_decoding_matrix");
+            goto done;
         }
+        erasures[i] = (int)erasures_long.values[i];
+    }
+    erasures[erasures_long.length] = -1;
 
-        long value = PyLong_AsLong(next);
+    erased = jerasure_erasures_to_erased(num_primary_structures, num_backup_structures, erasures);
+    if (!erased) {
+        PyErr_SetString(PyExc_ValueError, "too many erasures to decode in calculate_decoding_matrix");
+        goto done;
+    }
 
-        // Cast value into a long char*, as required by jerasure
-        data[i] = (char*)malloc(sizeof(long) * sizeof(char));
-        memcpy(data[i], &value, sizeof(long));
+    // Invert the rows of the distribution matrix belonging to the first k surviving devices...
+    matrix = coding_matrix(scheme, num_primary_structures, num_backup_structures, w);
+    if (!matrix) {
+        goto done;
     }
+    decoding_matrix = (int*)malloc(num_primary_structures * num_primary_structures * sizeof(int));
+    dm_ids = (int*)malloc(num_primary_structures * sizeof(int));
 
-    // Read codes list...
-    for (i = 0; i < num_backup_structures; i++) {
-        PyObject* next = PyIter_Next(codesIter);
+    if (jerasure_make_decoding_matrix(
+            num_primary_structures, num_backup_structures, w, matrix, erased, decoding_matrix, dm_ids) < 0) {
+        PyErr_SetString(PyExc_ValueError, "could not invert decoding matrix in calculate_decoding_matrix");
+        goto done;
+    }
 
-        if (!next) {
-            printf("len(codes) < num_backup_structures in recover\n");
-            return NULL;
+    // Write (decoding matrix, ids of the devices each of its columns reads from) into the outputs, or return them...
+    if (decodingMatrixOut && decodingMatrixOut != Py_None) {
+        PyObject* written = return_ints(
+            decoding_matrix, num_primary_structures * num_primary_structures, decodingMatrixOut, "decoding_matrix");
+
+        if (written) {
+            Py_DECREF(written);
+            result = return_ints(dm_ids, num_primary_structures, dmIdsOut, "dm_ids");
         }
-        if (!PyLong_Check(next)) {
-            printf("encountered non-integer codes list member in recover\n");
-            return NULL;
+    } else {
+        PyObject* decodingMatrixList = return_ints(decoding_matrix, num_primary_structures * num_primary_structures, NULL, NULL);
+        PyObject* dmIdsList = return_ints(dm_ids, num_primary_structures, NULL, NULL);
+
+        if (decodingMatrixList && dmIdsList) {
+            result = Py_BuildValue("(NN)", decodingMatrixList, dmIdsList);
+        } else {
+            Py_XDECREF(decodingMatrixList);
+            Py_XDECREF(dmIdsList);
         }
+    }
 
-        long value = PyLong_AsLong(next);
+done:
+    release_long_values(&erasures_long);
+    free(erasures);
+    free(erased);
+    free(matrix);
+    free(decoding_matrix);
+    free(dm_ids);
 
-        // Cast value into a long char*, as required by jerasure
-        codes[i] = (char*)malloc(sizeof(long) * sizeof(char));
-        memcpy(codes[i], &value, sizeof(long));
+    return result;
+}
+
+PyObject* decode_data(PyObject* self, PyObject* args)
+{
+    int num_primary_structures, num_backup_structures, w, device, j, e;
+    int *decoding_rows_raw, *dm_ids_raw, *erased_ids_raw;
+    Py_ssize_t s, num_stripes, num_erased;
+
+    Py_buffer decoding_rows, dm_ids, erased_ids, out;
+    PyObject* codesRaw = NULL;
+    PyObject* dataRaw = NULL;
+    PyObject* dataOut = NULL;
+    PyObject* result = NULL;
+
+    long_values codes, data;
+    long* recovered = NULL;
+    int has_out = 0;
+
+    if (!PyArg_ParseTuple(args, "iiiy*y*y*OO|O", &num_primary_structures, &num_backup_structures, &w, &decoding_rows,
+            &dm_ids, &erased_ids, &codesRaw, &dataRaw, &dataOut)) {
+        printf("could not parse all arguments in decode_data\n");
+        return NULL;
     }
 
-    // Read erasures list...
-    for (i = 0; i < num_backup_structures + 1; i++) {
-        PyObject* next = PyIter_Next(erasuresIter);
+    memset(&codes, 0, sizeof(long_values));
+    memset(&data, 0, sizeof(long_values));
+    num_erased = erased_ids.len / sizeof(int);
 
-        if (!next) {
-            printf("len(erasures) < num_backup_structures + 1 in recover\n");
-            return NULL;
+    if (!check_word_size(w)) {
+        goto done;
+    }
+    if (decoding_rows.len != (Py_ssize_t)(num_erased * num_primary_structures * sizeof(int))
+        || dm_ids.len != (Py_ssize_t)(num_primary_structures * sizeof(int))) {
+        PyErr_SetString(PyExc_ValueError, "decoding matrix does not match the number of erasures in decode_data");
+        goto done;
+    }
+
+    // Read every stripe of codes and data in one pass, borrowing buffers of longs rather than copying them...
+    if (!get_long_values(codesRaw, &codes, "codes") || !get_long_values(dataRaw, &data, "data")) {
+        goto done;
+    }
+    if (num_backup_structures <= 0 || codes.length % num_backup_structures != 0) {
+        PyErr_SetString(PyExc_ValueError, "len(codes) must be a multiple of num_backup_structures in decode_data");
+        goto done;
+    }
+
+    num_stripes = codes.length / num_backup_structures;
+
+    if (data.length != num_stripes * num_primary_structures) {
+        PyErr_Format(PyExc_ValueError, "data must hold %zd integers", num_stripes * num_primary_structures);
+        goto done;
+    }
+
+    decoding_rows_raw = (int*)decoding_rows.buf;
+    dm_ids_raw = (int*)dm_ids.buf;
+    erased_ids_raw = (int*)erased_ids.buf;
+
+    if (!check_decoding_ids(dm_ids_raw, erased_ids_raw, num_erased, num_primary_structures, num_backup_structures,
+            "decode_data")) {
+        goto done;
+    }
+
+    // Decode straight into the output buffer when one is supplied, otherwise into a copy of the data...
+    if (dataOut && dataOut != Py_None) {
+        if (!get_output_buffer(dataOut, &out, data.length, sizeof(long), "out")) {
+            goto done;
         }
-        if (!PyLong_Check(next)) {
-            printf("encountered non-integer erasures list member in recover\n");
-            return NULL;
+
+        has_out = 1;
+        recovered = (long*)out.buf;
+    } else {
+        recovered = (long*)malloc((data.length + 1) * sizeof(long));
+        if (!recovered) {
+            PyErr_NoMemory();
+            goto done;
         }
+    }
+    memmove(recovered, data.values, data.length * sizeof(long));
+
+    // Rebuild each erased data device as the dot product of its decoding row with the surviving devices
+    for (s = 0; s < num_stripes; s++) {
+        long* stripe_data = recovered + s * num_primary_structures;
+        long* stripe_codes = codes.values + s * num_backup_structures;
+
+        for (e = 0; e < num_erased; e++) {
+            long value = 0;
 
-        int value = PyLong_AsLong(next);
-        erasures[i] = value;
+            for (j = 0; j < num_primary_structures; j++) {
+                device = dm_ids_raw[j];
+                update_code(w, decoding_rows_raw[e * num_primary_structures + j],
+                    device < num_primary_structures ? stripe_data[device] : stripe_codes[device - num_primary_structures],
+                    &value);
+            }
+
+            stripe_data[erased_ids_raw[e]] = value;
+        }
     }
 
-    // Calculate RS matrix and decode...
-    int* matrix = reed_sol_vandermonde_coding_matrix(num_primary_structures, num_backup_structures, w);
-    jerasure_matrix_decode(num_primary_structures, num_backup_structures, w, matrix, 1, erasures, data, codes, sizeof(long));
+    if (has_out) {
+        Py_INCREF(Py_None);
+        result = Py_None;
+    } else {
+        result = build_long_list(recovered, data.length);
+    }
+
+done:
+    if (has_out) {
+        PyBuffer_Release(&out);
+    } else {
+        free(recovered);
+    }
+    release_long_values(&codes);
+    release_long_values(&data);
+    PyBuffer_Release(&decoding_rows);
+    PyBuffer_Release(&dm_ids);
+    PyBuffer_Release(&erased_ids);
+
+    return result;
+}
+
+PyObject* decode_columns(PyObject* self, PyObject* args)
+{
+    int num_primary_structures, num_backup_structures, w, device, j, e;
+    int *decoding_rows_raw, *dm_ids_raw, *erased_ids_raw;
+    char *column, *destination;
+    Py_ssize_t num_stripes, num_erased, column_size;
+
+    Py_buffer decoding_rows, dm_ids, erased_ids, codes, data;
+    PyObject* result = NULL;
+
+    if (!PyArg_ParseTuple(args, "iiiy*y*y*y*w*", &num_primary_structures, &num_backup_structures, &w, &decoding_rows,
+            &dm_ids, &erased_ids, &codes, &data)) {
+        printf("could not parse all arguments in decode_columns\n");
+        return NULL;
+    }
+
+    num_erased = erased_ids.len / sizeof(int);
+
+    if (!check_word_size(w)) {
+        goto done;
+    }
+    if (decoding_rows.len != (Py_ssize_t)(num_erased * num_primary_structures * sizeof(int))
+        || dm_ids.len != (Py_ssize_t)(num_primary_structures * sizeof(int))) {
+        PyErr_SetString(PyExc_ValueError, "decoding matrix does not match the number of erasures in decode_columns");
+        goto done;
+    }
+    if (num_primary_structures <= 0 || data.len % (num_primary_structures * sizeof(long)) != 0) {
+        PyErr_SetString(PyExc_ValueError, "data must hold one column of longs per primary in decode_columns");
+        goto done;
+    }
+
+    num_stripes = data.len / (num_primary_structures * sizeof(long));
+    column_size = num_stripes * sizeof(long);
+
+    if (codes.len != num_backup_structures * column_size) {
+        PyErr_SetString(PyExc_ValueError, "codes must hold one column of longs per backup in decode_columns");
+        goto done;
+    }
+
+    decoding_rows_raw = (int*)decoding_rows.buf;
+    dm_ids_raw = (int*)dm_ids.buf;
+    erased_ids_raw = (int*)erased_ids.buf;
+
+    if (!check_decoding_ids(dm_ids_raw, erased_ids_raw, num_erased, num_primary_structures, num_backup_structures,
+            "decode_columns")) {
+        goto done;
+    }
+
+    // Rebuild each erased column as the dot product of its decoding row with the surviving columns, one region at a time
+    for (e = 0; e < num_erased; e++) {
+        destination = (char*)data.buf + erased_ids_raw[e] * column_size;
+        memset(destination, 0, column_size);
+
+        for (j = 0; j < num_primary_structures; j++) {
+            device = dm_ids_raw[j];
+            column = device < num_primary_structures ? (char*)data.buf + device * column_size
+                                                     : (char*)codes.buf + (device - num_primary_structures) * column_size;
+
+            update_region(w, decoding_rows_raw[e * num_primary_structures + j], column, destination, column_size);
+        }
+    }
+
+    Py_INCREF(Py_None);
+    result = Py_None;
 
-    // Build list of recovered data...
-    PyObject* recoveredList = PyList_New(num_primary_structures);
+done:
+    PyBuffer_Release(&decoding_rows);
+    PyBuffer_Release(&dm_ids);
+    PyBuffer_Release(&erased_ids);
+    PyBuffer_Release(&codes);
+    PyBuffer_Release(&data);
+
+    return result;
+}
+
+PyObject* encode_columns(PyObject* self, PyObject* args)
+{
+    int num_primary_structures, num_backup_structures, w, i, j;
+    int* matrix_raw;
+    char* destination;
+    Py_ssize_t column_size;
+
+    Py_buffer matrix, data, codes;
+    PyObject* result = NULL;
+
+    if (!PyArg_ParseTuple(args, "iiiy*y*w*", &num_primary_structures, &num_backup_structures, &w, &matrix, &data, &codes)) {
+        printf("could not parse all arguments in encode_columns\n");
+        return NULL;
+    }
+
+    if (!check_word_size(w)) {
+        goto done;
+    }
+    if (matrix.len != (Py_ssize_t)(num_primary_structures * num_backup_structures * sizeof(int))) {
+        PyErr_SetString(PyExc_ValueError, "matrix must hold num_primary_structures * num_backup_structures ints");
+        goto done;
+    }
+    if (num_primary_structures <= 0 || data.len % (num_primary_structures * sizeof(long)) != 0) {
+        PyErr_SetString(PyExc_ValueError, "data must hold one column of longs per primary in encode_columns");
+        goto done;
+    }
+
+    column_size = data.len / num_primary_structures;
+
+    if (codes.len != num_backup_structures * column_size) {
+        PyErr_SetString(PyExc_ValueError, "codes must hold one column of longs per backup in encode_columns");
+        goto done;
+    }
+
+    matrix_raw = (int*)matrix.buf;
+
+    // Each code column is the dot product of its matrix row with every data column
+    for (i = 0; i < num_backup_structures; i++) {
+        destination = (char*)codes.buf + i * column_size;
+        memset(destination, 0, column_size);
+
+        for (j = 0; j < num_primary_structures; j++) {
+            update_region(w, matrix_raw[i * num_primary_structures + j], (char*)data.buf + j * column_size, destination,
+                column_size);
+        }
+    }
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+done:
+    PyBuffer_Release(&matrix);
+    PyBuffer_Release(&data);
+    PyBuffer_Release(&codes);
+
+    return result;
+}
+
+PyObject* calculate_coding_matrix(PyObject* self, PyObject* args)
+{
+    int scheme, num_primary_structures, num_backup_structures, w;
+
+    PyObject* matrixOut = NULL;
+
+    if (!PyArg_ParseTuple(args, "iiii|O", &scheme, &num_primary_structures, &num_backup_structures, &w, &matrixOut)) {
+        printf("could not parse all arguments in calculate_coding_matrix\n");
+        return NULL;
+    }
+
+    int* matrixRaw = coding_matrix(scheme, num_primary_structures, num_backup_structures, w);
+    if (!matrixRaw) {
+        return NULL;
+    }
+
+    PyObject* result = return_ints(matrixRaw, num_primary_structures * num_backup_structures, matrixOut, "matrix");
+
+    free(matrixRaw);
+
+    return result;
+}
+
+PyObject* calculate_bitmatrix_codes(PyObject* self, PyObject* args)
+{
+    int num_primary_structures, num_backup_structures, w, code_index, j, x, l;
+    int *matrix_row, *positions_raw;
+    unsigned long* spreads = NULL;
+    unsigned char* diff;
+    long *codes_raw, *old_values_raw, *new_values_raw, difference;
+    Py_ssize_t i, num_updates;
+
+    Py_buffer matrix, codes, old_values, new_values, positions;
+
+    if (!PyArg_ParseTuple(args, "iiiy*w*iy*y*y*", &num_primary_structures, &num_backup_structures, &w, &matrix, &codes,
+            &code_index, &old_values, &new_values, &positions)) {
+        printf("could not parse all arguments in calculate_bitmatrix_codes\n");
+        return NULL;
+    }
+
+    PyObject* result = NULL;
+    num_updates = codes.len / sizeof(long);
+
+    if (!check_bitmatrix_word_size(w)) {
+        goto done;
+    }
+    if (code_index < 0 || code_index >= num_backup_structures) {
+        PyErr_SetString(PyExc_ValueError, "code_index out of range in calculate_bitmatrix_codes");
+        goto done;
+    }
+    if (matrix.len != (Py_ssize_t)(num_primary_structures * num_backup_structures * sizeof(int))) {
+        PyErr_SetString(PyExc_ValueError, "matrix must hold num_primary_structures * num_backup_structures ints");
+        goto done;
+    }
+    if (codes.len % sizeof(long) != 0 || old_values.len != codes.len || new_values.len != codes.len
+        || positions.len != (Py_ssize_t)(num_updates * sizeof(int))) {
+        PyErr_SetString(PyExc_ValueError, "codes, old_values, new_values and positions must describe the same number of updates");
+        goto done;
+    }
+
+    matrix_row = (int*)matrix.buf + code_index * num_primary_structures;
+    codes_raw = (long*)codes.buf;
+    old_values_raw = (long*)old_values.buf;
+    new_values_raw = (long*)new_values.buf;
+    positions_raw = (int*)positions.buf;
+
+    for (i = 0; i < num_updates; i++) {
+        if (positions_raw[i] < 0 || positions_raw[i] >= num_primary_structures) {
+            PyErr_SetString(PyExc_ValueError, "position out of range in calculate_bitmatrix_codes");
+            goto done;
+        }
+    }
+
+    // Column x of the bitmatrix of each element, spread into a long with a one in byte l wherever packet x is XORed
+    // into packet l - multiplying it by a byte of difference then copies that byte into every such packet
+    spreads = (unsigned long*)calloc(num_primary_structures * BITMATRIX_W, sizeof(unsigned long));
+    for (j = 0; j < num_primary_structures; j++) {
+        int element = matrix_row[j];
+
+        for (x = 0; x < BITMATRIX_W; x++) {
+            for (l = 0; l < BITMATRIX_W; l++) {
+                if (element & (1 << l)) {
+                    spreads[j * BITMATRIX_W + x] |= 1UL << (l * 8);
+                }
+            }
+            element = galois_single_multiply(element, 2, BITMATRIX_W);
+        }
+    }
+
+    // Apply each update to its code in place with XORs alone: c_i' = c_i + B_i_j * (d_j' - d_j)
+    for (i = 0; i < num_updates; i++) {
+        difference = old_values_raw[i] ^ new_values_raw[i];
+        diff = (unsigned char*)&difference;
+
+        for (x = 0; x < BITMATRIX_W; x++) {
+            if (diff[x]) {
+                codes_raw[i] ^= (long)(spreads[positions_raw[i] * BITMATRIX_W + x] * diff[x]);
+            }
+        }
+    }
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+done:
+    free(spreads);
+    PyBuffer_Release(&matrix);
+    PyBuffer_Release(&codes);
+    PyBuffer_Release(&old_values);
+    PyBuffer_Release(&new_values);
+    PyBuffer_Release(&positions);
+
+    return result;
+}
+
+PyObject* encode_bitmatrix_columns(PyObject* self, PyObject* args)
+{
+    int num_primary_structures, num_backup_structures, w, i;
+    Py_ssize_t num_stripes, column_size;
+    unsigned char **inputs = NULL, **outputs = NULL;
+
+    Py_buffer matrix, data, codes;
+    PyObject* result = NULL;
+
+    if (!PyArg_ParseTuple(args, "iiiy*y*w*", &num_primary_structures, &num_backup_structures, &w, &matrix, &data, &codes)) {
+        printf("could not parse all arguments in encode_bitmatrix_columns\n");
+        return NULL;
+    }
+
+    if (!check_bitmatrix_word_size(w)) {
+        goto done;
+    }
+    if (matrix.len != (Py_ssize_t)(num_primary_structures * num_backup_structures * sizeof(int))) {
+        PyErr_SetString(PyExc_ValueError, "matrix must hold num_primary_structures * num_backup_structures ints");
+        goto done;
+    }
+    if (num_primary_structures <= 0 || data.len % (num_primary_structures * sizeof(long)) != 0) {
+        PyErr_SetString(PyExc_ValueError, "data must hold one column of longs per primary in encode_bitmatrix_columns");
+        goto done;
+    }
+
+    column_size = data.len / num_primary_structures;
+    num_stripes = column_size / sizeof(long);
+
+    if (codes.len != num_backup_structures * column_size) {
+        PyErr_SetString(PyExc_ValueError, "codes must hold one column of longs per backup in encode_bitmatrix_columns");
+        goto done;
+    }
+
+    inputs = (unsigned char**)malloc(num_primary_structures * sizeof(unsigned char*));
+    outputs = (unsigned char**)malloc(num_backup_structures * sizeof(unsigned char*));
     for (i = 0; i < num_primary_structures; i++) {
-        PyObject* value = PyLong_FromLong(*(long*)data[i]);
-        PyList_SetItem(recoveredList, i, value);
+        inputs[i] = (unsigned char*)data.buf + i * column_size;
+    }
+    for (i = 0; i < num_backup_structures; i++) {
+        outputs[i] = (unsigned char*)codes.buf + i * column_size;
+    }
+
+    schedule_columns(num_primary_structures, num_backup_structures, (int*)matrix.buf, inputs, outputs, num_stripes);
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+done:
+    free(inputs);
+    free(outputs);
+    PyBuffer_Release(&matrix);
+    PyBuffer_Release(&data);
+    PyBuffer_Release(&codes);
+
+    return result;
+}
+
+PyObject* decode_bitmatrix_columns(PyObject* self, PyObject* args)
+{
+    int num_primary_structures, num_backup_structures, w, device, j, e;
+    int *dm_ids_raw, *erased_ids_raw;
+    Py_ssize_t num_stripes, num_erased, column_size;
+    unsigned char **inputs = NULL, **outputs = NULL;
+
+    Py_buffer decoding_rows, dm_ids, erased_ids, codes, data;
+    PyObject* result = NULL;
+
+    if (!PyArg_ParseTuple(args, "iiiy*y*y*y*w*", &num_primary_structures, &num_backup_structures, &w, &decoding_rows,
+            &dm_ids, &erased_ids, &codes, &data)) {
+        printf("could not parse all arguments in decode_bitmatrix_columns\n");
+        return NULL;
+    }
+
+    num_erased = erased_ids.len / sizeof(int);
+
+    if (!check_bitmatrix_word_size(w)) {
+        goto done;
+    }
+    if (decoding_rows.len != (Py_ssize_t)(num_erased * num_primary_structures * sizeof(int))
+        || dm_ids.len != (Py_ssize_t)(num_primary_structures * sizeof(int))) {
+        PyErr_SetString(PyExc_ValueError, "decoding matrix does not match the number of erasures in decode_bitmatrix_columns");
+        goto done;
     }
+    if (num_primary_structures <= 0 || data.len % (num_primary_structures * sizeof(long)) != 0) {
+        PyErr_SetString(PyExc_ValueError, "data must hold one column of longs per primary in decode_bitmatrix_columns");
+        goto done;
+    }
+
+    column_size = data.len / num_primary_structures;
+    num_stripes = column_size / sizeof(long);
+
+    if (codes.len != num_backup_structures * column_size) {
+        PyErr_SetString(PyExc_ValueError, "codes must hold one column of longs per backup in decode_bitmatrix_columns");
+        goto done;
+    }
+    if (num_erased == 0) {
+        Py_INCREF(Py_None);
+        result = Py_None;
+        goto done;
+    }
+
+    dm_ids_raw = (int*)dm_ids.buf;
+    erased_ids_raw = (int*)erased_ids.buf;
+
+    if (!check_decoding_ids(dm_ids_raw, erased_ids_raw, num_erased, num_primary_structures, num_backup_structures,
+            "decode_bitmatrix_columns")) {
+        goto done;
+    }
+
+    // Inputs are the surviving columns the decoding rows read from, outputs are the erased columns
+    inputs = (unsigned char**)malloc(num_primary_structures * sizeof(unsigned char*));
+    outputs = (unsigned char**)malloc(num_erased * sizeof(unsigned char*));
+    for (j = 0; j < num_primary_structures; j++) {
+        device = dm_ids_raw[j];
+        inputs[j] = device < num_primary_structures ? (unsigned char*)data.buf + device * column_size
+                                                    : (unsigned char*)codes.buf + (device - num_primary_structures) * column_size;
+    }
+    for (e = 0; e < num_erased; e++) {
+        outputs[e] = (unsigned char*)data.buf + erased_ids_raw[e] * column_size;
+    }
+
+    schedule_columns(num_primary_structures, num_erased, (int*)decoding_rows.buf, inputs, outputs, num_stripes);
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+done:
+    free(inputs);
+    free(outputs);
+    PyBuffer_Release(&decoding_rows);
+    PyBuffer_Release(&dm_ids);
+    PyBuffer_Release(&erased_ids);
+    PyBuffer_Release(&codes);
+    PyBuffer_Release(&data);
 
-    return recoveredList;
+    return result;
 }
@@ -5,6 +5,15 @@
 
 PyObject* recover_data(PyObject*, PyObject*);
 PyObject* calculate_rs_code(PyObject*, PyObject*);
+PyObject* calculate_rs_codes(PyObject*, PyObject*);
 PyObject* calculate_rs_matrix(PyObject*, PyObject*);
+PyObject* calculate_decoding_matrix(PyObject*, PyObject*);
+PyObject* decode_data(PyObject*, PyObject*);
+PyObject* decode_columns(PyObject*, PyObject*);
+PyObject* encode_columns(PyObject*, PyObject*);
+PyObject* calculate_coding_matrix(PyObject*, PyObject*);
+PyObject* calculate_bitmatrix_codes(PyObject*, PyObject*);
+PyObject* encode_bitmatrix_columns(PyObject*, PyObject*);
+PyObject* decode_bitmatrix_columns(PyObject*, PyObject*);
 
 #endif
\ No newline at end of file
@@ -1,5 +1,6 @@
 import python_jerasure
 import unittest
+from array import array
 
 
 class TestJerasureMethods(unittest.TestCase):
@@ -13,6 +14,17 @@ class TestJerasureMethods(unittest.TestCase):
         self.assertEqual(matrix, [1, 1, 1, 1, 24578, 40964, 1,
                          34820, 48562, 1, 48563, 34821, 1, 61447, 61446])
 
+        # Test writing the matrix into a caller-supplied buffer
+        out = array('i', [0] * 9)
+        self.assertIsNone(python_jerasure.calculate_rs_matrix(3, 3, 16, out))
+        self.assertEqual(list(out), python_jerasure.calculate_rs_matrix(3, 3, 16))
+
+    def test_calculate_rs_matrix_w08(self):
+        # Test the largest cluster GF(2^8) can encode, whose first row is all ones
+        matrix = python_jerasure.calculate_rs_matrix(200, 56, 8)
+        self.assertEqual(len(matrix), 200 * 56)
+        self.assertEqual(matrix[:200], [1] * 200)
+
     def test_calculate_rs_matrix_invalid(self):
         # Test invalid number of arguments
         self.assertRaises(TypeError, python_jerasure.calculate_rs_matrix, 0)
@@ -20,6 +32,14 @@ class TestJerasureMethods(unittest.TestCase):
         # Test invalid argument types
         self.assertRaises(TypeError, python_jerasure.calculate_rs_matrix, 'a', 'b', 'c')
 
+        # Test more devices than distinct elements of GF(2^8)
+        self.assertRaises(ValueError, python_jerasure.calculate_rs_matrix, 200, 57, 8)
+
+        # Test output buffers of the wrong size, type or mutability
+        self.assertRaises(ValueError, python_jerasure.calculate_rs_matrix, 3, 3, 16, array('i', [0] * 8))
+        self.assertRaises(TypeError, python_jerasure.calculate_rs_matrix, 3, 3, 16, array('d', [0] * 9))
+        self.assertRaises(TypeError, python_jerasure.calculate_rs_matrix, 3, 3, 16, bytes(36))
+
     def test_calculate_rs_code_valid(self):
         # Test calculation of code "111"
         code = python_jerasure.calculate_rs_code(3, 3, 16, 41169, 1, 222, 0, 1, 24578)
@@ -36,6 +56,62 @@ class TestJerasureMethods(unittest.TestCase):
         # Test invalid argument types
         self.assertRaises(TypeError, python_jerasure.calculate_rs_code, 'a', 'b', 'c', 'e', 'f', 'g', 'h', 'i', 'j')
 
+    def test_calculate_rs_codes_valid(self):
+        matrix = array('i', python_jerasure.calculate_rs_matrix(3, 3, 16))
+
+        # Test calculation of codes "111" and "333" in a single call
+        codes = array('l', [41169, 0])
+        python_jerasure.calculate_rs_codes(
+            3, 3, 16, matrix, codes, 1, array('l', [222, 0]), array('l', [0, 333]), array('i', [1, 0]))
+        self.assertEqual(list(codes), [111, 333])
+
+        # Test batch matches the single code calculation for every source position
+        codes = array('l', [0, 0, 0])
+        python_jerasure.calculate_rs_codes(
+            3, 3, 16, matrix, codes, 2, array('l', [0, 0, 0]), array('l', [123, 456, 789]), array('i', [0, 1, 2]))
+        expected = [python_jerasure.calculate_rs_code(3, 3, 16, 0, 2, 0, value, position, matrix[6 + position])
+                    for value, position in [(123, 0), (456, 1), (789, 2)]]
+        self.assertEqual(list(codes), expected)
+
+    def test_calculate_rs_codes_parity(self):
+        # Test the all-ones first row of the matrix encodes plain XOR parity
+        matrix = array('i', python_jerasure.calculate_rs_matrix(3, 3, 16))
+        self.assertEqual(list(matrix[:3]), [1, 1, 1])
+
+        codes = array('l', [0x12345678])
+        python_jerasure.calculate_rs_codes(
+            3, 3, 16, matrix, codes, 0, array('l', [0x0f0f0f0f]), array('l', [0x7fff0001]), array('i', [2]))
+        self.assertEqual(list(codes), [0x12345678 ^ 0x0f0f0f0f ^ 0x7fff0001])
+
+    def test_calculate_rs_codes_w08(self):
+        # Test every byte of each long is encoded independently, matching single byte codes
+        matrix = array('i', python_jerasure.calculate_rs_matrix(3, 3, 8))
+        codes = array('l', [0, 0])
+        python_jerasure.calculate_rs_codes(
+            3, 3, 8, matrix, codes, 1, array('l', [0, 0]), array('l', [0x0102, 0x0300]), array('i', [1, 1]))
+
+        low = python_jerasure.calculate_rs_code(3, 3, 8, 0, 1, 0, 0x02, 1, matrix[4])
+        high = python_jerasure.calculate_rs_code(3, 3, 8, 0, 1, 0, 0x01, 1, matrix[4])
+        top = python_jerasure.calculate_rs_code(3, 3, 8, 0, 1, 0, 0x03, 1, matrix[4])
+        self.assertEqual(list(codes), [low | (high << 8), top << 8])
+
+    def test_calculate_rs_codes_invalid(self):
+        matrix = array('i', python_jerasure.calculate_rs_matrix(3, 3, 16))
+
+        # Test read-only codes buffer
+        self.assertRaises(TypeError, python_jerasure.calculate_rs_codes,
+                          3, 3, 16, matrix, bytes(8), 1, array('l', [0]), array('l', [1]), array('i', [0]))
+
+        # Test mismatched buffer lengths
+        self.assertRaises(ValueError, python_jerasure.calculate_rs_codes,
+                          3, 3, 16, matrix, array('l', [0, 0]), 1, array('l', [0]), array('l', [1]), array('i', [0]))
+
+        # Test out of range code index and source position
+        self.assertRaises(ValueError, python_jerasure.calculate_rs_codes,
+                          3, 3, 16, matrix, array('l', [0]), 3, array('l', [0]), array('l', [1]), array('i', [0]))
+        self.assertRaises(ValueError, python_jerasure.calculate_rs_codes,
+                          3, 3, 16, matrix, array('l', [0]), 1, array('l', [0]), array('l', [1]), array('i', [3]))
+
     def test_recover_data_valid(self):
         # Test recovery of sequence [789, 0, 0]
         codes = [789, 789, 789]
@@ -52,6 +128,236 @@ class TestJerasureMethods(unittest.TestCase):
         # Test invalid argument types
         self.assertRaises(TypeError, python_jerasure.recover_data, 'a', 'b', 'c', 'e', 'f', 'g')
 
+        # Test too few codes, and a buffer of non-integers
+        self.assertRaises(ValueError, python_jerasure.recover_data, 3, 3, 16, [789, 789], [0, 0, 0], [0, 1, 2, -1])
+        self.assertRaises(TypeError, python_jerasure.recover_data,
+                          3, 3, 16, array('d', [789, 789, 789]), [0, 0, 0], [0, 1, 2, -1])
+
+    def test_recover_data_buffers(self):
+        # Test buffers of any integer type decode exactly as lists do, into a caller-supplied buffer
+        expected = python_jerasure.recover_data(3, 3, 16, [678, 41143, 61441], [0, 456, 0], [0, 2, -1, -1])
+        out = array('q', [0, 0, 0])
+
+        result = python_jerasure.recover_data(
+            3, 3, 16, memoryview(array('q', [678, 41143, 61441])), bytearray(array('l', [0, 456, 0])),
+            array('i', [0, 2, -1, -1]), out)
+        self.assertIsNone(result)
+        self.assertEqual(list(out), expected)
+
+    def test_calculate_decoding_matrix_valid(self):
+        # Test decoding all three primaries from three backups
+        decoding_matrix, dm_ids = python_jerasure.calculate_decoding_matrix(3, 3, 16, [0, 1, 2])
+        self.assertEqual(decoding_matrix, [48563, 48564, 6, 55005, 55000, 5, 27503, 27500, 3])
+        self.assertEqual(dm_ids, [3, 4, 5])
+
+        # Test erasures from a buffer, written into caller-supplied buffers
+        decoding_matrix_out, dm_ids_out = array('i', [0] * 9), array('i', [0] * 3)
+        result = python_jerasure.calculate_decoding_matrix(
+            3, 3, 16, array('h', [0, 1, 2]), decoding_matrix_out, dm_ids_out)
+        self.assertIsNone(result)
+        self.assertEqual(list(decoding_matrix_out), decoding_matrix)
+        self.assertEqual(list(dm_ids_out), dm_ids)
+
+    def test_calculate_decoding_matrix_invalid(self):
+        # Test invalid argument types
+        self.assertRaises(TypeError, python_jerasure.calculate_decoding_matrix, 'a', 'b', 'c', 'd')
+
+        # Test more erasures than backups
+        self.assertRaises(ValueError, python_jerasure.calculate_decoding_matrix, 3, 3, 16, [0, 1, 2, 3])
+
+        # Test only one output buffer supplied
+        self.assertRaises(TypeError, python_jerasure.calculate_decoding_matrix,
+                          3, 3, 16, [0, 1, 2], array('i', [0] * 9))
+
+    def test_decode_data_valid(self):
+        # Test recovery of two stripes of sequence [123, 456, 789] from their codes
+        decoding_matrix, dm_ids = python_jerasure.calculate_decoding_matrix(3, 3, 16, [0, 1, 2])
+        restored = python_jerasure.decode_data(
+            3, 3, 16, array('i', decoding_matrix), array('i', dm_ids), array('i', [0, 1, 2]),
+            [678, 41143, 61441, 678, 41143, 61441], [0, 0, 0, 0, 0, 0])
+        self.assertEqual(restored, [123, 456, 789, 123, 456, 789])
+
+        # Test recovery of a single erased primary
+        decoding_matrix, dm_ids = python_jerasure.calculate_decoding_matrix(3, 3, 16, [1])
+        restored = python_jerasure.decode_data(
+            3, 3, 16, array('i', decoding_matrix[3:6]), array('i', dm_ids), array('i', [1]),
+            [678, 41143, 61441], [123, 0, 789])
+        self.assertEqual(restored, [123, 456, 789])
+
+        # Test recovery in place, reading codes and data from buffers
+        data = array('l', [123, 0, 789, 123, 0, 789])
+        result = python_jerasure.decode_data(
+            3, 3, 16, array('i', decoding_matrix[3:6]), array('i', dm_ids), array('i', [1]),
+            array('q', [678, 41143, 61441, 678, 41143, 61441]), data, data)
+        self.assertIsNone(result)
+        self.assertEqual(list(data), [123, 456, 789, 123, 456, 789])
+
+    def test_decode_data_invalid(self):
+        decoding_matrix, dm_ids = python_jerasure.calculate_decoding_matrix(3, 3, 16, [1])
+
+        # Test data not matching the number of stripes of codes
+        self.assertRaises(ValueError, python_jerasure.decode_data,
+                          3, 3, 16, array('i', decoding_matrix[3:6]), array('i', dm_ids), array('i', [1]),
+                          [678, 41143, 61441], [123, 0])
+
+        # Test decoding rows not matching the erasures
+        self.assertRaises(ValueError, python_jerasure.decode_data,
+                          3, 3, 16, array('i', decoding_matrix), array('i', dm_ids), array('i', [1]),
+                          [678, 41143, 61441], [123, 0, 789])
+
+        # Test ids of devices outside the stripe
+        self.assertRaises(ValueError, python_jerasure.decode_data,
+                          3, 3, 16, array('i', decoding_matrix[3:6]), array('i', [0, 2, 6]), array('i', [1]),
+                          [678, 41143, 61441], [123, 0, 789])
+        self.assertRaises(ValueError, python_jerasure.decode_data,
+                          3, 3, 16, array('i', decoding_matrix[3:6]), array('i', dm_ids), array('i', [3]),
+                          [678, 41143, 61441], [123, 0, 789])
+
+        # Test read-only output buffer
+        self.assertRaises(TypeError, python_jerasure.decode_data,
+                          3, 3, 16, array('i', decoding_matrix[3:6]), array('i', dm_ids), array('i', [1]),
+                          [678, 41143, 61441], [123, 0, 789], bytes(24))
+
+    def test_decode_columns_valid(self):
+        # Test in place recovery of two stripes of sequence [123, 456, 789], stored one column per device
+        decoding_matrix, dm_ids = python_jerasure.calculate_decoding_matrix(3, 3, 16, [0, 1, 2])
+        codes = array('l', [678, 678, 41143, 41143, 61441, 61441])
+        data = array('l', [0, 0, 0, 0, 0, 0])
+
+        python_jerasure.decode_columns(
+            3, 3, 16, array('i', decoding_matrix), array('i', dm_ids), array('i', [0, 1, 2]), codes, data)
+        self.assertEqual(list(data), [123, 123, 456, 456, 789, 789])
+
+    def test_decode_columns_parity(self):
+        # Test a single erased primary is rebuilt from the XOR parity code and the surviving primaries
+        codes = array('l', [123 ^ 456 ^ 789, 1 ^ 2 ^ 3, 0, 0, 0, 0])
+        data = array('l', [123, 1, 0, 0, 789, 3])
+
+        python_jerasure.decode_columns(
+            3, 3, 16, array('i', [1, 1, 1]), array('i', [0, 2, 3]), array('i', [1]), codes, data)
+        self.assertEqual(list(data), [123, 1, 456, 2, 789, 3])
+
+    def test_decode_columns_invalid(self):
+        decoding_matrix, dm_ids = python_jerasure.calculate_decoding_matrix(3, 3, 16, [1])
+
+        # Test read-only data buffer
+        self.assertRaises(TypeError, python_jerasure.decode_columns,
+                          3, 3, 16, array('i', decoding_matrix[3:6]), array('i', dm_ids), array('i', [1]),
+                          array('l', [678, 41143, 61441]), bytes(24))
+
+        # Test codes not matching the number of stripes of data
+        self.assertRaises(ValueError, python_jerasure.decode_columns,
+                          3, 3, 16, array('i', decoding_matrix[3:6]), array('i', dm_ids), array('i', [1]),
+                          array('l', [678, 41143]), array('l', [123, 0, 789]))
+
+        # Test ids of devices outside the stripe, which must be rejected before the data is written
+        data = array('l', [123, 0, 789])
+        self.assertRaises(ValueError, python_jerasure.decode_columns,
+                          3, 3, 16, array('i', decoding_matrix[3:6]), array('i', [0, 2, 6]), array('i', [1]),
+                          array('l', [678, 41143, 61441]), data)
+        self.assertRaises(ValueError, python_jerasure.decode_columns,
+                          3, 3, 16, array('i', decoding_matrix[3:6]), array('i', dm_ids), array('i', [-1]),
+                          array('l', [678, 41143, 61441]), data)
+        self.assertEqual(list(data), [123, 0, 789])
+
+    def test_encode_columns_valid(self):
+        # Test encoding of two stripes of sequence [123, 456, 789], stored one column per device
+        matrix = array('i', python_jerasure.calculate_rs_matrix(3, 3, 16))
+        codes = array('l', [0] * 6)
+
+        python_jerasure.encode_columns(3, 3, 16, matrix, array('l', [123, 123, 456, 456, 789, 789]), codes)
+        self.assertEqual(list(codes), [678, 678, 41143, 41143, 61441, 61441])
+
+    def test_encode_columns_invalid(self):
+        matrix = array('i', python_jerasure.calculate_rs_matrix(3, 3, 16))
+
+        # Test read-only codes buffer
+        self.assertRaises(TypeError, python_jerasure.encode_columns,
+                          3, 3, 16, matrix, array('l', [123, 456, 789]), bytes(24))
+
+        # Test codes not matching the number of stripes of data
+        self.assertRaises(ValueError, python_jerasure.encode_columns,
+                          3, 3, 16, matrix, array('l', [123, 456, 789]), array('l', [0, 0]))
+
+    def test_calculate_coding_matrix_valid(self):
+        # Test the Vandermonde scheme matches calculate_rs_matrix
+        self.assertEqual(python_jerasure.calculate_coding_matrix(python_jerasure.VANDERMONDE, 3, 3, 16),
+                         python_jerasure.calculate_rs_matrix(3, 3, 16))
+
+        # Test Cauchy matrices, where element (i, j) = 1 / (i ^ (m + j)), and "good" ones scaled to a first row of ones
+        self.assertEqual(python_jerasure.calculate_coding_matrix(python_jerasure.CAUCHY, 3, 3, 8),
+                         [244, 71, 167, 142, 167, 71, 1, 122, 186])
+        self.assertEqual(python_jerasure.calculate_coding_matrix(python_jerasure.CAUCHY_GOOD, 3, 3, 8)[:3], [1, 1, 1])
+
+        # Test writing into a caller-supplied buffer
+        out = array('i', [0] * 9)
+        self.assertIsNone(python_jerasure.calculate_coding_matrix(python_jerasure.CAUCHY_GOOD, 3, 3, 8, out))
+        self.assertEqual(list(out), python_jerasure.calculate_coding_matrix(python_jerasure.CAUCHY_GOOD, 3, 3, 8))
+
+    def test_calculate_coding_matrix_invalid(self):
+        # Test unknown scheme
+        self.assertRaises(ValueError, python_jerasure.calculate_coding_matrix, 3, 3, 3, 8)
+
+        # Test too many nodes for the word size
+        self.assertRaises(ValueError, python_jerasure.calculate_coding_matrix, python_jerasure.CAUCHY, 200, 57, 8)
+
+    def test_calculate_bitmatrix_codes_valid(self):
+        # Test applying each value as an update from zero gives the same codes as encoding the whole stripe
+        matrix = array('i', python_jerasure.calculate_coding_matrix(python_jerasure.CAUCHY_GOOD, 3, 3, 8))
+        data = array('l', [123, 456, 789])
+        encoded = array('l', [0] * 3)
+        python_jerasure.encode_bitmatrix_columns(3, 3, 8, matrix, data, encoded)
+
+        for code_index in range(3):
+            codes = array('l', [0] * 3)
+            python_jerasure.calculate_bitmatrix_codes(
+                3, 3, 8, matrix, codes, code_index, array('l', [0] * 3), data, array('i', [0, 1, 2]))
+            self.assertEqual(codes[0] ^ codes[1] ^ codes[2], encoded[code_index])
+
+        # Test the first row of ones is plain XOR parity
+        self.assertEqual(encoded[0], 123 ^ 456 ^ 789)
+
+    def test_bitmatrix_columns_valid(self):
+        # Test encoding two stripes of sequence [123, 456, 789], then recovering two erased columns
+        for scheme in (python_jerasure.CAUCHY, python_jerasure.CAUCHY_GOOD):
+            matrix = array('i', python_jerasure.calculate_coding_matrix(scheme, 3, 3, 8))
+            codes = array('l', [0] * 6)
+            python_jerasure.encode_bitmatrix_columns(3, 3, 8, matrix, array('l', [123, 123, 456, 456, 789, 789]), codes)
+
+            decoding_matrix, dm_ids = python_jerasure.calculate_decoding_matrix(3, 3, 8, [0, 2], None, None, scheme)
+            decoding_rows = array('i', decoding_matrix[0:3] + decoding_matrix[6:9])
+            data = array('l', [0, 0, 456, 456, 0, 0])
+
+            python_jerasure.decode_bitmatrix_columns(
+                3, 3, 8, decoding_rows, array('i', dm_ids), array('i', [0, 2]), codes, data)
+            self.assertEqual(list(data), [123, 123, 456, 456, 789, 789])
+
+    def test_bitmatrix_invalid(self):
+        matrix = array('i', python_jerasure.calculate_coding_matrix(python_jerasure.CAUCHY, 3, 3, 16))
+
+        # Test bitmatrix codes need one-byte packets
+        self.assertRaises(ValueError, python_jerasure.encode_bitmatrix_columns,
+                          3, 3, 16, matrix, array('l', [123, 456, 789]), array('l', [0, 0, 0]))
+        self.assertRaises(ValueError, python_jerasure.calculate_bitmatrix_codes,
+                          3, 3, 16, matrix, array('l', [0]), 1, array('l', [0]), array('l', [1]), array('i', [0]))
+
+        # Test read-only codes buffer and out of range positions
+        matrix = array('i', python_jerasure.calculate_coding_matrix(python_jerasure.CAUCHY, 3, 3, 8))
+        self.assertRaises(TypeError, python_jerasure.encode_bitmatrix_columns,
+                          3, 3, 8, matrix, array('l', [123, 456, 789]), bytes(24))
+        self.assertRaises(ValueError, python_jerasure.calculate_bitmatrix_codes,
+                          3, 3, 8, matrix, array('l', [0]), 1, array('l', [0]), array('l', [1]), array('i', [3]))
+
+        # Test ids of devices outside the stripe when decoding
+        decoding_matrix, dm_ids = python_jerasure.calculate_decoding_matrix(
+            3, 3, 8, [1], None, None, python_jerasure.CAUCHY)
+        self.assertRaises(ValueError, python_jerasure.decode_bitmatrix_columns,
+                          3, 3, 8, array('i', decoding_matrix[3:6]), array('i', [0, 2, 6]), array('i', [1]),
+                          array('l', [0, 0, 0]), array('l', [123, 0, 789]))
+        self.assertRaises(ValueError, python_jerasure.decode_bitmatrix_columns,
+                          3, 3, 8, array('i', decoding_matrix[3:6]), array('i', dm_ids), array('i', [3]),
+                          array('l', [0, 0, 0]), array('l', [123, 0, 789]))
+
 
 if __name__ == '__main__':
     unittest.main()